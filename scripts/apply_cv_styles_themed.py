@@ -21,10 +21,12 @@ from gdocs_cli import (
     ensure_access_token,
     load_oauth_client,
     get_doc,
-    docs_batch_update,
+    docs_batch_update_planned,
     parse_doc_links,
     read_text,
 )
+import gdocs_profile
+from gdocs_trace import span
 
 
 # === DOCUMENT PARSING ===
@@ -282,7 +284,8 @@ def apply_cv_styles_with_theme(document_id: str, access_token: str,
     """
     # Загрузить тему
     print(f"\nLoading theme: {theme_name}")
-    theme = load_theme(theme_name)
+    with span("load theme"):
+        theme = load_theme(theme_name)
 
     if hasattr(theme, "THEME_INFO"):
         info = theme.THEME_INFO
@@ -295,25 +298,15 @@ def apply_cv_styles_with_theme(document_id: str, access_token: str,
 
     # Получить документ
     print("[1/3] Fetching document...")
-    doc = get_doc(document_id=document_id, access_token=access_token)
+    with span("fetch doc"):
+        doc = get_doc(document_id=document_id, access_token=access_token)
     doc_title = doc.get("title", "Untitled")
     print(f"  Document: {doc_title}")
 
     # Собрать все запросы стилизации
     print("\n[2/3] Analyzing document structure...")
-    requests = []
-
-    print("\n  Styling Skills section...")
-    requests.extend(style_skills_section_with_theme(doc, theme))
-
-    print("\n  Styling Experience section...")
-    requests.extend(style_experience_section_with_theme(doc, theme))
-    requests.extend(style_tech_stack_with_theme(doc, theme))
-
-    print("\n  Styling Education section...")
-    requests.extend(style_education_section_with_theme(doc, theme))
-
-    print(f"\n  Total style requests: {len(requests)}")
+    with span("plan theme"):
+        requests = plan_theme_requests(doc, theme)
 
     if dry_run:
         print(f"\n[DRY RUN] Would apply {len(requests)} style requests")
@@ -325,15 +318,19 @@ def apply_cv_styles_with_theme(document_id: str, access_token: str,
                 print(json.dumps(req, indent=2))
         return
 
-    # Применить через batchUpdate
+    # Применить через batchUpdate (с requiredRevisionId снимка; при конфликте — перечитать и пересчитать)
     if requests:
         print("\n[3/3] Applying styles via batchUpdate...")
-        result = docs_batch_update(
-            document_id=document_id,
-            access_token=access_token,
-            requests=requests
-        )
-        print(f"  ✓ Applied {len(requests)} style updates")
+        applied = [len(requests)]
+
+        def plan(current: dict[str, Any]) -> list[list[dict[str, Any]]]:
+            batch = requests if current is doc else plan_theme_requests(current, theme)
+            applied[0] = len(batch)
+            return [batch]
+
+        with span("write"):
+            docs_batch_update_planned(document_id=document_id, access_token=access_token, plan=plan, doc=doc)
+        print(f"  ✓ Applied {applied[0]} style updates")
         print(f"\n{'='*60}")
         print(f"SUCCESS! Document styled with '{theme_name}' theme: {doc_title}")
         print(f"{'='*60}\n")
@@ -341,6 +338,24 @@ def apply_cv_styles_with_theme(document_id: str, access_token: str,
         print("\n[SKIP] No style updates needed")
 
 
+def plan_theme_requests(doc: dict[str, Any], theme: Any) -> list[dict[str, Any]]:
+    """Собрать запросы стилизации темы по снимку документа."""
+    requests = []
+
+    print("\n  Styling Skills section...")
+    requests.extend(style_skills_section_with_theme(doc, theme))
+
+    print("\n  Styling Experience section...")
+    requests.extend(style_experience_section_with_theme(doc, theme))
+    requests.extend(style_tech_stack_with_theme(doc, theme))
+
+    print("\n  Styling Education section...")
+    requests.extend(style_education_section_with_theme(doc, theme))
+
+    print(f"\n  Total style requests: {len(requests)}")
+    return requests
+
+
 def resolve_doc_id(name_or_id: str, links_file: str = "GOOGLE_DOCS_LINKS.md") -> str:
     """Преобразовать имя документа или ID в ID."""
     if len(name_or_id) > 30 and " " not in name_or_id:
@@ -388,7 +403,7 @@ def list_themes() -> None:
     print()
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     p = argparse.ArgumentParser(description="Apply themed styles to CV via Google Docs API")
     p.add_argument("--doc", help="Document ID or name")
     p.add_argument("--theme", default="minimalist", help="Theme to apply (default: minimalist)")
@@ -404,7 +419,8 @@ def main() -> int:
         default=os.environ.get("GDOCS_TOKEN", ".secrets/google-token.json"),
         help="Path to token cache",
     )
-    args = p.parse_args()
+    gdocs_profile.add_arguments(p)
+    args = p.parse_args(argv)
 
     if args.list_themes:
         list_themes()
@@ -422,7 +438,8 @@ def main() -> int:
     document_id = resolve_doc_id(args.doc)
 
     # Применить тему
-    apply_cv_styles_with_theme(document_id, access_token, args.theme, dry_run=args.dry_run)
+    with gdocs_profile.from_args(args, title=f"theme {args.theme} {args.doc}"), span("theme", doc=args.doc):
+        apply_cv_styles_with_theme(document_id, access_token, args.theme, dry_run=args.dry_run)
 
     return 0
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+CV A/B Matrix - Expand cv_components/ab_tests variants over a base CV profile.
+
+Parses summary.md, skills.md and exps.md, builds the cross-product (or a random
+sample) of the chosen axes over a base CV JSON, and streams one JSON line per
+distinct combination with the CV data and its replacements.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+
+# Setup path for imports
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from cv_apply.ab_variants import expand_matrix, load_ab_axes, matrix_size, select_axes
+from cv_apply.batch import LANGS, lang_from_path
+from cv_apply.utils import read_json
+
+
+def parse_axis_spec(values: list[str] | None) -> dict[str, list[str]] | None:
+    """
+    Parse --axis arguments ("summary", "summary=1,3,base", "skills=1+3+5,2").
+
+    Args:
+        values: Raw --axis values
+
+    Returns:
+        Axis -> option ids (empty list = all options), or None for all axes
+    """
+    if not values:
+        return None
+    spec: dict[str, list[str]] = {}
+    for value in values:
+        name, _, ids = value.partition("=")
+        spec[name.strip()] = [i.strip() for i in ids.split(",") if i.strip()]
+    return spec
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
+def main(argv: list[str]) -> int:
+    """
+    Main entry point for A/B matrix expansion.
+
+    Args:
+        argv: Command-line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(
+        description="Expand A/B variants (summary/skills/exps) over a base CV JSON into JSONL.",
+    )
+    parser.add_argument("--base", required=True, help="Base structured CV JSON")
+    parser.add_argument(
+        "--ab-dir",
+        default=os.path.join(ROOT_DIR, "cv_components", "ab_tests"),
+        help="Directory with summary.md, skills.md, exps.md",
+    )
+    parser.add_argument(
+        "--axis",
+        action="append",
+        help="Axis to vary, optionally with option ids: summary=1,3  skills=1+3+5,2  exps:1 (repeatable; default: all)",
+    )
+    parser.add_argument("--sample", type=positive_int, help="Random subset of this many combinations")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sample (default: 0)")
+    parser.add_argument("--limit", type=int, help="Stop after this many records")
+    parser.add_argument("--lang", choices=list(LANGS), help="Label language (default: from --base file name)")
+    parser.add_argument("--no-dedup", action="store_true", help="Keep combinations with identical output")
+    parser.add_argument("--no-data", action="store_true", help="Omit CV data from records (replacements only)")
+    parser.add_argument("--list", action="store_true", help="List axes and options, then exit")
+    parser.add_argument("--out", help="Write JSONL here instead of stdout")
+    args = parser.parse_args(argv)
+
+    base = read_json(args.base)
+    if not isinstance(base, dict):
+        raise SystemExit("Structured CV data must be a JSON object.")
+    axes = load_ab_axes(args.ab_dir)
+    if not axes:
+        raise SystemExit(f"No A/B variants found in {args.ab_dir}")
+    selected = select_axes(axes, base, parse_axis_spec(args.axis))
+
+    if args.list:
+        for name, options in axes.items():
+            mark = "" if name in selected else "  (not applicable to base)"
+            print(f"{name}{mark}")
+            for variant in options:
+                print(f"  {variant.id}: {variant.title}")
+        return 0
+
+    print(f"Axes: {', '.join(selected)}; {matrix_size(selected)} combinations", file=sys.stderr)
+    records = expand_matrix(
+        base,
+        selected,
+        lang=args.lang or lang_from_path(args.base),
+        sample=args.sample,
+        seed=args.seed,
+        dedup=not args.no_dedup,
+    )
+    if args.limit is not None:
+        records = itertools.islice(records, args.limit)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    count = 0
+    try:
+        for record in records:
+            if args.no_data:
+                record.pop("data", None)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if args.out:
+            out.close()
+    print(f"Wrote {count} distinct combinations", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
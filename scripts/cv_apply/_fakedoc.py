@@ -0,0 +1,131 @@
+"""
+Fake Docs body for the planner tests: build documents.get JSON and replay batchUpdate requests on it.
+
+Indices are UTF-16 code units starting at 1, as in the API.
+"""
+
+from cv_apply.document import utf16_len
+
+
+def make_doc(paragraphs):
+    """Build minimal documents.get JSON from (text, namedStyleType) paragraphs."""
+    content = []
+    index = 1
+    for text, style in paragraphs:
+        end = index + utf16_len(text)
+        content.append({
+            "startIndex": index,
+            "endIndex": end,
+            "paragraph": {
+                "elements": [{"startIndex": index, "endIndex": end, "textRun": {"content": text}}],
+                "paragraphStyle": {"namedStyleType": style},
+            },
+        })
+        index = end
+    return {"body": {"content": content}}
+
+
+class FakeBody:
+    """Body text, paragraph styles and named ranges, edited the way the API applies requests."""
+
+    def __init__(self, doc):
+        content = doc["body"]["content"]
+        self.units = "".join(p["paragraph"]["elements"][0]["textRun"]["content"] for p in content).encode("utf-16-le")
+        self.styles = [p["paragraph"]["paragraphStyle"]["namedStyleType"] for p in content]
+        self.named = {
+            name: [[r["startIndex"], r["endIndex"]] for named in group["namedRanges"] for r in named["ranges"]]
+            for name, group in (doc.get("namedRanges") or {}).items()
+        }
+        # (request kind, namedStyleType or None, text the range covered) per ranged request
+        self.styled = []
+
+    @property
+    def text(self):
+        return self.units.decode("utf-16-le")
+
+    def _slice(self, start, end):
+        return self.units[(start - 1) * 2 : (end - 1) * 2].decode("utf-16-le")
+
+    def _paragraph(self, index):
+        return self._slice(1, index).count("\n")
+
+    def apply(self, req):
+        """Apply one request, asserting its indices are inside the segment."""
+        (kind, body), = req.items()
+        # The segment ends at size + 1. Text goes in before its final newline (index size) at the
+        # latest, deletes stop short of it; style and bullet ranges may cover it.
+        size = len(self.units) // 2
+        if kind == "insertText":
+            self._insert(body["location"]["index"], body["text"], size)
+        elif kind == "deleteNamedRange":
+            self.named.pop(body["name"], None)
+        elif "range" in body:
+            r = body["range"]
+            end = size if kind == "deleteContentRange" else size + 1
+            assert 1 <= r["startIndex"] < r["endIndex"] <= end, f"{kind} range {r} outside the segment"
+            if kind == "deleteContentRange":
+                self._delete(r["startIndex"], r["endIndex"])
+                return
+            style = body.get("paragraphStyle", {}).get("namedStyleType")
+            self.styled.append((kind, style, self._slice(r["startIndex"], r["endIndex"])))
+            if kind == "createNamedRange":
+                self.named.setdefault(body["name"], []).append([r["startIndex"], r["endIndex"]])
+            elif kind == "updateParagraphStyle" and style:
+                first, last = self._paragraph(r["startIndex"]), self._paragraph(r["endIndex"] - 1)
+                self.styles[first : last + 1] = [style] * (last - first + 1)
+
+    def _insert(self, index, text, size):
+        assert 1 <= index <= size, f"insert at {index} outside the segment (ends at {size + 1})"
+        paragraph = self._paragraph(index)
+        # New paragraphs take the style of the one they are inserted into.
+        self.styles[paragraph:paragraph] = [self.styles[paragraph]] * text.count("\n")
+        length = utf16_len(text)
+        for r in (r for ranges in self.named.values() for r in ranges):
+            if index <= r[0]:
+                r[0] += length
+                r[1] += length
+            elif index < r[1]:
+                r[1] += length
+        at = (index - 1) * 2
+        self.units = self.units[:at] + text.encode("utf-16-le") + self.units[at:]
+
+    def _delete(self, start, end):
+        first = self._paragraph(start)
+        merged = self._slice(start, end).count("\n")
+        # Deleting whole paragraphs drops them; otherwise the first one absorbs the rest.
+        at_paragraph_start = start == 1 or self._slice(start - 1, start) == "\n"
+        drop = first if at_paragraph_start else first + 1
+        del self.styles[drop : drop + merged]
+        removed = end - start
+        for name, ranges in list(self.named.items()):
+            for r in ranges:
+                r[:] = [x if x <= start else start if x <= end else x - removed for x in r]
+            self.named[name] = [r for r in ranges if r[0] < r[1]]
+        self.units = self.units[: (start - 1) * 2] + self.units[(end - 1) * 2 :]
+
+    def document(self):
+        """documents.get JSON of the current state (namedRanges included)."""
+        lines = self.text.splitlines(keepends=True)
+        doc = make_doc(list(zip(lines, self.styles)))
+        doc["namedRanges"] = {
+            name: {"name": name, "namedRanges": [{"name": name, "ranges": [{"startIndex": s, "endIndex": e}]} for s, e in ranges]}
+            for name, ranges in self.named.items()
+            if ranges
+        }
+        return doc
+
+
+def run_requests(doc, requests):
+    """Apply requests in order like the API would; return final text and the text each style/bullet range covered."""
+    body = FakeBody(doc)
+    for req in requests:
+        body.apply(req)
+    return body.text, body.styled
+
+
+def replay(doc, requests):
+    """Apply requests in order like the API would; return the resulting documents.get JSON."""
+    body = FakeBody(doc)
+    for req in requests:
+        body.apply(req)
+    return body.document()
@@ -0,0 +1,347 @@
+"""A/B variant parsing and matrix expansion over a base CV profile."""
+
+import difflib
+import itertools
+import json
+import math
+import os
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from .formatters import build_replacements
+from .memo import fingerprint
+from .translations import Lang
+
+BASE_OPTION = "base"
+# Minimum similarity for an exps.md "Original" to match a bullet of the base profile.
+ORIGINAL_MATCH_RATIO = 0.9
+
+_VARIANT_HEADING_RE = re.compile(r"^##\s+Variant\s+(\d+)\s*:\s*(.+?)\s*$")
+_TYPE_HEADING_RE = re.compile(r"^##\s+Achievement Type\s+(\d+)\s*:\s*(.+?)\s*$")
+_EXP_VARIANT_RE = re.compile(r"^###\s+Variant\s+(\d+\.\d+)\s*:\s*(.+?)\s*$")
+_EXP_ORIGINAL_RE = re.compile(r"^###\s+Original\b(.*)$")
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One option on an A/B axis (value is a string, or a skill group dict)."""
+
+    axis: str
+    id: str
+    title: str
+    value: Any
+    # exps variants: the base bullet they replace
+    original: str | None = None
+
+
+def _quote_text(lines: list[str]) -> str:
+    quoted = [line.strip()[1:].strip() for line in lines if line.strip().startswith(">")]
+    return "\n".join(quoted).strip()
+
+
+def _split_sections(text: str, heading_re: re.Pattern[str]) -> Iterator[tuple[re.Match[str], list[str]]]:
+    # Yields (heading match, body lines) until the next "## "/"# " heading.
+    current: re.Match[str] | None = None
+    body: list[str] = []
+    for line in text.splitlines():
+        if line.startswith("#") and not line.startswith("###"):
+            if current is not None:
+                yield current, body
+            current = heading_re.match(line)
+            body = []
+            continue
+        if current is not None:
+            body.append(line)
+    if current is not None:
+        yield current, body
+
+
+def parse_summary_variants(text: str) -> list[Variant]:
+    """
+    Parse summary.md: "## Variant N: Title" followed by a blockquote.
+
+    Args:
+        text: Markdown content
+
+    Returns:
+        Variants with the quoted summary text as value
+    """
+    variants = []
+    for match, body in _split_sections(text, _VARIANT_HEADING_RE):
+        value = _quote_text(body)
+        if value:
+            variants.append(Variant("summary", match.group(1), match.group(2), value))
+    return variants
+
+
+def parse_skills_variants(text: str) -> list[Variant]:
+    """
+    Parse skills.md: "## Variant N: Title" followed by a ```json skill group.
+
+    Args:
+        text: Markdown content
+
+    Returns:
+        Variants with {"title", "bullets"} dicts as value
+    """
+    variants = []
+    for match, body in _split_sections(text, _VARIANT_HEADING_RE):
+        block = "\n".join(body)
+        fenced = re.search(r"```json\s*\n(.*?)\n```", block, re.DOTALL)
+        if not fenced:
+            continue
+        try:
+            group = json.loads(fenced.group(1))
+        except json.JSONDecodeError:
+            continue
+        variants.append(Variant("skills", match.group(1), match.group(2), group))
+    return variants
+
+
+def parse_exps_variants(text: str) -> dict[str, list[Variant]]:
+    """
+    Parse exps.md: per achievement type, an "### Original" bullet and "### Variant N.M" rewrites.
+
+    Args:
+        text: Markdown content
+
+    Returns:
+        Axis name ("exps:N") -> variants; the first entry is the original (id "original")
+    """
+    axes: dict[str, list[Variant]] = {}
+    for match, body in _split_sections(text, _TYPE_HEADING_RE):
+        axis = f"exps:{match.group(1)}"
+        options: list[Variant] = []
+        heading: tuple[str, str] | None = None
+        chunk: list[str] = []
+        for line in body + ["### end"]:
+            if line.startswith("###"):
+                if heading is not None and _quote_text(chunk):
+                    options.append(Variant(axis, heading[0], heading[1], _quote_text(chunk)))
+                original = _EXP_ORIGINAL_RE.match(line)
+                variant = _EXP_VARIANT_RE.match(line)
+                if original:
+                    heading = ("original", original.group(1).strip(" ()") or match.group(2))
+                elif variant:
+                    heading = (variant.group(1), variant.group(2))
+                else:
+                    heading = None
+                chunk = []
+                continue
+            chunk.append(line)
+        if options and options[0].id == "original":
+            original = options[0].value
+            axes[axis] = [options[0]] + [
+                Variant(v.axis, v.id, v.title, v.value, original) for v in options[1:]
+            ]
+    return axes
+
+
+def load_ab_axes(ab_dir: str) -> dict[str, list[Variant]]:
+    """
+    Load all axes from summary.md, skills.md and exps.md (missing files are skipped).
+
+    Args:
+        ab_dir: Directory with the A/B markdown files
+
+    Returns:
+        Axis name -> options
+    """
+    axes: dict[str, list[Variant]] = {}
+    parsers = (
+        ("summary.md", lambda t: {"summary": parse_summary_variants(t)}),
+        ("skills.md", lambda t: {"skills": parse_skills_variants(t)}),
+        ("exps.md", parse_exps_variants),
+    )
+    for filename, parse in parsers:
+        path = os.path.join(ab_dir, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            axes.update({k: v for k, v in parse(f.read()).items() if v})
+    return axes
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().rstrip(".").lower()
+
+
+def _find_bullet(data: dict[str, Any], original: str) -> tuple[int, int] | None:
+    # (experience index, bullet index) of the base bullet matching an exps.md original.
+    want = _norm(original)
+    bullets = [
+        ((i, j), _norm(str(bullet)))
+        for i, item in enumerate(data.get("experience") or [])
+        if isinstance(item, dict)
+        for j, bullet in enumerate(item.get("bullets") or [])
+    ]
+    for pos, got in bullets:
+        if got == want:
+            return pos
+    best: tuple[float, tuple[int, int]] | None = None
+    for pos, got in bullets:
+        matcher = difflib.SequenceMatcher(None, want, got)
+        if matcher.quick_ratio() < ORIGINAL_MATCH_RATIO:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= ORIGINAL_MATCH_RATIO and (best is None or ratio > best[0]):
+            best = (ratio, pos)
+    return best[1] if best else None
+
+
+def select_axes(
+    axes: dict[str, list[Variant]],
+    base: dict[str, Any],
+    spec: dict[str, list[str]] | None = None,
+) -> dict[str, list[tuple[Variant, ...]]]:
+    """
+    Choose options per axis and drop axes that cannot change the base profile.
+
+    Every axis gets a "base" option (empty tuple: keep the profile as is). An exps
+    axis is kept only if its original bullet exists in the base profile. Skills
+    options may combine groups ("1+3+5" renders those three groups as the section).
+
+    Args:
+        axes: Parsed axes from load_ab_axes()
+        base: Base CV data
+        spec: Axis -> option ids to keep (None = all axes, all options)
+
+    Returns:
+        Axis -> options, each option a tuple of variants to apply
+    """
+    unknown = [name for name in spec or {} if name not in axes]
+    if unknown:
+        raise SystemExit(f"Unknown axis/axes {', '.join(unknown)} (available: {', '.join(axes)})")
+    selected: dict[str, list[tuple[Variant, ...]]] = {}
+    for name, options in axes.items():
+        if spec is not None and name not in spec:
+            continue
+        if name.startswith("exps:") and _find_bullet(base, options[0].value) is None:
+            continue
+        by_id = {v.id: v for v in options}
+        choices: list[tuple[Variant, ...]] = [()]
+        wanted = (spec or {}).get(name) or [v.id for v in options if v.id != "original"]
+        for option_id in wanted:
+            if option_id == BASE_OPTION:
+                continue
+            parts = option_id.split("+")
+            missing = [p for p in parts if p not in by_id]
+            if missing:
+                raise SystemExit(f"Unknown variant(s) {', '.join(missing)} for axis {name!r}")
+            if name.startswith("exps:") and parts == ["original"]:
+                continue
+            choices.append(tuple(by_id[p] for p in parts))
+        selected[name] = choices
+    return selected
+
+
+def apply_variants(
+    base: dict[str, Any],
+    combo: dict[str, tuple[Variant, ...]],
+    positions: dict[str, tuple[int, int] | None] | None = None,
+) -> dict[str, Any]:
+    """
+    Build CV data for one combination without modifying the base.
+
+    Args:
+        base: Base CV data
+        combo: Axis -> chosen variants (empty tuple keeps the base)
+        positions: Precomputed exps axis -> (experience, bullet) index in base
+
+    Returns:
+        New CV data dictionary
+    """
+    data = dict(base)
+    for axis, variants in combo.items():
+        if not variants:
+            continue
+        if axis == "summary":
+            text = variants[0].value
+            summary = base.get("summary")
+            data["summary"] = dict(summary, paragraph=text) if isinstance(summary, dict) else text
+        elif axis == "skills":
+            data["skills"] = [dict(v.value) for v in variants]
+        elif axis.startswith("exps:"):
+            # A rewrite replaces the bullet matching its achievement's original.
+            if positions is not None and axis in positions:
+                pos = positions[axis]
+            else:
+                pos = _find_bullet(base, variants[0].original or "")
+            if pos is None:
+                continue
+            i, j = pos
+            experience = list(data.get("experience") or [])
+            item = dict(experience[i])
+            bullets = list(item.get("bullets") or [])
+            bullets[j] = variants[0].value
+            item["bullets"] = bullets
+            experience[i] = item
+            data["experience"] = experience
+    return data
+
+
+def matrix_size(selected: dict[str, list[tuple[Variant, ...]]]) -> int:
+    """Number of combinations in the full cross-product."""
+    return math.prod(len(options) for options in selected.values())
+
+
+def _combo_at(names: list[str], selected: dict[str, list[tuple[Variant, ...]]], index: int) -> dict[str, tuple[Variant, ...]]:
+    # Mixed-radix decode of a cross-product index (last axis varies fastest, like itertools.product).
+    combo: dict[str, tuple[Variant, ...]] = {}
+    for name in reversed(names):
+        options = selected[name]
+        index, pos = divmod(index, len(options))
+        combo[name] = options[pos]
+    return {name: combo[name] for name in names}
+
+
+def expand_matrix(
+    base: dict[str, Any],
+    selected: dict[str, list[tuple[Variant, ...]]],
+    *,
+    lang: Lang = "en",
+    sample: int | None = None,
+    seed: int = 0,
+    dedup: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily yield CV data and replacements for each combination.
+
+    Args:
+        base: Base CV data
+        selected: Options per axis from select_axes()
+        lang: Language for labels
+        sample: Yield a random subset of this many combinations (None = full cross-product)
+        seed: Random seed for sampling
+        dedup: Skip combinations whose replacements equal an earlier one
+
+    Yields:
+        {"variant": {axis: option id}, "data": cv_data, "replacements": {...}}
+    """
+    names = list(selected)
+    positions = {
+        name: _find_bullet(base, options[-1][0].original or "")
+        for name, options in selected.items()
+        if name.startswith("exps:") and len(options) > 1
+    }
+    total = matrix_size(selected)
+    if sample is not None and sample < total:
+        # random.sample over a range never materializes the cross-product.
+        indices: Iterator[int] = iter(sorted(random.Random(seed).sample(range(total), sample)))
+        combos = (_combo_at(names, selected, idx) for idx in indices)
+    else:
+        combos = (dict(zip(names, values)) for values in itertools.product(*(selected[n] for n in names)))
+
+    seen: set[str] = set()
+    for combo in combos:
+        data = apply_variants(base, combo, positions)
+        replacements = build_replacements(data, lang=lang)
+        if dedup:
+            key = fingerprint("replacements", replacements)
+            if key in seen:
+                continue
+            seen.add(key)
+        label = {name: "+".join(v.id for v in variants) or BASE_OPTION for name, variants in combo.items()}
+        yield {"variant": label, "data": data, "replacements": replacements}
@@ -0,0 +1,184 @@
+"""Named-range tracking of where each anchor's content lives in a filled document."""
+
+import os
+import re
+import sys
+from typing import Any
+
+from .constants import ANCHOR_RANGE_PREFIX
+from .document import build_text_index, utf16_len
+from .utils import log_line
+
+# Import gdocs_cli functions
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from gdocs_cli import docs_batch_update, ensure_access_token, get_doc, load_oauth_client
+
+# (startIndex, endIndex, segmentId)
+Range = tuple[int, int, str | None]
+
+
+def anchor_range_name(anchor: str) -> str:
+    """Named range name for an anchor ("{{title}}" -> "cv_anchor:{{title}}")."""
+    return f"{ANCHOR_RANGE_PREFIX}{anchor}"
+
+
+def doc_segments(doc_data: dict[str, Any]) -> list[tuple[list[dict[str, Any]], str | None]]:
+    """List (content, segmentId) for the body, headers and footers."""
+    segments = [((doc_data.get("body") or {}).get("content") or [], None)]
+    for sid, seg in (doc_data.get("headers") or {}).items():
+        segments.append((seg.get("content") or [], sid))
+    for sid, seg in (doc_data.get("footers") or {}).items():
+        segments.append((seg.get("content") or [], sid))
+    return segments
+
+
+def named_anchor_ranges(doc_data: dict[str, Any]) -> dict[str, list[Range]]:
+    """
+    Read anchor ranges registered as Docs named ranges ("cv_anchor:{{key}}").
+
+    Args:
+        doc_data: Document JSON from documents.get
+
+    Returns:
+        Anchor -> ranges
+    """
+    found: dict[str, list[Range]] = {}
+    for name, group in (doc_data.get("namedRanges") or {}).items():
+        if not name.startswith(ANCHOR_RANGE_PREFIX):
+            continue
+        anchor = name[len(ANCHOR_RANGE_PREFIX):]
+        for named in group.get("namedRanges") or []:
+            for r in named.get("ranges") or []:
+                start, end = r.get("startIndex") or 0, r.get("endIndex") or 0
+                if start < end:
+                    found.setdefault(anchor, []).append((start, end, r.get("segmentId") or None))
+    return found
+
+
+def find_placeholders(
+    doc_data: dict[str, Any],
+    keys: list[str],
+    *,
+    match_case: bool = False,
+) -> list[tuple[str, int, int, str | None]]:
+    """
+    Find every placeholder occurrence the way replaceAllText matches them.
+
+    Args:
+        doc_data: Document JSON from documents.get
+        keys: Placeholders to look for
+        match_case: Whether matching is case-sensitive
+
+    Returns:
+        (key, startIndex, endIndex, segmentId) per occurrence, in document order per segment
+    """
+    keys = [k for k in keys if isinstance(k, str) and k]
+    if not keys:
+        return []
+    pattern = re.compile(
+        "|".join(re.escape(k) for k in sorted(keys, key=len, reverse=True)),
+        0 if match_case else re.IGNORECASE,
+    )
+    lookup = {k if match_case else k.lower(): k for k in keys}
+    found: list[tuple[str, int, int, str | None]] = []
+    for content, seg_id in doc_segments(doc_data):
+        text, index_map = build_text_index(content)
+        for m in pattern.finditer(text):
+            key = lookup[m.group() if match_case else m.group().lower()]
+            start = index_map[m.start()]
+            found.append((key, start, start + utf16_len(m.group()), seg_id))
+    return found
+
+
+def stale_range_requests(doc_data: dict[str, Any]) -> list[dict[str, Any]]:
+    """deleteNamedRange requests for every anchor range already in the document."""
+    return [
+        {"deleteNamedRange": {"name": name}}
+        for name in (doc_data.get("namedRanges") or {})
+        if name.startswith(ANCHOR_RANGE_PREFIX)
+    ]
+
+
+def create_range_request(anchor: str, start: int, end: int, seg_id: str | None) -> dict[str, Any]:
+    """Build a createNamedRange request for an anchor's content."""
+    return {
+        "createNamedRange": {
+            "name": anchor_range_name(anchor),
+            "range": {"startIndex": start, "endIndex": end, "segmentId": seg_id},
+        }
+    }
+
+
+def fetch_document(*, doc_id: str, client_path: str, token_path: str) -> dict[str, Any]:
+    """Fetch document JSON (documents.get) with cached OAuth credentials."""
+    access_token = ensure_access_token(client=load_oauth_client(client_path), token_path=token_path)
+    return get_doc(document_id=doc_id, access_token=access_token)
+
+
+def plan_anchor_ranges(
+    doc_data: dict[str, Any],
+    replacements: dict[str, str],
+    *,
+    match_case: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Plan named ranges for where replaceAllText puts each value.
+
+    The placeholders' positions in the unfilled document are exact; every
+    occurrence moves by the length change of the occurrences before it in the
+    same segment. Empty values leave nothing to track and are skipped.
+
+    Args:
+        doc_data: Document JSON fetched before the replacements were applied
+        replacements: Applied replacements (values as inserted, with markers)
+        match_case: Whether replaceAllText matched case
+
+    Returns:
+        deleteNamedRange requests for stale ranges, then createNamedRange requests
+    """
+    requests = stale_range_requests(doc_data)
+    shift: dict[str | None, int] = {}
+    for key, start, end, seg_id in find_placeholders(doc_data, list(replacements), match_case=match_case):
+        value = replacements.get(key) or ""
+        offset = shift.get(seg_id, 0)
+        shift[seg_id] = offset + utf16_len(value) - (end - start)
+        if value:
+            requests.append(create_range_request(key, start + offset, start + offset + utf16_len(value), seg_id))
+    return requests
+
+
+def register_anchor_ranges(
+    *,
+    doc_id: str,
+    doc_data: dict[str, Any],
+    replacements: dict[str, str],
+    client_path: str,
+    token_path: str,
+    match_case: bool = False,
+) -> int:
+    """
+    Register a named range per filled placeholder, right after replaceAllText.
+
+    Must run before bullet markers are removed; the ranges then shrink with the
+    cleanup like any Docs named range.
+
+    Args:
+        doc_id: Google Doc ID
+        doc_data: Document JSON fetched before the replacements were applied
+        replacements: Applied replacements
+        client_path: Path to OAuth client credentials
+        token_path: Path to token cache
+        match_case: Whether replaceAllText matched case
+
+    Returns:
+        Number of named ranges created
+    """
+    requests = plan_anchor_ranges(doc_data, replacements, match_case=match_case)
+    created = sum(1 for req in requests if "createNamedRange" in req)
+    if not created:
+        return 0
+    access_token = ensure_access_token(client=load_oauth_client(client_path), token_path=token_path)
+    docs_batch_update(document_id=doc_id, access_token=access_token, requests=requests)
+    log_line(f"📌 Registered {created} anchor named ranges.")
+    return created
@@ -0,0 +1,161 @@
+"""Batch rendering of replacements across many CV JSON files and variants."""
+
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator
+
+from .formatters import build_replacements
+from .memo import SECTION_MEMO
+from .utils import read_json
+
+LANGS = ("en", "ru")
+_LANG_SUFFIX_RE = re.compile(r"\.(en|ru)\.json$")
+
+
+def deep_merge(base: Any, override: Any) -> Any:
+    """
+    Merge override into base: dicts merge recursively, anything else replaces.
+
+    Args:
+        base: Base value (not modified)
+        override: Values to apply on top
+
+    Returns:
+        New merged value
+    """
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for key, value in override.items():
+            merged[key] = deep_merge(base.get(key), value)
+        return merged
+    return override
+
+
+def lang_from_path(path: str, default: str = "en") -> str:
+    """Infer label language from a cv.<name>.<lang>.json file name."""
+    match = _LANG_SUFFIX_RE.search(os.path.basename(path))
+    return match.group(1) if match else default
+
+
+def is_manifest(data: Any) -> bool:
+    """Check if JSON data is a variant manifest rather than CV data."""
+    return isinstance(data, dict) and isinstance(data.get("variants"), (dict, list)) and "base" in data
+
+
+def expand_inputs(patterns: Iterable[str]) -> list[str]:
+    """Expand glob patterns into a sorted, de-duplicated list of JSON files."""
+    paths: list[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.isfile(pattern) else [])
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def iter_jobs(paths: Iterable[str], langs: list[str] | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Turn input files into render jobs (one per input, variant and language).
+
+    CV data files render once per language. Variant manifests look like
+    {"base": "cv.hard_skills.en.json", "variants": {"name": {...overrides}}}
+    (or a list of {"name": ..., "data": {...}}) and render every variant deep-merged
+    over the base file, which is resolved relative to the manifest.
+
+    Args:
+        paths: JSON files (CV data or manifests)
+        langs: Languages to render; None infers from each file name
+
+    Yields:
+        Job dicts with input, variant, lang and data (or error/skipped)
+    """
+    for path in paths:
+        try:
+            data = read_json(path)
+        except (OSError, ValueError) as exc:
+            yield {"input": path, "variant": None, "lang": None, "error": f"cannot read JSON: {exc}"}
+            continue
+
+        if is_manifest(data):
+            base_path = os.path.join(os.path.dirname(path), data["base"])
+            try:
+                base = read_json(base_path)
+            except (OSError, ValueError) as exc:
+                yield {"input": path, "variant": None, "lang": None, "error": f"cannot read base {base_path}: {exc}"}
+                continue
+            variants = data["variants"]
+            if isinstance(variants, dict):
+                variants = [{"name": name, "data": override} for name, override in variants.items()]
+            for idx, variant in enumerate(variants):
+                name = variant.get("name") or str(idx)
+                merged = deep_merge(base, variant.get("data") or {})
+                for lang in langs or [data.get("lang") or lang_from_path(base_path)]:
+                    yield {"input": path, "variant": name, "lang": lang, "data": merged}
+            continue
+
+        # Replacements files ({"replacements": {...}} or flat {"{{key}}": ...}) are outputs, not inputs.
+        if not isinstance(data, dict) or "replacements" in data or any(str(k).startswith("{{") for k in data):
+            yield {"input": path, "variant": None, "lang": None, "skipped": "not structured CV data"}
+            continue
+        for lang in langs or [lang_from_path(path)]:
+            yield {"input": path, "variant": None, "lang": lang, "data": data}
+
+
+def render_job(job: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build replacements for one job (runs in a worker process).
+
+    Args:
+        job: Job from iter_jobs()
+
+    Returns:
+        JSONL record with timing and replacements, or the error
+    """
+    record = {"input": job["input"], "variant": job["variant"], "lang": job["lang"]}
+    for key in ("error", "skipped"):
+        if key in job:
+            record[key] = job[key]
+            return record
+    started = time.perf_counter()
+    try:
+        replacements = build_replacements(job["data"], lang=job["lang"])
+    except Exception as exc:  # noqa: BLE001 - one bad input must not stop the batch
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        return record
+    record["ms"] = round((time.perf_counter() - started) * 1000, 3)
+    record["replacements"] = replacements
+    return record
+
+
+def _init_worker(memo_path: str | None) -> None:
+    if memo_path:
+        SECTION_MEMO.load(memo_path)
+
+
+def run_batch(
+    jobs: Iterable[dict[str, Any]],
+    *,
+    workers: int | None = None,
+    memo_path: str | None = None,
+    chunksize: int = 8,
+) -> Iterator[dict[str, Any]]:
+    """
+    Render jobs across a process pool, yielding records in input order as they complete.
+
+    Args:
+        jobs: Jobs from iter_jobs()
+        workers: Worker processes (None = CPU count, 1 = run in this process)
+        memo_path: Persisted section memo to preload in every worker
+        chunksize: Jobs sent to a worker per round-trip
+
+    Yields:
+        JSONL-ready records
+    """
+    if workers == 1:
+        _init_worker(memo_path)
+        for job in jobs:
+            yield render_job(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(memo_path,)) as pool:
+        yield from pool.map(render_job, jobs, chunksize=chunksize)
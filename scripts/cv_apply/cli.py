@@ -29,6 +29,7 @@ def apply_with_auto_auth(
     auto_auth: bool,
     client: str | None,
     token: str | None,
+    document_id: str | None = None,
 ) -> None:
     """
     Apply replacements to Google Doc with automatic re-authentication.
@@ -42,8 +43,10 @@ def apply_with_auto_auth(
         auto_auth: Whether to auto-authenticate on token expiry
         client: Path to OAuth client credentials
         token: Path to token cache
+        document_id: Target by ID instead of name (docs not in the links file)
     """
-    cmd = [sys.executable, gdocs_cli, "apply", "--doc", doc, "--data", data_path]
+    target = ["--document-id", document_id] if document_id else ["--doc", doc]
+    cmd = [sys.executable, gdocs_cli, "apply", *target, "--data", data_path]
     if match_case:
         cmd.append("--match-case")
     if dry_run:
@@ -30,6 +30,9 @@ BLOCK_LANDMARKS = {
     "{{publications}}": "Publications",
 }
 
+# Prefix of Docs named ranges that track where an anchor's content lives
+ANCHOR_RANGE_PREFIX = "cv_anchor:"
+
 # Header anchors that should have tight spacing
 TIGHT_ANCHORS = [
     "{{fullname}}",
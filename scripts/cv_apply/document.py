@@ -80,6 +80,44 @@ def iter_all_paragraphs(content: list[dict[str, Any]]) -> Iterator[dict[str, Any
                     yield from iter_all_paragraphs(cell.get("content") or [])
 
 
+def utf16_len(text: str) -> int:
+    """Length of text in UTF-16 code units (the unit of Docs API indices)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def build_text_index(content: list[dict[str, Any]]) -> tuple[str, list[int]]:
+    """
+    Concatenate all paragraph text and map every character to its document index.
+
+    Args:
+        content: Segment content items (body, header or footer)
+
+    Returns:
+        Tuple of (text, index of each character)
+    """
+    chars: list[str] = []
+    index_map: list[int] = []
+    for item in iter_all_paragraphs(content):
+        for element in item.get("paragraph", {}).get("elements", []):
+            tr = element.get("textRun")
+            if not tr:
+                continue
+            pos = element.get("startIndex") or 0
+            for char in tr.get("content", ""):
+                chars.append(char)
+                index_map.append(pos)
+                pos += utf16_len(char)
+    return "".join(chars), index_map
+
+
+def paragraph_at(content: list[dict[str, Any]], index: int) -> dict[str, Any] | None:
+    """Find the paragraph item (including inside tables) that contains a document index."""
+    for item in iter_all_paragraphs(content):
+        if (item.get("startIndex") or 0) <= index < (item.get("endIndex") or 0):
+            return item
+    return None
+
+
 def get_paragraph_text(item: dict[str, Any]) -> str:
     """Extract stripped text from a paragraph item."""
     para = item.get("paragraph")
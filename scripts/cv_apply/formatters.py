@@ -3,10 +3,12 @@
 from typing import Any
 
 from .constants import SKILL_BULLET_MARKER, EXP_BULLET_MARKER
+from .memo import memoize_section
 from .translations import Lang, get_label
 from .utils import normalize_text, normalize_list, format_block
 
 
+@memoize_section("summary")
 def format_summary(data: dict[str, Any]) -> str:
     """Format summary section from CV data."""
     summary = data.get("summary")
@@ -23,6 +25,7 @@ def format_summary(data: dict[str, Any]) -> str:
     return "\n".join(parts)
 
 
+@memoize_section("skills")
 def format_skills(data: dict[str, Any]) -> str:
     """Format skills section from CV data."""
     skills = data.get("skills") or []
@@ -95,6 +98,7 @@ def format_experience_block(item: dict[str, Any], lang: Lang = "en") -> str:
     return format_block(lines)
 
 
+@memoize_section("experience", uses_lang=True)
 def format_experiences(data: dict[str, Any], lang: Lang = "en") -> tuple[str, str]:
     """
     Format experience section, separating main experience and entrepreneurship.
@@ -131,6 +135,7 @@ def format_experiences(data: dict[str, Any], lang: Lang = "en") -> tuple[str, st
     return "\n\n\n".join(exp_lines), "\n\n\n".join(ent_lines)
 
 
+@memoize_section("education")
 def format_education(data: dict[str, Any]) -> str:
     """Format education section from CV data."""
     education = data.get("education") or {}
@@ -158,6 +163,7 @@ def format_education(data: dict[str, Any]) -> str:
     return " - ".join(parts)
 
 
+@memoize_section("publications")
 def format_publications(data: dict[str, Any]) -> str:
     """Format publications section from CV data."""
     publications = data.get("publications")
@@ -0,0 +1,462 @@
+"""Persistent SQLite job queue and a worker pool for apply/reset/theme/export jobs."""
+
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from .utils import log_line
+
+# Import gdocs_cli functions
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from gdocs_cli import ensure_access_token, load_oauth_client
+
+DEFAULT_LEASE_SECONDS = 900
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30.0
+POLL_SECONDS = 1.0
+
+# Job statuses: queued -> leased -> done, or back to queued (retry) / dead (dead letter)
+STATUSES = ("queued", "leased", "done", "dead")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    doc TEXT,
+    args TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_doc ON jobs (doc, status);
+"""
+
+# Next runnable job: queued and due (or leased with an expired lease), and no
+# earlier unfinished job for the same document, so jobs per document run one
+# at a time and in order.
+_NEXT_JOB = """
+SELECT * FROM jobs AS j
+WHERE ((j.status = 'queued' AND j.available_at <= :now)
+       OR (j.status = 'leased' AND j.lease_until < :now AND j.attempts < j.max_attempts))
+  AND (j.doc IS NULL OR NOT EXISTS (
+        SELECT 1 FROM jobs AS o
+        WHERE o.doc = j.doc AND o.id < j.id AND o.status IN ('queued', 'leased')))
+ORDER BY j.id
+LIMIT 1
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    doc: str | None
+    args: list[str]
+    attempts: int
+    max_attempts: int
+
+
+def _job(row: sqlite3.Row) -> Job:
+    return Job(
+        id=row["id"],
+        kind=row["kind"],
+        doc=row["doc"],
+        args=json.loads(row["args"]),
+        attempts=row["attempts"],
+        max_attempts=row["max_attempts"],
+    )
+
+
+def worker_name(index: int = 0) -> str:
+    """Lease owner name for a worker thread of this process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class JobQueue:
+    """SQLite-backed queue (WAL mode); one instance per thread."""
+
+    def __init__(self, path: str, *, timeout: float = 30.0):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; BEGIN IMMEDIATE takes the write lock up front."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        kind: str,
+        args: list[str],
+        *,
+        doc: str | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        delay: float = 0.0,
+    ) -> int:
+        """
+        Add a job.
+
+        Args:
+            kind: Job kind (key in the runner's executors)
+            args: Extra command-line arguments for the job
+            doc: Document the job edits (jobs for one document never run concurrently)
+            max_attempts: Attempts before the job is dead-lettered
+            delay: Seconds before the job becomes runnable
+
+        Returns:
+            Job ID
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            return conn.execute(
+                "INSERT INTO jobs (kind, doc, args, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, doc, json.dumps(args), max(1, max_attempts), now + delay, now, now),
+            ).lastrowid
+
+    def lease(self, owner: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS, now: float | None = None) -> Job | None:
+        """
+        Lease the next runnable job.
+
+        Leases left by a crashed worker expire and are taken over; a job whose
+        expired lease used up its attempts is dead-lettered instead.
+
+        Args:
+            owner: Lease owner (see worker_name())
+            lease_seconds: Lease duration
+            now: Current time (default: time.time())
+
+        Returns:
+            Leased job, or None if nothing is runnable
+        """
+        now = time.time() if now is None else now
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', last_error = COALESCE(last_error, 'lease expired'), "
+                "lease_owner = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = conn.execute(_NEXT_JOB, {"now": now}).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_until = ?, updated_at = ? WHERE id = ?",
+                (owner, now + lease_seconds, now, row["id"]),
+            )
+            job = _job(row)
+        job.attempts += 1
+        return job
+
+    def renew(self, job_id: int, owner: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease this owner still holds; False if it was lost to another worker."""
+        now = time.time()
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, owner),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: int, owner: str) -> bool:
+        """Mark a leased job done; False if the lease was lost to another worker."""
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', lease_owner = NULL, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time(), job_id, owner),
+            )
+        return cur.rowcount == 1
+
+    def fail(
+        self,
+        job_id: int,
+        owner: str,
+        error: str,
+        *,
+        retry_base: float = RETRY_BASE_SECONDS,
+        now: float | None = None,
+    ) -> str | None:
+        """
+        Record a failed attempt: retry with exponential backoff, or dead-letter.
+
+        Args:
+            job_id: Job ID
+            owner: Lease owner
+            error: Error message
+            retry_base: Backoff after the first failure (doubles per attempt)
+            now: Current time (default: time.time())
+
+        Returns:
+            New status ("queued" or "dead"), or None if the lease was lost
+        """
+        now = time.time() if now is None else now
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (job_id, owner),
+            ).fetchone()
+            if row is None:
+                return None
+            status = "queued" if row["attempts"] < row["max_attempts"] else "dead"
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_until = NULL, last_error = ?, "
+                "available_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, now + retry_base * 2 ** (row["attempts"] - 1), now, job_id),
+            )
+        return status
+
+    def release_leases(self) -> int:
+        """Return every leased job to the queue (after a crash, when no worker is running)."""
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'dead' END, "
+                "lease_owner = NULL, lease_until = NULL, available_at = ?, updated_at = ? WHERE status = 'leased'",
+                (time.time(), time.time()),
+            ).rowcount
+
+    def requeue(self, job_id: int | None = None) -> int:
+        """Move dead-lettered jobs (all, or one) back to the queue with fresh attempts."""
+        sql = "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ? WHERE status = 'dead'"
+        params: tuple[Any, ...] = (time.time(), time.time())
+        if job_id is not None:
+            sql += " AND id = ?"
+            params += (job_id,)
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def pending(self) -> int:
+        """Number of jobs not yet done or dead-lettered."""
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')").fetchone()[0]
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per status."""
+        counts = dict.fromkeys(STATUSES, 0)
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def list_jobs(self, status: str | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        """List jobs (newest first), optionally filtered by status."""
+        sql = "SELECT * FROM jobs"
+        params: tuple[Any, ...] = ()
+        if status:
+            sql += " WHERE status = ?"
+            params += (status,)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        jobs = []
+        for row in self.conn.execute(sql, params):
+            job = dict(row)
+            job["args"] = json.loads(job["args"])
+            jobs.append(job)
+        return jobs
+
+
+class SharedToken:
+    """Refresh the OAuth token once for all workers, before jobs read it from the cache."""
+
+    def __init__(self, client_path: str, token_path: str, *, min_ttl_seconds: int = 600):
+        self.client_path = client_path
+        self.token_path = token_path
+        self.min_ttl_seconds = min_ttl_seconds
+        self._lock = threading.Lock()
+
+    def __call__(self, job: Job) -> None:
+        with self._lock:
+            ensure_access_token(
+                client=load_oauth_client(self.client_path),
+                token_path=self.token_path,
+                min_ttl_seconds=self.min_ttl_seconds,
+            )
+
+
+Executor = Callable[[Job], int | None]
+
+
+def run_job(job: Job, executors: dict[str, Executor]) -> None:
+    """
+    Run one job; raise RuntimeError if it fails.
+
+    Args:
+        job: Leased job
+        executors: Job kind -> callable returning an exit code
+    """
+    executor = executors.get(job.kind)
+    if executor is None:
+        raise RuntimeError(f"Unknown job kind: {job.kind!r}")
+    try:
+        code = executor(job)
+    except SystemExit as exc:
+        code = exc.code
+    if code not in (0, None):
+        raise RuntimeError(code if isinstance(code, str) else f"exit code {code}")
+
+
+@contextmanager
+def _heartbeat(path: str, job: Job, owner: str, lease_seconds: float) -> Iterator[None]:
+    # Renews the lease every third of its length while the job runs, so a job that outlives
+    # --lease is not taken over (and its document written twice) while this worker is alive.
+    done = threading.Event()
+
+    def beat() -> None:
+        with JobQueue(path) as queue:
+            while not done.wait(lease_seconds / 3):
+                if not queue.renew(job.id, owner, lease_seconds=lease_seconds):
+                    return
+
+    thread = threading.Thread(target=beat, name=f"cv-job-heartbeat-{job.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def _worker(
+    index: int,
+    path: str,
+    executors: dict[str, Executor],
+    *,
+    lease_seconds: float,
+    retry_base: float,
+    drain: bool,
+    poll: float,
+    before_job: Callable[[Job], None] | None,
+    stop: threading.Event,
+    totals: dict[str, int],
+    lock: threading.Lock,
+) -> None:
+    owner = worker_name(index)
+    with JobQueue(path) as queue:
+        while not stop.is_set():
+            job = queue.lease(owner, lease_seconds=lease_seconds)
+            if job is None:
+                if drain and not queue.pending():
+                    return
+                stop.wait(poll)
+                continue
+
+            label = f"#{job.id} {job.kind}" + (f" {job.doc!r}" if job.doc else "")
+            log_line(f"▶️ [{index}] {label} (attempt {job.attempts}/{job.max_attempts})")
+            try:
+                with _heartbeat(path, job, owner, lease_seconds):
+                    if before_job:
+                        before_job(job)
+                    run_job(job, executors)
+            except (Exception, SystemExit) as exc:  # noqa: BLE001 - scripts report errors via SystemExit
+                status = queue.fail(job.id, owner, str(exc) or type(exc).__name__, retry_base=retry_base)
+                log_line(f"❌ [{index}] {label}: {exc} -> {status or 'lease lost'}")
+                outcome = "dead" if status == "dead" else "failed"
+            else:
+                queue.complete(job.id, owner)
+                log_line(f"✅ [{index}] {label}")
+                outcome = "done"
+            with lock:
+                totals[outcome] += 1
+
+
+def run_workers(
+    path: str,
+    executors: dict[str, Executor],
+    *,
+    workers: int = 1,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    retry_base: float = RETRY_BASE_SECONDS,
+    drain: bool = True,
+    poll: float = POLL_SECONDS,
+    before_job: Callable[[Job], None] | None = None,
+) -> dict[str, int]:
+    """
+    Run N worker threads over the queue.
+
+    Workers share the process (and so the module-level token cache and section
+    memo); jobs for one document are serialized by the queue itself, so
+    several runners may work the same queue file.
+
+    Args:
+        path: Queue database path
+        executors: Job kind -> callable(job) returning an exit code
+        workers: Number of worker threads
+        lease_seconds: Lease duration (a crashed worker's jobs are retried after it)
+        retry_base: Backoff after a first failure (doubles per attempt)
+        drain: Stop once no job is queued or leased (otherwise run until interrupted)
+        poll: Seconds between polls when nothing is runnable
+        before_job: Hook run before each job (e.g. SharedToken)
+
+    Returns:
+        Counts of jobs done, failed (will retry) and dead-lettered
+    """
+    stop = threading.Event()
+    totals = {"done": 0, "failed": 0, "dead": 0}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(i, path, executors),
+            kwargs={
+                "lease_seconds": lease_seconds,
+                "retry_base": retry_base,
+                "drain": drain,
+                "poll": poll,
+                "before_job": before_job,
+                "stop": stop,
+                "totals": totals,
+                "lock": lock,
+            },
+            name=f"cv-job-worker-{i}",
+            daemon=True,
+        )
+        for i in range(max(1, workers))
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        # Running jobs are abandoned; their leases expire and they are retried.
+        stop.set()
+        raise
+    return totals
@@ -0,0 +1,141 @@
+"""Section-fingerprint memoization for CV formatters."""
+
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from .utils import read_json, write_json
+
+# Bump when formatter output changes so persisted entries are not reused.
+MEMO_VERSION = 1
+DEFAULT_MAXSIZE = 1024
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def fingerprint(section: str, value: Any, lang: str | None = None) -> str:
+    """
+    Build a stable hash of one section's input.
+
+    Args:
+        section: Section name (also namespaces the key per formatter)
+        value: Section input as found in the CV data
+        lang: Language for labels, if the formatter depends on it
+
+    Returns:
+        Hex digest that is equal for equal inputs regardless of key order
+    """
+    payload = json.dumps(
+        [MEMO_VERSION, section, lang, value],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SectionMemo:
+    """Bounded LRU of formatted sections keyed by fingerprint; safe to share between threads."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return (found, value) and mark the entry as recently used."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond maxsize."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path: str) -> None:
+        """Persist entries (oldest first) to a JSON file."""
+        with self._lock:
+            entries = list(self._entries.items())
+        write_json(path, {"version": MEMO_VERSION, "entries": entries})
+
+    def load(self, path: str) -> int:
+        """
+        Load entries persisted by save(); missing or stale files are ignored.
+
+        Returns:
+            Number of entries loaded
+        """
+        try:
+            data = read_json(path)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        if not isinstance(data, dict) or data.get("version") != MEMO_VERSION:
+            return 0
+        loaded = 0
+        for item in data.get("entries") or []:
+            if not isinstance(item, list) or len(item) != 2:
+                continue
+            key, value = item
+            # JSON has no tuples; format_experiences returns (main, entrepreneurship).
+            self.put(key, tuple(value) if isinstance(value, list) else value)
+            loaded += 1
+        return loaded
+
+
+SECTION_MEMO = SectionMemo()
+
+
+def memoize_section(section: str, *, uses_lang: bool = False) -> Callable[[F], F]:
+    """
+    Memoize a formatter on the fingerprint of data[section] (plus lang).
+
+    Args:
+        section: Key of the CV data the formatter reads
+        uses_lang: Whether the formatter output depends on lang
+
+    Returns:
+        Decorator for functions with signature (data, lang="en")
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(data: dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+            memo = SECTION_MEMO
+            if memo.maxsize <= 0:
+                return func(data, *args, **kwargs)
+            lang = (args[0] if args else kwargs.get("lang", "en")) if uses_lang else None
+            key = fingerprint(f"{func.__name__}:{section}", data.get(section), lang)
+            found, value = memo.get(key)
+            if found:
+                return value
+            value = func(data, *args, **kwargs)
+            memo.put(key, value)
+            return value
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
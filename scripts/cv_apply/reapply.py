@@ -0,0 +1,259 @@
+"""Direct old -> new re-apply of a filled document using the recorded state."""
+
+import json
+import os
+import re
+import sys
+from typing import Any
+
+from .anchors import Range, anchor_range_name, doc_segments, named_anchor_ranges
+from .constants import BLOCK_LANDMARKS
+from .document import build_text_index, find_section_range, utf16_len
+from .state import get_doc_state
+from .utils import log_line, strip_markers
+from .writer import ParagraphShifts, value_requests
+
+# Import gdocs_cli functions
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from gdocs_cli import docs_batch_update_planned, ensure_access_token, get_doc, load_oauth_client
+
+
+def diff_replacements(old: dict[str, str], new: dict[str, str]) -> dict[str, tuple[str, str]]:
+    """
+    Find anchors whose document text changes.
+
+    Args:
+        old: Replacements recorded for the document (markers are ignored)
+        new: Replacements to apply now
+
+    Returns:
+        Anchor -> (old text as it appears in the document, new value)
+    """
+    changed: dict[str, tuple[str, str]] = {}
+    for key, value in new.items():
+        before = strip_markers(old.get(key) or "")
+        if before != strip_markers(value or ""):
+            changed[key] = (before, value or "")
+    return changed
+
+
+def _find_text(segments: list[tuple[list[dict[str, Any]], str | None]], value: str) -> list[Range]:
+    # Same matching rules as reset: short single words need word boundaries.
+    pattern = re.escape(value)
+    if len(value) < 10 and " " not in value:
+        pattern = rf"\b{pattern}\b"
+    found: list[Range] = []
+    for content, seg_id in segments:
+        text, index_map = build_text_index(content)
+        for m in re.finditer(pattern, text):
+            last = m.end() - 1
+            found.append((index_map[m.start()], index_map[last] + utf16_len(text[last]), seg_id))
+    return found
+
+
+def _overlaps(r: Range, others: list[Range]) -> bool:
+    return any(r[2] == o[2] and r[0] < o[1] and r[1] > o[0] for o in others)
+
+
+def locate_anchors(
+    doc_data: dict[str, Any],
+    old: dict[str, str],
+    anchors: list[str],
+) -> tuple[dict[str, list[Range]], list[str], list[str]]:
+    """
+    Locate the current content of anchors in a filled document.
+
+    Named ranges win; otherwise block anchors use their section landmark and
+    other anchors a text search for the recorded value (outside block sections).
+
+    Args:
+        doc_data: Document JSON from documents.get
+        old: Recorded replacements for the document
+        anchors: Anchors to locate
+
+    Returns:
+        Tuple of (anchor -> ranges, anchors not found, anchors whose recorded
+        value is shared with another anchor and so cannot be told apart)
+    """
+    named = named_anchor_ranges(doc_data)
+    segments = doc_segments(doc_data)
+    body = segments[0][0]
+
+    blocks: dict[str, Range] = {}
+    for anchor, header in BLOCK_LANDMARKS.items():
+        if anchor not in old or anchor in named:
+            continue
+        r = find_section_range(body, header, level=2) or find_section_range(body, header, level=0)
+        if r:
+            blocks[anchor] = (r[0], r[1], None)
+    block_ranges = list(blocks.values()) + [r for a in BLOCK_LANDMARKS for r in named.get(a, [])]
+
+    # Which anchors share a recorded value (their text cannot tell them apart)
+    owners: dict[str, set[str]] = {}
+    for key, value in old.items():
+        text = strip_markers(value or "")
+        if text.strip():
+            owners.setdefault(text, set()).add(key)
+
+    located: dict[str, list[Range]] = {}
+    missing: list[str] = []
+    ambiguous: list[str] = []
+    for anchor in anchors:
+        if anchor in named:
+            located[anchor] = named[anchor]
+            continue
+        if anchor in BLOCK_LANDMARKS:
+            if anchor in blocks:
+                located[anchor] = [blocks[anchor]]
+            else:
+                missing.append(anchor)
+            continue
+        text = strip_markers(old.get(anchor) or "")
+        if len(owners.get(text, ())) > 1:
+            ambiguous.append(anchor)
+            continue
+        ranges = [r for r in _find_text(segments, text) if not _overlaps(r, block_ranges)] if text.strip() else []
+        if ranges:
+            located[anchor] = ranges
+        else:
+            missing.append(anchor)
+    return located, missing, ambiguous
+
+
+def _terminal_indices(doc_data: dict[str, Any]) -> dict[str | None, int]:
+    return {
+        seg_id: (content[-1].get("endIndex") or 0) if content else 0
+        for content, seg_id in doc_segments(doc_data)
+    }
+
+
+def plan_reapply(
+    doc_data: dict[str, Any],
+    old: dict[str, str],
+    new: dict[str, str],
+) -> tuple[list[dict[str, Any]], list[str], list[str], list[str]]:
+    """
+    Build one batchUpdate that rewrites only the changed anchor values.
+
+    Edits are emitted from the end of each segment backwards, so every request's
+    indices are valid when it runs. Values are written by the structural writer
+    (sections come with their bullets and styles), and every rewritten value
+    gets a fresh anchor named range.
+
+    Args:
+        doc_data: Document JSON from documents.get
+        old: Recorded replacements for the document
+        new: Replacements to apply now
+
+    Returns:
+        Tuple of (requests, rewritten anchors, changed anchors not found in the
+        document, changed anchors that cannot be located unambiguously)
+    """
+    changed = diff_replacements(old, new)
+    located, missing, ambiguous = locate_anchors(doc_data, old, sorted(changed))
+    if ambiguous:
+        return [], [], missing, ambiguous
+
+    terminal = _terminal_indices(doc_data)
+    named = named_anchor_ranges(doc_data)
+    edits: list[tuple[int, int, str | None, str]] = []
+    for anchor, ranges in located.items():
+        for start, end, seg_id in ranges:
+            if anchor in BLOCK_LANDMARKS and anchor not in named:
+                # A landmark range covers whole paragraphs: keep the last newline (and the segment's final one).
+                term = terminal.get(seg_id)
+                end = (min(end, term) if term is not None else end) - 1
+            edits.append((start, end, seg_id, anchor))
+
+    edits.sort(key=lambda e: e[0], reverse=True)
+    requests: list[dict[str, Any]] = [
+        {"deleteNamedRange": {"name": anchor_range_name(anchor)}} for anchor in sorted(located) if anchor in named
+    ]
+    shifts = ParagraphShifts(doc_data)
+    taken: list[Range] = []
+    for start, end, seg_id, anchor in edits:
+        if _overlaps((start, end, seg_id), taken):
+            raise SystemExit(f"Overlapping anchor ranges at {start}-{end}; run --reset and apply instead.")
+        taken.append((start, end, seg_id))
+        value = changed[anchor][1]
+        para_start, tail = shifts.bounds(seg_id, start, end)
+        if start < end:
+            requests.append({"deleteContentRange": {"range": {"startIndex": start, "endIndex": end, "segmentId": seg_id}}})
+        requests.extend(value_requests(anchor, value, start=start, para_start=para_start, tail=tail, seg_id=seg_id))
+        shifts.record(seg_id, start, end - start, utf16_len(strip_markers(value)))
+    return requests, sorted(located), missing, []
+
+
+def reapply_document(
+    *,
+    doc: str,
+    doc_id: str | None,
+    replacements: dict[str, str],
+    state_file: str,
+    client_path: str,
+    token_path: str,
+    dry_run: bool = False,
+) -> tuple[str, list[str]]:
+    """
+    Rewrite changed anchor values in place, without a reset round-trip.
+
+    Args:
+        doc: Document name (key in the state file)
+        doc_id: Document ID (default: the one recorded in state)
+        replacements: Replacements to apply now
+        state_file: Path to state file
+        client_path: Path to OAuth client credentials
+        token_path: Path to token cache
+        dry_run: Print the planned requests instead of sending them
+
+    Returns:
+        Tuple of (document ID, anchors rewritten in the document)
+    """
+    doc_state = get_doc_state(state_file, doc)
+    if not doc_state:
+        raise SystemExit(f"No saved state for doc {doc!r} in {state_file}; apply it once first.")
+    old = doc_state.get("replacements")
+    if not isinstance(old, dict):
+        raise SystemExit(f"Invalid stored replacements for doc {doc!r}")
+    doc_id = doc_id or doc_state.get("doc_id")
+    if not doc_id:
+        raise SystemExit(f"Document ID unknown for {doc!r}")
+
+    access_token = ensure_access_token(client=load_oauth_client(client_path), token_path=token_path)
+    doc_data = get_doc(document_id=doc_id, access_token=access_token)
+    requests, changed, missing, ambiguous = plan_reapply(doc_data, old, replacements)
+
+    if ambiguous:
+        log_line("⚠️ Previous values shared by several anchors (cannot tell them apart):")
+        for anchor in ambiguous:
+            log_line(f"  - {anchor}")
+        raise SystemExit("Nothing changed. Run --reset and apply instead.")
+    if missing:
+        # Usually placeholders the template does not contain; empty previous values also land here.
+        log_line("ℹ️ Changed but not found in document (run --reset and apply if they should appear):")
+        for anchor in missing:
+            log_line(f"  - {anchor}")
+    if not changed:
+        log_line("ℹ️ No anchor values changed.")
+        return doc_id, []
+
+    log_line(f"🔁 Changed anchors: {len(changed)}")
+    for anchor in changed:
+        log_line(f"  - {anchor}")
+    if dry_run:
+        print(json.dumps({"documentId": doc_id, "requests": requests}, ensure_ascii=False, indent=2))
+        return doc_id, changed
+
+    def plan(current: dict[str, Any]) -> list[list[dict[str, Any]]]:
+        if current is doc_data:
+            return [requests]
+        replanned, _, _, still_ambiguous = plan_reapply(current, old, replacements)
+        if still_ambiguous:
+            raise SystemExit("Document changed during re-apply and can no longer be matched; run --reset and apply.")
+        requests[:] = replanned
+        return [replanned]
+
+    docs_batch_update_planned(document_id=doc_id, access_token=access_token, plan=plan, doc=doc_data)
+    log_line(f"✅ Re-applied {len(changed)} anchors in one batch ({len(requests)} requests).")
+    return doc_id, changed
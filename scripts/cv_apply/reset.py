@@ -5,18 +5,19 @@ import sys
 import os
 from typing import Any
 
+from .anchors import anchor_range_name, named_anchor_ranges
 from .constants import BLOCK_LANDMARKS
 from .document import (
     find_section_range,
     iter_all_paragraphs,
 )
-from .state import read_state, invert_replacements
+from .state import get_doc_state, invert_replacements
 from .utils import log_line
 
 # Import gdocs_cli functions
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, ROOT_DIR)
-from gdocs_cli import docs_batch_update, ensure_access_token, get_doc, load_oauth_client
+from gdocs_cli import docs_batch_update_planned, ensure_access_token, load_oauth_client
 
 
 def reset_document(
@@ -42,8 +43,7 @@ def reset_document(
     """
     from .document import find_doc_info
 
-    state = read_state(state_file)
-    doc_state = (state.get("docs") or {}).get(doc)
+    doc_state = get_doc_state(state_file, doc)
     if not doc_state:
         raise SystemExit(f"No saved state for doc {doc!r} in {state_file}")
 
@@ -80,8 +80,32 @@ def reset_document(
 
     access_token = ensure_access_token(client=load_oauth_client(client_path), token_path=token_path)
     log_line("🚀 Scanning document for reset...")
-    doc_data = get_doc(document_id=doc_id, access_token=access_token)
+    applied: list[int] = [0]
 
+    def plan(doc_data: dict[str, Any]) -> list[list[dict[str, Any]]]:
+        requests, applied[0] = plan_reset(doc_data, stored_replacements)
+        return [requests] if applied[0] else []
+
+    docs_batch_update_planned(document_id=doc_id, access_token=access_token, plan=plan)
+    if applied[0]:
+        log_line(f"✅ Reset complete. Reverted {applied[0]} anchors.")
+    else:
+        log_line("ℹ️ Nothing to reset.")
+
+    return 0
+
+
+def plan_reset(doc_data: dict[str, Any], stored_replacements: dict[str, str]) -> tuple[list[dict[str, Any]], int]:
+    """
+    Plan the requests that turn filled content back into placeholders.
+
+    Args:
+        doc_data: Document JSON from documents.get
+        stored_replacements: Anchor -> value as it appears in the document
+
+    Returns:
+        Tuple of (requests, number of anchors reverted)
+    """
     # Segment-aware processing (Body + Headers + Footers)
     segments = [(doc_data.get("body", {}).get("content", []), None)]
     for hid, h in doc_data.get("headers", {}).items():
@@ -93,6 +117,17 @@ def reset_document(
     all_matches = []
     processed_anchors = set()
 
+    # 0. Named ranges registered at apply time: exact, no scanning
+    named = named_anchor_ranges(doc_data)
+    for anchor, ranges in named.items():
+        if anchor not in stored_replacements:
+            continue
+        for s, e, seg_id in ranges:
+            all_matches.append((s, e, anchor, seg_id, True))
+        processed_anchors.add(anchor)
+    if named:
+        log_line(f"📌 Anchor named ranges: {len(processed_anchors)}")
+
     # 1. Landmark-based reset for major blocks
     for seg_content, seg_id in segments:
         term_idx = seg_content[-1].get("endIndex") or 0 if seg_content else 0
@@ -108,7 +143,7 @@ def reset_document(
             if not r:
                 r = find_section_range(seg_content, header, level=0)
             if r:
-                all_matches.append((r[0], r[1], anchor, seg_id))
+                all_matches.append((r[0], r[1], anchor, seg_id, False))
                 processed_anchors.add(anchor)
                 log_line(f"📍 Found block landmark for {anchor} in {'Body' if not seg_id else seg_id}")
 
@@ -150,20 +185,21 @@ def reset_document(
                         g_end = index_map[m.end()]
                     else:
                         g_end = index_map[m.end() - 1] + 1
-                    all_matches.append((g_start, g_end, anchor, seg_id))
+                    all_matches.append((g_start, g_end, anchor, seg_id, False))
 
     if not all_matches:
         log_line("ℹ️ No content found to reset.")
-        return 0
+        return [], 0
 
     # Sort matches by startIndex DESCENDING (within segments)
     all_matches.sort(key=lambda x: (x[1], -x[0]), reverse=True)
 
-    requests = []
+    # Content goes back to placeholders, so the anchor ranges are stale
+    requests = [{"deleteNamedRange": {"name": anchor_range_name(anchor)}} for anchor in named]
     applied_count = 0
     pushed_ranges = {}
 
-    for s, e, anchor, seg_id in all_matches:
+    for s, e, anchor, seg_id, is_named in all_matches:
         if s >= e:
             continue
 
@@ -213,7 +249,8 @@ def reset_document(
         })
 
         text_to_insert = anchor
-        if anchor in BLOCK_LANDMARKS:
+        # Named ranges end before the paragraph newline; landmark ranges include it
+        if anchor in BLOCK_LANDMARKS and not is_named:
             text_to_insert += "\n"
 
         requests.append({
@@ -223,6 +260,13 @@ def reset_document(
             }
         })
 
+        if anchor in BLOCK_LANDMARKS:
+            requests.append({
+                "deleteParagraphBullets": {
+                    "range": {"startIndex": s, "endIndex": s + len(text_to_insert), "segmentId": seg_id}
+                }
+            })
+
         # Ensure the inserted anchor is Normal Text
         requests.append({
             "updateParagraphStyle": {
@@ -235,10 +279,4 @@ def reset_document(
         pushed_ranges[seg_id].append((s, e))
         applied_count += 1
 
-    if requests:
-        docs_batch_update(document_id=doc_id, access_token=access_token, requests=requests)
-        log_line(f"✅ Reset complete. Reverted {applied_count} anchors.")
-    else:
-        log_line("ℹ️ Nothing to reset.")
-
-    return 0
+    return requests, applied_count
@@ -1,32 +1,83 @@
 """State management for CV apply operations."""
 
-from datetime import datetime
+import os
 from typing import Any
 
-from .utils import read_json, write_json, strip_markers
+from .store import StateStore
+from .utils import log_line, strip_markers
+
+LEGACY_SUFFIX = ".json"
+
+
+def state_db_path(path: str) -> str:
+    """Map a state path to its SQLite file (a legacy ".json" path maps to ".db")."""
+    root, ext = os.path.splitext(path)
+    return root + ".db" if ext == LEGACY_SUFFIX else path
+
+
+def open_store(path: str) -> StateStore:
+    """
+    Open the state store, importing the legacy JSON state file once.
+
+    Args:
+        path: State path (.db, or a legacy .json path whose sibling .db is used)
+
+    Returns:
+        Open StateStore (caller closes it)
+    """
+    store = StateStore(state_db_path(path))
+    legacy = os.path.splitext(store.path)[0] + LEGACY_SUFFIX
+    imported = store.migrate_json(legacy)
+    if imported:
+        log_line(f"📦 Migrated {imported} docs from {legacy} to {store.path}")
+    return store
+
+
+def _with_cleaned(doc_state: dict[str, Any]) -> dict[str, Any]:
+    doc_state["cleaned_replacements"] = {k: strip_markers(v) for k, v in doc_state["replacements"].items()}
+    return doc_state
 
 
 def read_state(path: str) -> dict[str, Any]:
-    """Read state file or return empty state if file doesn't exist."""
-    import os
-    import json
+    """Read the state of all documents as {"docs": {name: {...}}}."""
+    with open_store(path) as store:
+        return {"docs": {name: _with_cleaned(store.get_doc(name)) for name in store.doc_names()}}
+
+
+def get_doc_state(path: str, doc: str) -> dict[str, Any] | None:
+    """
+    Read the current state of one document.
 
-    if not os.path.exists(path):
-        return {"docs": {}}
-    try:
-        data = read_json(path)
-    except (json.JSONDecodeError, OSError):
-        return {"docs": {}}
-    if not isinstance(data, dict):
-        return {"docs": {}}
-    if "docs" not in data or not isinstance(data["docs"], dict):
-        data["docs"] = {}
-    return data
+    Args:
+        path: State path
+        doc: Document name
 
+    Returns:
+        Dict with updated_at, doc_url, doc_id, data_path, replacements,
+        cleaned_replacements (template copies add template_id, previous_copies), or None
+    """
+    with open_store(path) as store:
+        doc_state = store.get_doc(doc)
+    return _with_cleaned(doc_state) if doc_state else None
 
-def write_state(path: str, state: dict[str, Any]) -> None:
-    """Write state to file."""
-    write_json(path, state)
+
+def doc_history(path: str, doc: str, limit: int | None = None) -> list[dict[str, Any]]:
+    """
+    List a document's apply runs, newest first, with the anchors each one changed.
+
+    Args:
+        path: State path
+        doc: Document name
+        limit: Maximum number of runs
+
+    Returns:
+        Run dicts (id, created_at, doc_id, data_path, changed, changes)
+    """
+    with open_store(path) as store:
+        runs = store.history(doc, limit)
+        for run in runs:
+            run["changes"] = store.run_changes(run["id"])
+    return runs
 
 
 def update_state(
@@ -37,9 +88,10 @@ def update_state(
     doc_id: str | None,
     data_path: str,
     replacements: dict[str, str],
-) -> None:
+    template_id: str | None = None,
+) -> int:
     """
-    Update state with document application information.
+    Record a document application as a new run (only changed anchors are written).
 
     Args:
         state_path: Path to state file
@@ -48,17 +100,20 @@ def update_state(
         doc_id: Document ID
         data_path: Path to source data file
         replacements: Applied replacements
+        template_id: Template the document was copied from (template mode)
+
+    Returns:
+        Run ID
     """
-    state = read_state(state_path)
-    state["docs"][doc] = {
-        "updated_at": datetime.now().isoformat(timespec="seconds"),
-        "doc_url": doc_url,
-        "doc_id": doc_id,
-        "data_path": data_path,
-        "replacements": replacements,
-        "cleaned_replacements": {k: strip_markers(v) for k, v in replacements.items()},
-    }
-    write_state(state_path, state)
+    with open_store(state_path) as store:
+        return store.record_run(
+            doc=doc,
+            doc_url=doc_url,
+            doc_id=doc_id,
+            data_path=data_path,
+            replacements=replacements,
+            template_id=template_id,
+        )
 
 
 def invert_replacements(replacements: dict[str, str]) -> tuple[dict[str, str], list[str], int]:
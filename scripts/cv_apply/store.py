@@ -0,0 +1,355 @@
+"""SQLite state store: documents, apply runs and content-hashed anchor values."""
+
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    name TEXT PRIMARY KEY,
+    doc_id TEXT,
+    doc_url TEXT,
+    template_id TEXT,
+    data_path TEXT,
+    updated_at TEXT,
+    last_run INTEGER
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    doc_id TEXT,
+    doc_url TEXT,
+    template_id TEXT,
+    data_path TEXT,
+    changed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_doc ON runs (doc, id);
+-- Values are stored once per distinct content
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- Current anchor values per document
+CREATE TABLE IF NOT EXISTS doc_values (
+    doc TEXT NOT NULL,
+    anchor TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    PRIMARY KEY (doc, anchor)
+);
+-- Per run, only the anchors that changed (hash NULL = anchor removed)
+CREATE TABLE IF NOT EXISTS value_history (
+    run_id INTEGER NOT NULL,
+    anchor TEXT NOT NULL,
+    hash TEXT,
+    PRIMARY KEY (run_id, anchor)
+);
+"""
+
+
+def content_hash(value: str) -> str:
+    """Hash of a stored value (blobs are keyed by it)."""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class StateStore:
+    """Apply state in SQLite (WAL mode, safe for concurrent writers)."""
+
+    def __init__(self, path: str, *, timeout: float = 30.0):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.conn.close()
+
+    def __enter__(self) -> "StateStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; BEGIN IMMEDIATE takes the write lock up front."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def get_meta(self, key: str) -> str | None:
+        """Read a meta value."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def record_run(
+        self,
+        *,
+        doc: str,
+        doc_url: str | None,
+        doc_id: str | None,
+        data_path: str | None,
+        replacements: dict[str, str],
+        template_id: str | None = None,
+        created_at: str | None = None,
+    ) -> int:
+        """
+        Record an apply run, writing only the anchors whose values changed.
+
+        Args:
+            doc: Document name
+            doc_url: Document URL
+            doc_id: Document ID
+            data_path: Path to source data file
+            replacements: Applied replacements (all anchors)
+            template_id: Template the document was copied from (template mode)
+            created_at: Timestamp (default: now)
+
+        Returns:
+            Run ID
+        """
+        with self.transaction() as conn:
+            return self._record_run(
+                conn,
+                doc=doc,
+                doc_url=doc_url,
+                doc_id=doc_id,
+                data_path=data_path,
+                replacements=replacements,
+                template_id=template_id,
+                created_at=created_at,
+            )
+
+    @staticmethod
+    def _record_run(
+        conn: sqlite3.Connection,
+        *,
+        doc: str,
+        doc_url: str | None,
+        doc_id: str | None,
+        data_path: str | None,
+        replacements: dict[str, str],
+        template_id: str | None = None,
+        created_at: str | None = None,
+    ) -> int:
+        """record_run() on an open transaction."""
+        created_at = created_at or _now()
+        new = {key: content_hash(value) for key, value in replacements.items()}
+        current = {
+            row["anchor"]: row["hash"]
+            for row in conn.execute("SELECT anchor, hash FROM doc_values WHERE doc = ?", (doc,))
+        }
+        changed = [key for key, h in new.items() if current.get(key) != h]
+        removed = [key for key in current if key not in new]
+
+        run_id = conn.execute(
+            "INSERT INTO runs (doc, created_at, doc_id, doc_url, template_id, data_path, changed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (doc, created_at, doc_id, doc_url, template_id, data_path, len(changed) + len(removed)),
+        ).lastrowid
+        conn.executemany(
+            "INSERT OR IGNORE INTO blobs (hash, value) VALUES (?, ?)",
+            [(new[key], replacements[key]) for key in changed],
+        )
+        conn.executemany(
+            "INSERT INTO value_history (run_id, anchor, hash) VALUES (?, ?, ?)",
+            [(run_id, key, new[key]) for key in changed] + [(run_id, key, None) for key in removed],
+        )
+        conn.executemany(
+            "INSERT INTO doc_values (doc, anchor, hash, run_id) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (doc, anchor) DO UPDATE SET hash = excluded.hash, run_id = excluded.run_id",
+            [(doc, key, new[key], run_id) for key in changed],
+        )
+        conn.executemany("DELETE FROM doc_values WHERE doc = ? AND anchor = ?", [(doc, key) for key in removed])
+        conn.execute(
+            "INSERT INTO docs (name, doc_id, doc_url, template_id, data_path, updated_at, last_run) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET doc_id = excluded.doc_id, doc_url = excluded.doc_url, "
+            "template_id = CASE WHEN excluded.doc_id IS docs.doc_id "
+            "THEN COALESCE(excluded.template_id, docs.template_id) ELSE excluded.template_id END, "
+            "data_path = excluded.data_path, "
+            "updated_at = excluded.updated_at, last_run = excluded.last_run",
+            (doc, doc_id, doc_url, template_id, data_path, created_at, run_id),
+        )
+        return run_id
+
+    def doc_names(self) -> list[str]:
+        """Names of all documents with state."""
+        return [row["name"] for row in self.conn.execute("SELECT name FROM docs ORDER BY name")]
+
+    def get_doc(self, doc: str) -> dict[str, Any] | None:
+        """
+        Load the current state of one document.
+
+        Args:
+            doc: Document name
+
+        Returns:
+            Dict with updated_at, doc_url, doc_id, data_path, replacements
+            (plus template_id and previous_copies for template copies), or None
+        """
+        row = self.conn.execute("SELECT * FROM docs WHERE name = ?", (doc,)).fetchone()
+        if row is None:
+            return None
+        replacements = {
+            r["anchor"]: r["value"]
+            for r in self.conn.execute(
+                "SELECT v.anchor, b.value FROM doc_values v JOIN blobs b ON b.hash = v.hash "
+                "WHERE v.doc = ? ORDER BY v.anchor",
+                (doc,),
+            )
+        }
+        state: dict[str, Any] = {
+            "updated_at": row["updated_at"],
+            "doc_url": row["doc_url"],
+            "doc_id": row["doc_id"],
+            "data_path": row["data_path"],
+            "replacements": replacements,
+        }
+        if row["template_id"]:
+            state["template_id"] = row["template_id"]
+            # Earlier copies stay in Drive; list them so they can be found or cleaned up.
+            state["previous_copies"] = [
+                r["doc_id"]
+                for r in self.conn.execute(
+                    "SELECT doc_id, MAX(id) AS last FROM runs WHERE doc = ? AND template_id IS NOT NULL "
+                    "AND doc_id IS NOT NULL AND doc_id != ? GROUP BY doc_id ORDER BY last",
+                    (doc, row["doc_id"] or ""),
+                )
+            ]
+        return state
+
+    def history(self, doc: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """
+        List apply runs of a document, newest first.
+
+        Args:
+            doc: Document name
+            limit: Maximum number of runs
+
+        Returns:
+            Run dicts (id, created_at, doc_id, data_path, changed anchor count)
+        """
+        sql = "SELECT id, created_at, doc_id, data_path, changed FROM runs WHERE doc = ? ORDER BY id DESC"
+        params: tuple[Any, ...] = (doc,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def run_changes(self, run_id: int) -> dict[str, str | None]:
+        """Anchors written by one run (None = removed)."""
+        return {
+            row["anchor"]: row["value"]
+            for row in self.conn.execute(
+                "SELECT h.anchor, b.value FROM value_history h LEFT JOIN blobs b ON b.hash = h.hash "
+                "WHERE h.run_id = ? ORDER BY h.anchor",
+                (run_id,),
+            )
+        }
+
+    def values_at(self, doc: str, run_id: int) -> dict[str, str]:
+        """
+        Rebuild a document's replacements as they were after a given run.
+
+        Args:
+            doc: Document name
+            run_id: Run ID
+
+        Returns:
+            Anchor -> value
+        """
+        rows = self.conn.execute(
+            "SELECT h.anchor, b.value FROM value_history h "
+            "JOIN (SELECT h2.anchor, MAX(h2.run_id) AS run_id FROM value_history h2 "
+            "      JOIN runs r ON r.id = h2.run_id WHERE r.doc = ? AND h2.run_id <= ? GROUP BY h2.anchor) last "
+            "  ON last.anchor = h.anchor AND last.run_id = h.run_id "
+            "LEFT JOIN blobs b ON b.hash = h.hash ORDER BY h.anchor",
+            (doc, run_id),
+        )
+        return {row["anchor"]: row["value"] for row in rows if row["value"] is not None}
+
+    def import_json_state(self, state: dict[str, Any]) -> int:
+        """
+        Import docs from the legacy JSON state ({"docs": {name: {...}}}).
+
+        Args:
+            state: Parsed .cv_apply_state.json content
+
+        Returns:
+            Number of documents imported
+        """
+        with self.transaction() as conn:
+            return self._import_json_state(conn, state)
+
+    def _import_json_state(self, conn: sqlite3.Connection, state: dict[str, Any]) -> int:
+        """import_json_state() on an open transaction."""
+        imported = 0
+        for name, entry in (state.get("docs") or {}).items():
+            if not isinstance(entry, dict) or not isinstance(entry.get("replacements"), dict):
+                continue
+            self._record_run(
+                conn,
+                doc=name,
+                doc_url=entry.get("doc_url"),
+                doc_id=entry.get("doc_id"),
+                data_path=entry.get("data_path"),
+                replacements=entry["replacements"],
+                template_id=entry.get("template_id"),
+                created_at=entry.get("updated_at"),
+            )
+            imported += 1
+        return imported
+
+    def migrate_json(self, json_path: str) -> int:
+        """
+        One-time import of a legacy JSON state file (the file is left in place).
+
+        Args:
+            json_path: Path to .cv_apply_state.json
+
+        Returns:
+            Number of documents imported (0 if already migrated or missing)
+        """
+        key = f"migrated:{os.path.abspath(json_path)}"
+        if self.get_meta(key) or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        # Check, import and marker in one write transaction: another process (or worker thread)
+        # opening the store at the same time must not import the same runs again.
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                return 0
+            imported = self._import_json_state(conn, state) if isinstance(state, dict) else 0
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, _now()))
+        return imported
@@ -1,6 +1,7 @@
 """Document styling operations for Google Docs."""
 
-import time
+import os
+import sys
 from typing import Any
 
 from .constants import (
@@ -23,6 +24,11 @@ from .document import (
 )
 from .utils import log_line
 
+# Import gdocs_cli functions
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from gdocs_cli import docs_batch_update_planned, ensure_access_token, load_oauth_client
+
 
 def style_skills_section(
     doc: dict[str, Any],
@@ -32,13 +38,24 @@ def style_skills_section(
     """
     Generate styling requests for the Skills section.
 
+    Returns:
+        Tuple of (bullet_requests, style_requests)
+    """
+    content = (doc.get("body") or {}).get("content") or []
+    return style_skills_paragraphs(collect_paragraphs(content, start, end))
+
+
+def style_skills_paragraphs(
+    paragraphs: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Generate styling requests for Skills paragraphs ({"start", "end", "text"} dicts).
+
     Returns:
         Tuple of (bullet_requests, style_requests)
     """
     bullet_requests: list[dict[str, Any]] = []
     style_requests: list[dict[str, Any]] = []
-    content = (doc.get("body") or {}).get("content") or []
-    paragraphs = collect_paragraphs(content, start, end)
 
     if not paragraphs:
         return [], []
@@ -114,13 +131,25 @@ def style_experience_section(
     """
     Generate styling requests for Experience/Entrepreneurship sections.
 
+    Returns:
+        Tuple of (bullet_requests, style_requests)
+    """
+    content = (doc.get("body") or {}).get("content") or []
+    return style_experience_paragraphs(collect_paragraphs(content, start, end), bullet_marker)
+
+
+def style_experience_paragraphs(
+    paragraphs: list[dict[str, Any]],
+    bullet_marker: str
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Generate styling requests for Experience/Entrepreneurship paragraphs.
+
     Returns:
         Tuple of (bullet_requests, style_requests)
     """
     bullet_requests: list[dict[str, Any]] = []
     style_requests: list[dict[str, Any]] = []
-    content = (doc.get("body") or {}).get("content") or []
-    paragraphs = collect_paragraphs(content, start, end)
 
     if not paragraphs:
         return [], []
@@ -276,40 +305,32 @@ def style_experience_section(
     return bullet_requests, style_requests
 
 
-def apply_block_styles(
-    *,
-    doc_id: str | None,
-    client_path: str,
-    token_path: str,
-    replacements: dict[str, str] | None = None,
-) -> None:
+def style_education_paragraphs(
+    paragraphs: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     """
-    Apply styling to CV document sections.
+    Generate styling requests for Education paragraphs (non-empty ones are italic).
 
-    Args:
-        doc_id: Google Doc ID
-        client_path: Path to OAuth client credentials
-        token_path: Path to token cache
-        replacements: Placeholder replacements for reverse lookup
+    Returns:
+        Tuple of (bullet_requests, style_requests); Education has no bullets
     """
-    if not doc_id:
-        log_line("⚠️ Cannot style blocks: document ID unknown.")
-        return
+    style_requests = [
+        {
+            "updateTextStyle": {
+                "range": {"startIndex": para["start"], "endIndex": para["end"]},
+                "textStyle": {"italic": True},
+                "fields": "italic",
+            }
+        }
+        for para in paragraphs
+        if para["text"]
+    ]
+    return [], style_requests
 
-    # Import here to avoid circular dependency
-    import sys
-    import os
-    ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    sys.path.insert(0, ROOT_DIR)
-    from gdocs_cli import docs_batch_update, ensure_access_token, get_doc, load_oauth_client
 
-    client = load_oauth_client(client_path)
-    access_token = ensure_access_token(client=client, token_path=token_path)
-    doc = get_doc(document_id=doc_id, access_token=access_token)
-    content = (doc.get("body") or {}).get("content") or []
+def section_header_requests(content: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Style the first paragraph matching each of SECTION_HEADERS as a bold 17pt H2."""
     requests: list[dict[str, Any]] = []
-
-    # Style section headers as H2
     for header_text in SECTION_HEADERS:
         for item in content:
             if not item.get("paragraph"):
@@ -331,6 +352,61 @@ def apply_block_styles(
                     }
                 })
                 break
+    return requests
+
+
+def tight_anchor_requests(anchor: str, start: int, end: int) -> list[dict[str, Any]]:
+    """Paragraph (and text) style for a header-field paragraph filled from a TIGHT_ANCHORS anchor."""
+    requests: list[dict[str, Any]] = []
+    if anchor not in TIGHT_ANCHORS:
+        return requests
+    p_style = {
+        "spaceAbove": {"magnitude": 0, "unit": "PT"},
+        "spaceBelow": {"magnitude": 4, "unit": "PT"},
+        "lineSpacing": 100
+    }
+    p_fields = "spaceAbove,spaceBelow,lineSpacing"
+
+    if anchor == "{{fullname}}":
+        p_style["namedStyleType"] = "HEADING_1"
+        p_fields += ",namedStyleType"
+    elif anchor in ["{{title}}", "{{nickname}}"]:
+        p_style["namedStyleType"] = "HEADING_3"
+        p_fields += ",namedStyleType"
+
+    requests.append({
+        "updateParagraphStyle": {
+            "range": {"startIndex": start, "endIndex": end},
+            "paragraphStyle": p_style,
+            "fields": p_fields
+        }
+    })
+
+    # Additional text styles
+    if anchor == "{{tags}}":
+        requests.append({
+            "updateTextStyle": {
+                "range": {"startIndex": start, "endIndex": end},
+                "textStyle": {"italic": True},
+                "fields": "italic"
+            }
+        })
+    return requests
+
+
+def plan_block_styles(doc: dict[str, Any], replacements: dict[str, str] | None = None) -> list[dict[str, Any]]:
+    """
+    Plan section styling requests for a filled document (legacy marker flow).
+
+    Args:
+        doc: Document JSON from documents.get
+        replacements: Placeholder replacements for reverse lookup
+
+    Returns:
+        List of API request objects (bullets and styles mixed)
+    """
+    content = (doc.get("body") or {}).get("content") or []
+    requests: list[dict[str, Any]] = section_header_requests(content)
 
     # Style Skills section
     skills_range = find_section_range(content, "Skills", level=2) or find_section_range(content, "Skills", level=0)
@@ -356,16 +432,8 @@ def apply_block_styles(
     # Style Education section
     edu_range = find_section_range(content, "Education", level=2) or find_section_range(content, "Education", level=0)
     if edu_range:
-        edu_paras = collect_paragraphs(content, *edu_range)
-        for para in edu_paras:
-            if para["text"]:
-                requests.append({
-                    "updateTextStyle": {
-                        "range": {"startIndex": para["start"], "endIndex": para["end"]},
-                        "textStyle": {"italic": True},
-                        "fields": "italic",
-                    }
-                })
+        _, styles = style_education_paragraphs(collect_paragraphs(content, *edu_range))
+        requests.extend(styles)
 
     # Reverse lookup for special styling
     inverted = {v: k for k, v in (replacements or {}).items() if v and isinstance(v, str)}
@@ -378,39 +446,8 @@ def apply_block_styles(
 
         # Restore field-specific styles
         anchor = inverted.get(text.strip())
-
-        if anchor in TIGHT_ANCHORS:
-            p_style = {
-                "spaceAbove": {"magnitude": 0, "unit": "PT"},
-                "spaceBelow": {"magnitude": 4, "unit": "PT"},
-                "lineSpacing": 100
-            }
-            p_fields = "spaceAbove,spaceBelow,lineSpacing"
-
-            if anchor == "{{fullname}}":
-                p_style["namedStyleType"] = "HEADING_1"
-                p_fields += ",namedStyleType"
-            elif anchor in ["{{title}}", "{{nickname}}"]:
-                p_style["namedStyleType"] = "HEADING_3"
-                p_fields += ",namedStyleType"
-
-            requests.append({
-                "updateParagraphStyle": {
-                    "range": {"startIndex": para_start, "endIndex": para_end},
-                    "paragraphStyle": p_style,
-                    "fields": p_fields
-                }
-            })
-
-            # Additional text styles
-            if anchor == "{{tags}}":
-                requests.append({
-                    "updateTextStyle": {
-                        "range": {"startIndex": para_start, "endIndex": para_end},
-                        "textStyle": {"italic": True},
-                        "fields": "italic"
-                    }
-                })
+        if anchor:
+            requests.extend(tight_anchor_requests(anchor, para_start, para_end))
 
         # Enforce H2 style for designated headers
         is_h2 = get_heading_level(item) == 2
@@ -435,52 +472,70 @@ def apply_block_styles(
 
         requests.extend(create_link_requests(text, para_start))
 
-    if not requests:
-        log_line("ℹ️ No block styling requests generated.")
-        return
+    return requests
+
+
+# Bullet helpers left in the text by the legacy fill; removed once bullets exist
+MARKER_CLEANUP_REQUESTS = [
+    {
+        "replaceAllText": {
+            "containsText": {"text": marker, "matchCase": True},
+            "replaceText": "",
+        }
+    }
+    for marker in (SKILL_BULLET_MARKER, EXP_BULLET_MARKER, SKILL_BULLET_MARKER.strip(), EXP_BULLET_MARKER.strip())
+]
+
+
+def apply_block_styles(
+    *,
+    doc_id: str | None,
+    client_path: str,
+    token_path: str,
+    replacements: dict[str, str] | None = None,
+) -> None:
+    """
+    Apply styling to CV document sections.
 
-    # Split into bullet creation and style requests
-    bullet_requests = [req for req in requests if "createParagraphBullets" in req]
-    style_requests = [req for req in requests if "createParagraphBullets" not in req]
+    Bullets, styles and marker cleanup go out as three batches chained by
+    revision ID; if another writer edits the document in between, the plan is
+    rebuilt from a fresh snapshot.
+
+    Args:
+        doc_id: Google Doc ID
+        client_path: Path to OAuth client credentials
+        token_path: Path to token cache
+        replacements: Placeholder replacements for reverse lookup
+    """
+    if not doc_id:
+        log_line("⚠️ Cannot style blocks: document ID unknown.")
+        return
 
-    # Phase 1: Create bullets
+    client = load_oauth_client(client_path)
+    access_token = ensure_access_token(client=client, token_path=token_path)
+    planned: list[list[dict[str, Any]]] = []
+
+    def plan(doc: dict[str, Any]) -> list[list[dict[str, Any]]]:
+        requests = plan_block_styles(doc, replacements)
+        if not requests:
+            planned[:] = []
+            return []
+        # Split into bullet creation and style requests
+        planned[:] = [
+            [req for req in requests if "createParagraphBullets" in req],
+            [req for req in requests if "createParagraphBullets" not in req],
+            MARKER_CLEANUP_REQUESTS,
+        ]
+        return planned
+
+    # Wait between batches for bullets to register
+    docs_batch_update_planned(document_id=doc_id, access_token=access_token, plan=plan, pause=2.0)
+    if not planned:
+        log_line("ℹ️ No block styling requests generated.")
+        return
+    bullet_requests, style_requests, _ = planned
     if bullet_requests:
-        docs_batch_update(document_id=doc_id, access_token=access_token, requests=bullet_requests)
         log_line(f"🎨 Applied {len(bullet_requests)} bullet creation requests.")
-        time.sleep(2)  # Wait for bullets to register
-
-    # Phase 2: Apply styles
     if style_requests:
-        log_line(f"📝 Applying {len(style_requests)} style requests...")
-        docs_batch_update(document_id=doc_id, access_token=access_token, requests=style_requests)
         log_line(f"🎨 Applied {len(style_requests)} styling requests.")
-
-    # Cleanup: Remove bullet markers
-    cleanup_requests = [
-        {
-            "replaceAllText": {
-                "containsText": {"text": SKILL_BULLET_MARKER, "matchCase": True},
-                "replaceText": "",
-            }
-        },
-        {
-            "replaceAllText": {
-                "containsText": {"text": EXP_BULLET_MARKER, "matchCase": True},
-                "replaceText": "",
-            }
-        },
-        {
-            "replaceAllText": {
-                "containsText": {"text": SKILL_BULLET_MARKER.strip(), "matchCase": True},
-                "replaceText": "",
-            }
-        },
-        {
-            "replaceAllText": {
-                "containsText": {"text": EXP_BULLET_MARKER.strip(), "matchCase": True},
-                "replaceText": "",
-            }
-        },
-    ]
-    docs_batch_update(document_id=doc_id, access_token=access_token, requests=cleanup_requests)
     log_line("🧹 Removed bullet helpers.")
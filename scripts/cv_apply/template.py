@@ -0,0 +1,74 @@
+"""Pristine-template mode: clone the template with Drive files.copy, then fill the copy."""
+
+import os
+import sys
+from urllib.error import HTTPError
+
+from .document import find_doc_info
+from .utils import log_line
+
+# Import gdocs_cli functions
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from gdocs_cli import doc_edit_url, drive_copy_file, ensure_access_token, load_oauth_client
+
+
+def resolve_template(links_file: str, template: str) -> tuple[str | None, str]:
+    """
+    Find the template document in the links file.
+
+    Args:
+        links_file: Path to links file
+        template: Template document name
+
+    Returns:
+        Tuple of (url, document_id)
+    """
+    url, doc_id = find_doc_info(links_file, template)
+    if not doc_id:
+        raise SystemExit(f"Template {template!r} not found in {links_file}")
+    return url, doc_id
+
+
+def copy_template(
+    *,
+    template_id: str,
+    name: str,
+    client_path: str,
+    token_path: str,
+    folder: str | None = None,
+) -> tuple[str, str]:
+    """
+    Create a fresh document from the template with a single Drive files.copy.
+
+    The template itself is never modified, so its anchors stay intact and no
+    reset scan is needed before the next apply.
+
+    Args:
+        template_id: Template document ID
+        name: Name for the new document
+        client_path: Path to OAuth client credentials
+        token_path: Path to token cache
+        folder: Drive folder ID for the copy (default: template's folder)
+
+    Returns:
+        Tuple of (document_id, url) of the copy
+    """
+    access_token = ensure_access_token(client=load_oauth_client(client_path), token_path=token_path)
+    try:
+        meta = drive_copy_file(
+            file_id=template_id,
+            access_token=access_token,
+            name=name,
+            parents=[folder] if folder else None,
+        )
+    except HTTPError as exc:
+        hint = ""
+        if exc.code in (401, 403):
+            hint = "\nLikely missing scope; re-run: python3 gdocs_cli.py auth --scopes https://www.googleapis.com/auth/documents https://www.googleapis.com/auth/drive"
+        raise SystemExit(f"Drive files.copy failed HTTP {exc.code}: {exc.msg}{hint}") from None
+    doc_id = meta.get("id")
+    if not doc_id:
+        raise SystemExit(f"Drive files.copy returned no id: {meta}")
+    log_line(f"🧬 Copied template -> {meta.get('name') or name}")
+    return doc_id, doc_edit_url(doc_id)
@@ -0,0 +1,84 @@
+"""
+Unit tests for A/B variant matrix expansion.
+
+Run with: python -m pytest test_ab_variants.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply.ab_variants import (
+    expand_matrix,
+    matrix_size,
+    parse_exps_variants,
+    parse_summary_variants,
+    select_axes,
+)
+
+SUMMARY_MD = """# Summary Variants
+
+## Variant 1: Same
+> Base summary.
+
+## Variant 2: Other
+> Different summary.
+"""
+
+EXPS_MD = """# Experience Variants
+
+## Achievement Type 1: Latency
+### Original
+> Cut p99 latency by 40%
+
+### Variant 1.1: Metric
+> Reduced p99 latency 40% across 12 services
+"""
+
+BASE = {
+    "header": {"full_name": "Base"},
+    "summary": "Base summary.",
+    "experience": [{"company": "X", "bullets": ["Cut p99 latency by 40%.", "Other"]}],
+}
+
+
+def test_exps_variant_replaces_matching_bullet():
+    """Test that an exps rewrite replaces the base bullet matching its original."""
+    axes = parse_exps_variants(EXPS_MD)
+    selected = select_axes(axes, BASE)
+
+    records = list(expand_matrix(BASE, selected))
+
+    assert matrix_size(selected) == 2
+    assert [r["variant"]["exps:1"] for r in records] == ["base", "1.1"]
+    assert records[1]["data"]["experience"][0]["bullets"] == ["Reduced p99 latency 40% across 12 services", "Other"]
+    assert BASE["experience"][0]["bullets"][0] == "Cut p99 latency by 40%."
+
+
+def test_dedup_and_sampling():
+    """Test that identical outputs are deduplicated and sampling is seeded."""
+    axes = {"summary": parse_summary_variants(SUMMARY_MD), **parse_exps_variants(EXPS_MD)}
+    selected = select_axes(axes, BASE)
+
+    full = list(expand_matrix(BASE, selected))
+    sampled = [r["variant"] for r in expand_matrix(BASE, selected, sample=2, seed=1)]
+
+    # summary variant 1 equals the base summary, so its combos collapse into the base ones.
+    assert matrix_size(selected) == 6
+    assert len(full) == 4
+    assert sampled == [r["variant"] for r in expand_matrix(BASE, selected, sample=2, seed=1)]
+    assert len(sampled) <= 2
+
+
+def test_unknown_axis_lists_available_axes():
+    """Test that an --axis name not among the parsed axes fails instead of being ignored."""
+    axes = {"summary": parse_summary_variants(SUMMARY_MD), **parse_exps_variants(EXPS_MD)}
+    try:
+        select_axes(axes, BASE, {"sumary": []})
+    except SystemExit as exc:
+        assert "sumary" in str(exc)
+        assert "summary, exps:1" in str(exc)
+    else:
+        raise AssertionError("expected SystemExit for an unknown axis")
@@ -0,0 +1,68 @@
+"""
+Unit tests for batch rendering.
+
+Run with: python -m pytest test_batch.py
+"""
+
+import sys
+import os
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply.batch import deep_merge, iter_jobs, run_batch
+from cv_apply.memo import SectionMemo, fingerprint
+
+
+def test_deep_merge_nested_override():
+    """Test that nested dicts merge and other values replace."""
+    base = {"header": {"full_name": "A", "contact": {"email": "a@x"}}, "skills": [1]}
+    merged = deep_merge(base, {"header": {"contact": {"email": "b@x"}}, "skills": [2]})
+    assert merged == {"header": {"full_name": "A", "contact": {"email": "b@x"}}, "skills": [2]}
+    assert base["header"]["contact"]["email"] == "a@x"
+
+
+def test_manifest_expands_to_records(tmp_path):
+    """Test that a manifest renders one record per variant and language."""
+    (tmp_path / "cv.base.ru.json").write_text(
+        json.dumps({"header": {"full_name": "Base"}, "summary": "Base summary"}), encoding="utf-8"
+    )
+    manifest = tmp_path / "ab.json"
+    manifest.write_text(
+        json.dumps({"base": "cv.base.ru.json", "variants": {"v1": {"summary": "One"}, "v2": {}}}),
+        encoding="utf-8",
+    )
+    (tmp_path / "cv.replacements.json").write_text(json.dumps({"replacements": {}}), encoding="utf-8")
+
+    paths = [str(manifest), str(tmp_path / "cv.replacements.json")]
+    records = list(run_batch(iter_jobs(paths), workers=1))
+
+    assert [(r["variant"], r["lang"]) for r in records[:2]] == [("v1", "ru"), ("v2", "ru")]
+    assert records[0]["replacements"]["{{SUMMARY}}"] == "One"
+    assert records[1]["replacements"]["{{SUMMARY}}"] == "Base summary"
+    assert "ms" in records[0]
+    assert records[2]["skipped"] == "not structured CV data"
+
+
+def test_process_pool_preloads_memo_and_returns_child_errors(tmp_path):
+    """Test that workers=2 pickles jobs and records, preloads the memo in every worker and reports child errors."""
+    memo = SectionMemo()
+    memo.put(fingerprint("format_summary:summary", "Base summary"), "Summary from memo")
+    memo_path = str(tmp_path / "memo.json")
+    memo.save(memo_path)
+    jobs = [
+        {"input": f"cv{i}.json", "variant": f"v{i}", "lang": "en", "data": {"summary": "Base summary"}}
+        for i in range(6)
+    ]
+    # format_summary calls .get() on a non-string summary, so this job raises inside the worker.
+    jobs.insert(3, {"input": "bad.json", "variant": "bad", "lang": "en", "data": {"summary": 42}})
+
+    records = list(run_batch(iter(jobs), workers=2, memo_path=memo_path, chunksize=1))
+
+    assert [r["variant"] for r in records] == [job["variant"] for job in jobs]
+    assert records[3]["error"].startswith("AttributeError:")
+    assert "replacements" not in records[3]
+    # Every worker loaded the memo: no record was formatted from scratch.
+    good = records[:3] + records[4:]
+    assert {r["replacements"]["{{SUMMARY}}"] for r in good} == {"Summary from memo"}
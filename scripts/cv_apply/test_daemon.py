@@ -0,0 +1,168 @@
+"""
+Unit tests for the gdocs daemon (JSON-RPC over a Unix socket) and gdocs_cli's routing through it.
+
+Run with: python -m pytest test_daemon.py
+"""
+
+import asyncio
+import sys
+import os
+import stat
+import threading
+from urllib.error import HTTPError
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gdocs_cli
+import gdocs_daemon
+import gdocs_metrics
+
+
+class FakeApi:
+    """Stands in for AsyncGoogleClient."""
+
+    access_token = ""
+
+    def __init__(self):
+        self.calls = []
+        self.tokens = []
+
+    async def get_doc(self, document_id, *, access_token=None):
+        self.calls.append(("get_doc", document_id))
+        self.tokens.append(access_token)
+        return {"documentId": document_id, "revisionId": f"r{len(self.calls)}"}
+
+    async def batch_update(self, document_id, requests, *, required_revision_id=None, access_token=None):
+        self.calls.append(("batch_update", document_id))
+        self.tokens.append(access_token)
+        if required_revision_id == "stale":
+            raise HTTPError("url", 400, "requiredRevisionId stale does not match", None, None)
+        return {"replies": [{} for _ in requests], "writeControl": {"requiredRevisionId": "next"}}
+
+    async def export(self, file_id, mime_type, *, access_token=None):
+        self.calls.append(("export", file_id))
+        self.tokens.append(access_token)
+        return b"PK\x03\x04docx"
+
+
+def test_cli_calls_route_through_daemon(tmp_path, monkeypatch):
+    """get_doc is cached until a write; conflicts surface as HTTPError; exports land on disk; shutdown cleans up."""
+    socket_path = str(tmp_path / "gdocs.sock")
+    api = FakeApi()
+    service = gdocs_daemon.GdocsService(api)
+    ready = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(gdocs_daemon.run_server(service, socket_path, ready=ready),))
+    thread.start()
+    assert ready.wait(5)
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    monkeypatch.setenv("GDOCS_SOCKET", socket_path)
+    monkeypatch.delenv("GDOCS_DAEMON", raising=False)
+
+    try:
+        first = gdocs_cli.get_doc(document_id="d1", access_token="unused")
+        assert gdocs_cli.get_doc(document_id="d1", access_token="unused") == first
+        assert api.calls == [("get_doc", "d1")]
+        assert api.tokens == ["unused"]  # the caller's token, not the daemon's
+
+        resp = gdocs_cli.docs_batch_update(document_id="d1", access_token="unused", requests=[{"x": 1}])
+        assert resp["writeControl"]["requiredRevisionId"] == "next"
+        assert gdocs_cli.get_doc(document_id="d1", access_token="unused") != first  # write invalidated the cache
+        gdocs_cli.get_doc(document_id="d1", access_token="unused", fresh=True)
+        assert [c[0] for c in api.calls] == ["get_doc", "batch_update", "get_doc", "get_doc"]
+
+        try:
+            gdocs_cli.docs_batch_update(document_id="d1", access_token="u", requests=[{}], required_revision_id="stale")
+        except HTTPError as exc:
+            assert gdocs_cli.is_revision_conflict(exc)
+        else:
+            raise AssertionError("expected a revision conflict")
+
+        out = tmp_path / "cv.docx"
+        size, _ = gdocs_cli.drive_export_to_file(file_id="d1", access_token="u", mime_type="x", dest_path=str(out))
+        assert out.read_bytes() == b"PK\x03\x04docx" and size == 8
+        assert set(api.tokens) == {"unused", "u"}
+
+        client = gdocs_daemon.connect(socket_path)
+        result = client.call("apply_replacements", document_id="d1", replacements={"{{a}}": "b", "{{c}}": None})
+        assert len(result["replies"]) == 2
+        assert gdocs_daemon.ping(socket_path)["cache_hits"] == 1
+        assert api.tokens[-1] is None  # no token given: the daemon's own
+    finally:
+        gdocs_daemon.stop(socket_path)
+        thread.join(5)
+    assert not os.path.exists(socket_path)
+
+
+def test_doc_cache_is_per_token():
+    """A cached document is only served to callers with the same token; a write drops it for all of them."""
+    api = FakeApi()
+    service = gdocs_daemon.GdocsService(api)
+
+    async def scenario():
+        first = await service.get_doc("d1", access_token="alice")
+        assert await service.get_doc("d1", access_token="alice") == first
+        assert await service.get_doc("d1", access_token="bob") != first
+        assert api.tokens == ["alice", "bob"]
+        await service.batch_update("d1", [{}], access_token="alice")
+        await service.get_doc("d1", access_token="bob")
+        assert api.tokens == ["alice", "bob", "alice", "bob"]
+
+    asyncio.run(scenario())
+
+
+def test_doc_cache_is_bounded():
+    """Expired snapshots are dropped on insert and the cache keeps only the most recently used documents."""
+    api = FakeApi()
+    service = gdocs_daemon.GdocsService(api, cache_ttl=30, cache_max_docs=2)
+
+    async def scenario():
+        await service.get_doc("d1")
+        await service.get_doc("d2")
+        await service.get_doc("d1")  # hit: d1 becomes the most recently used
+        await service.get_doc("d3")
+        assert list(service._cache) == [("", "d1"), ("", "d3")]
+        for key, (fetched, doc) in list(service._cache.items()):
+            service._cache[key] = (fetched - 31, doc)  # both snapshots are now past the TTL
+        await service.get_doc("d4")
+        assert list(service._cache) == [("", "d4")]
+
+    asyncio.run(scenario())
+    assert api.calls == [("get_doc", "d1"), ("get_doc", "d2"), ("get_doc", "d3"), ("get_doc", "d4")]
+
+
+def test_daemon_routed_calls_are_recorded(tmp_path, monkeypatch):
+    """Calls that go over the socket show up in the client's --stats under their endpoint kinds."""
+    socket_path = str(tmp_path / "gdocs.sock")
+    service = gdocs_daemon.GdocsService(FakeApi())
+    ready = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(gdocs_daemon.run_server(service, socket_path, ready=ready),))
+    thread.start()
+    assert ready.wait(5)
+    monkeypatch.setenv("GDOCS_SOCKET", socket_path)
+    monkeypatch.delenv("GDOCS_DAEMON", raising=False)
+    gdocs_metrics.reset()
+
+    try:
+        gdocs_cli.get_doc(document_id="d1", access_token="t")
+        gdocs_cli.get_doc(document_id="d1", access_token="t")
+        gdocs_cli.docs_batch_update(document_id="d1", access_token="t", requests=[{"x": 1}])
+        try:
+            gdocs_cli.docs_batch_update(document_id="d1", access_token="t", requests=[{}], required_revision_id="stale")
+        except HTTPError:
+            pass
+        out = tmp_path / "cv.docx"
+        gdocs_cli.drive_export_to_file(file_id="d1", access_token="t", mime_type="x", dest_path=str(out))
+        gdocs_daemon.ping(socket_path)
+    finally:
+        gdocs_daemon.stop(socket_path)
+        thread.join(5)
+
+    stats = gdocs_metrics.snapshot()
+    gdocs_metrics.reset()
+    assert set(stats) == {"docs.get", "docs.batchUpdate", "drive.export"}
+    assert stats["docs.get"]["calls"] == 2  # the cache hit counts too
+    assert stats["docs.batchUpdate"]["calls"] == 2
+    assert stats["docs.batchUpdate"]["statuses"] == {"200": 1, "400": 1}
+    assert stats["drive.export"]["bytes_received"] == 8
+    assert all(entry["bytes_sent"] > 0 for entry in stats.values())
@@ -0,0 +1,152 @@
+"""
+Unit tests for gdocs_aio's HTTP/1.1 client against a local asyncio server.
+
+Run with: python -m pytest test_gdocs_aio.py
+"""
+
+import asyncio
+import sys
+import os
+from urllib.error import HTTPError, URLError
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gdocs_aio import AsyncGoogleClient
+
+
+def reply(status=200, body=b"{}", headers=(), *, length=True):
+    """Raw response bytes; length=False leaves Content-Length to the caller's headers."""
+    lines = [f"HTTP/1.1 {status} X", *headers]
+    if length:
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class FakeServer:
+    """Answers each request with the next scripted action; None closes the connection without a reply."""
+
+    def __init__(self, *actions):
+        self.actions = list(actions)
+        self.seen = []
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        conn = self.connections
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            method, target, _ = request_line.decode("latin-1").split()
+            self.seen.append((conn, method, target, body))
+            action = self.actions.pop(0)
+            if action is None:
+                break
+            data, close = action if isinstance(action, tuple) else (action, False)
+            writer.write(data)
+            await writer.drain()
+            if close:
+                break
+        writer.close()
+
+
+def run(server, scenario):
+    """Serve on a free local port and run scenario(client, base_url); return its result."""
+
+    async def main():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            async with AsyncGoogleClient("tok", timeout=5) as client:
+                return await scenario(client, f"http://127.0.0.1:{port}")
+        finally:
+            listener.close()
+            await listener.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_content_length_and_chunked_bodies_share_a_connection():
+    """Both framings decode, and the second request reuses the kept-alive socket."""
+    chunked = reply(
+        body=b"4;ext=1\r\nabcd\r\n3\r\nefg\r\n0\r\nX-Trailer: t\r\n\r\n",
+        headers=["Transfer-Encoding: chunked"],
+        length=False,
+    )
+    server = FakeServer(reply(body=b"hello"), chunked)
+
+    async def scenario(client, base):
+        first = await client.request("GET", f"{base}/a?x=1")
+        second = await client.request("POST", f"{base}/b", body=b"payload")
+        return first[2], second[2]
+
+    assert run(server, scenario) == (b"hello", b"abcdefg")
+    assert [(conn, method, target) for conn, method, target, _ in server.seen] == [
+        (1, "GET", "/a?x=1"),
+        (1, "POST", "/b"),
+    ]
+    assert server.seen[1][3] == b"payload"
+
+
+def test_stale_pooled_socket_is_retried_once():
+    """A reused socket closed before any response byte is retried on a fresh connection."""
+    server = FakeServer(reply(body=b"one"), None, reply(body=b"two"))
+
+    async def scenario(client, base):
+        await client.request("GET", f"{base}/doc")
+        return await client.request("POST", f"{base}/doc:batchUpdate", body=b"{}")
+
+    assert run(server, scenario)[2] == b"two"
+    assert [(conn, method) for conn, method, _, _ in server.seen] == [(1, "GET"), (1, "POST"), (2, "POST")]
+
+
+def test_response_cut_short_is_not_retried():
+    """Once the status line arrived the server has the request: a POST is not sent twice."""
+    truncated = (reply(body=b"", headers=["Content-Length: 100"], length=False) + b"partial", True)
+    server = FakeServer(reply(), truncated, reply(body=b"again"))
+
+    async def scenario(client, base):
+        await client.request("GET", f"{base}/doc")
+        try:
+            await client.request("POST", f"{base}/doc:batchUpdate", body=b"{}")
+        except URLError as exc:
+            return exc
+        raise AssertionError("expected URLError for a truncated body")
+
+    assert "IncompleteReadError" in str(run(server, scenario))
+    assert [method for _, method, _, _ in server.seen] == ["GET", "POST"]
+
+
+def test_connection_close_is_not_pooled():
+    """A response with Connection: close sends the next request on a new connection."""
+    server = FakeServer(reply(body=b"bye", headers=["Connection: close"]), reply(body=b"hi"))
+
+    async def scenario(client, base):
+        await client.request("GET", f"{base}/a")
+        return await client.request("GET", f"{base}/b")
+
+    assert run(server, scenario)[2] == b"hi"
+    assert [conn for conn, _, _, _ in server.seen] == [1, 2]
+
+
+def test_client_error_raises_http_error():
+    """A 4xx becomes HTTPError carrying the status, headers and body."""
+    server = FakeServer(reply(404, b'{"error": "missing"}', ["X-Reason: gone"]))
+
+    async def scenario(client, base):
+        try:
+            await client.request("GET", f"{base}/missing")
+        except HTTPError as exc:
+            return exc
+        raise AssertionError("expected HTTPError for a 404")
+
+    exc = run(server, scenario)
+    assert exc.code == 404
+    assert exc.msg == '{"error": "missing"}'
+    assert exc.headers["X-Reason"] == "gone"
@@ -0,0 +1,414 @@
+"""
+Unit tests for gdocs_cli's Drive/Docs helpers, run against canned responses.
+
+Run with: python -m pytest test_gdocs_cli.py
+"""
+
+import io
+import json
+import sys
+import os
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+import zipfile
+from email.message import Message
+from urllib.error import HTTPError
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gdocs_cli
+import md_docx
+
+DOC_MIME = "application/vnd.google-apps.document"
+
+
+def headers(**values):
+    """Case-insensitive response headers, like http.client's."""
+    msg = Message()
+    for name, value in values.items():
+        msg[name.replace("_", "-")] = value
+    return msg
+
+
+class Canned:
+    """Stands in for urllib.request.urlopen (and the upload opener): replays responses, records requests."""
+
+    def __init__(self, *responses):
+        # (status, headers, body); statuses >= 300 are raised as HTTPError, like urllib does.
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, req, timeout=None):
+        self.requests.append(req)
+        status, resp_headers, body = self.responses.pop(0)
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if status >= 300:
+            raise HTTPError(req.full_url, status, "canned", resp_headers, io.BytesIO(body))
+        return CannedResponse(status, resp_headers, body)
+
+    open = __call__
+
+
+class CannedResponse(io.BytesIO):
+    def __init__(self, status, resp_headers, body):
+        super().__init__(body)
+        self.status = status
+        self.headers = resp_headers
+
+
+def canned(monkeypatch, *responses):
+    """Route gdocs_cli's HTTP through a Canned replay of `responses`."""
+    http = Canned(*responses)
+    monkeypatch.setattr(urllib.request, "urlopen", http)
+    monkeypatch.setattr(gdocs_cli, "_upload_opener", lambda: http)
+    return http
+
+
+def drive_error(code, reason=""):
+    """HTTPError as gdocs_cli raises it: the response body in msg."""
+    body = f'{{"error": {{"code": {code}, "errors": [{{"reason": "{reason}"}}]}}}}'
+    return HTTPError("https://www.googleapis.com/drive/v3/files/f1/export", code, body, None, None)
+
+
+def smart_markdown(monkeypatch, tmp_path, failure):
+    """Run drive_get_text_smart(md) with the native export failing; return (text, remembered support)."""
+    monkeypatch.setattr(gdocs_cli, "MARKDOWN_EXPORT_SUPPORT_PATH", str(tmp_path / "support.json"))
+    monkeypatch.setattr(gdocs_cli, "_markdown_export_support", None)
+
+    def export(*, file_id, access_token):
+        raise failure
+
+    class Docx:
+        markdown = "# From DOCX\n"
+
+    monkeypatch.setattr(gdocs_cli, "drive_export_markdown", export)
+    monkeypatch.setattr(gdocs_cli, "drive_get_docx_document", lambda **kwargs: ("CV", Docx()))
+    _, text = gdocs_cli.drive_get_text_smart(
+        file_id="f1", access_token="t", output_format="md", resolved=("f1", {"name": "CV", "mimeType": DOC_MIME})
+    )
+    return text, gdocs_cli.markdown_export_supported("f1")
+
+
+def test_markdown_export_remembers_only_document_failures(monkeypatch, tmp_path):
+    """400 and 403 cannotExportFile/exportSizeLimitExceeded are cached; 429, other 403s and 5xx are not."""
+    for i, (failure, remembered) in enumerate((
+        (drive_error(400, "badRequest"), False),
+        (drive_error(403, "cannotExportFile"), False),
+        (drive_error(403, "exportSizeLimitExceeded"), False),
+        (drive_error(403, "rateLimitExceeded"), None),
+        (drive_error(403, "insufficientFilePermissions"), None),
+        (drive_error(404, "notFound"), None),
+        (drive_error(429, "rateLimitExceeded"), None),
+        (drive_error(503, "backendError"), None),
+    )):
+        text, support = smart_markdown(monkeypatch, tmp_path / str(i), failure)
+        assert text == "# From DOCX\n"
+        assert support is remembered, (failure.code, failure.msg)
+
+
+def test_markdown_export_does_not_swallow_401(monkeypatch, tmp_path):
+    """An expired token surfaces instead of falling back to the DOCX path."""
+    try:
+        smart_markdown(monkeypatch, tmp_path, drive_error(401, "authError"))
+    except HTTPError as exc:
+        assert exc.code == 401
+    else:
+        raise AssertionError("expected the 401 to propagate")
+
+
+BATCH_RESPONSE = (
+    "--batch_xyz\r\n"
+    "Content-Type: application/http\r\n"
+    "Content-ID: <response-item1>\r\n\r\n"
+    "HTTP/1.1 404 Not Found\r\n"
+    "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+    '{"error": {"code": 404, "message": "File not found: f2."}}\r\n'
+    "--batch_xyz\r\n"
+    "Content-Type: application/http\r\n"
+    "Content-ID: <response-item0>\r\n\r\n"
+    "HTTP/1.1 200 OK\r\n"
+    "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+    '{"id": "f1", "name": "CV", "mimeType": "application/vnd.google-apps.document"}\r\n'
+    "--batch_xyz--\r\n"
+)
+
+
+def test_parse_multipart_mixed_splits_parts():
+    """Parts keep their MIME headers (lower-cased) and embedded HTTP responses; the closing delimiter ends parsing."""
+    parts = gdocs_cli.parse_multipart_mixed(BATCH_RESPONSE.encode("utf-8") + b"epilogue", "batch_xyz")
+    assert [h["content-id"] for h, _ in parts] == ["<response-item1>", "<response-item0>"]
+    assert parts[0][1].startswith(b"HTTP/1.1 404 Not Found\r\n")
+    assert parts[1][1].endswith(b'"mimeType": "application/vnd.google-apps.document"}')
+
+
+def test_http_post_batch_orders_results_by_content_id(monkeypatch):
+    """One multipart request carries every call; out-of-order response parts map back by Content-ID."""
+    http = canned(monkeypatch, (200, headers(Content_Type="multipart/mixed; boundary=batch_xyz"), BATCH_RESPONSE))
+
+    results = gdocs_cli.http_post_batch(
+        gdocs_cli.DRIVE_BATCH_URL, "tok", [("GET", "/drive/v3/files/f1"), ("GET", "/drive/v3/files/f2"), ("GET", "/x")]
+    )
+
+    assert results[0] == (200, {"id": "f1", "name": "CV", "mimeType": DOC_MIME})
+    assert results[1] == (404, {"error": {"code": 404, "message": "File not found: f2."}})
+    assert results[2] == (0, None)  # no part came back for it
+    (req,) = http.requests
+    boundary = req.get_header("Content-type").split("boundary=")[1]
+    sent = gdocs_cli.parse_multipart_mixed(req.data, boundary)
+    assert [h["content-id"] for h, _ in sent] == ["<item0>", "<item1>", "<item2>"]
+    assert sent[1][1].startswith(b"GET /drive/v3/files/f2 HTTP/1.1")
+    assert req.get_header("Authorization") == "Bearer tok"
+
+
+def test_drive_batch_get_metadata_keeps_part_errors(monkeypatch):
+    """A failed or missing part becomes an {"error": ...} entry instead of failing the whole batch."""
+    canned(monkeypatch, (200, headers(Content_Type='multipart/mixed; boundary="batch_xyz"'), BATCH_RESPONSE))
+    metas = gdocs_cli.drive_batch_get_metadata(file_ids=["f1", "f2", "f1"], access_token="tok")
+    assert metas["f1"]["name"] == "CV"
+    assert metas["f2"]["error"]["code"] == 404
+    assert list(metas) == ["f1", "f2"]
+
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+DOCUMENT_XML = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="{W_NS}"><w:body>
+  <w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Jane Doe</w:t></w:r></w:p>
+  <w:p><w:r><w:t xml:space="preserve">Go </w:t><w:tab/><w:t>Rust</w:t><w:br/><w:t>SQL</w:t></w:r></w:p>
+  <w:tbl><w:tr>
+    <w:tc><w:p><w:r><w:t>cell 1</w:t></w:r></w:p><w:p><w:r><w:t>cell 1b</w:t></w:r></w:p></w:tc>
+    <w:tc><w:p><w:r><w:t>cell 2</w:t></w:r></w:p></w:tc>
+  </w:tr></w:tbl>
+  <w:p><w:r><w:t>Host </w:t></w:r><w:r><w:pict><w:txbxContent>
+    <w:p><w:r><w:t>In a text box</w:t></w:r></w:p>
+  </w:txbxContent></w:pict></w:r></w:p>
+  <w:p/>
+  <w:p><w:pPr><w:numPr><w:ilvl w:val="1"/><w:numId w:val="1"/></w:numPr></w:pPr><w:r><w:t>Nested item</w:t></w:r></w:p>
+  <w:sectPr/>
+</w:body></w:document>"""
+
+
+def docx_bytes(document_xml=DOCUMENT_XML):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("word/document.xml", document_xml)
+    return buf.getvalue()
+
+
+def test_streaming_reader_matches_dom_reader():
+    """iter_docx_paragraphs gives what the old full-DOM readers did, for body, table and text-box paragraphs."""
+    root = ET.fromstring(DOCUMENT_XML)
+    ns = {"w": W_NS}
+    # The DOM readers: every <w:p> for plain text, direct <w:body> children for markdown/struct.
+    dom_text = [gdocs_cli._docx_plain_line(p) for p in root.findall(".//w:p", ns)]
+    dom_body = [gdocs_cli._docx_plain_line(p) for p in root.findall(".//w:body/w:p", ns)]
+
+    with zipfile.ZipFile(io.BytesIO(docx_bytes())) as zf:
+        streamed = [
+            ([gdocs_cli._docx_plain_line(p) for p in outer.iter(f"{{{W_NS}}}p")], at_body)
+            for outer, at_body in gdocs_cli.iter_docx_paragraphs(zf)
+        ]
+
+    assert [line for lines, _ in streamed for line in lines] == dom_text
+    assert [lines[0] for lines, at_body in streamed if at_body] == dom_body
+    assert dom_text[1] == "Go \tRust\nSQL"
+    assert [lines for lines, at_body in streamed if not at_body] == [["cell 1"], ["cell 1b"], ["cell 2"]]
+
+
+def test_decoded_views_match_dom_reader():
+    """DocxDocument's text and markdown views are built from the same paragraphs the DOM reader saw."""
+    root = ET.fromstring(DOCUMENT_XML)
+    lines = [gdocs_cli._docx_plain_line(p) for p in root.findall(".//{%s}p" % W_NS)]
+    doc = gdocs_cli.DocxDocument.decode(docx_bytes())
+    assert doc.text == "\n".join(line for line in lines if line != "")
+    assert doc.markdown.splitlines()[0] == "# Jane Doe"
+    assert "  - Nested item" in doc.markdown.splitlines()
+    assert "cell 1" not in doc.markdown
+
+
+def test_streaming_reader_drops_finished_subtrees(monkeypatch):
+    """Body children already yielded are removed, so memory stays flat on long documents."""
+    bodies = []
+    iterparse = ET.iterparse
+
+    def recording_iterparse(source, events):
+        for event, elem in iterparse(source, events=events):
+            if event == "start" and elem.tag == f"{{{W_NS}}}body":
+                bodies.append(elem)
+            yield event, elem
+
+    monkeypatch.setattr(ET, "iterparse", recording_iterparse)
+    paragraphs = "".join(f"<w:p><w:r><w:t>Line {i}</w:t></w:r></w:p>" for i in range(5000))
+    document_xml = f'<w:document xmlns:w="{W_NS}"><w:body>{paragraphs}</w:body></w:document>'
+    held = []
+    lines = 0
+    with zipfile.ZipFile(io.BytesIO(docx_bytes(document_xml))) as zf:
+        for p, _ in gdocs_cli.iter_docx_paragraphs(zf):
+            assert gdocs_cli._docx_plain_line(p) == f"Line {lines}"
+            lines += 1
+            held.append(len(bodies[0]))
+    # The body only ever holds what the parser has read ahead (one buffer), never the whole document.
+    assert lines == 5000
+    assert max(held) < 1000
+    assert len(bodies[0]) == 0
+
+
+def test_render_cache_key_covers_every_input(tmp_path):
+    """The key changes with the markdown, list normalization, renderer version and reference bytes, not line endings."""
+    reference = tmp_path / "reference.docx"
+    reference.write_bytes(b"styles v1")
+
+    def key(markdown="# CV\n- a\n", ref=str(reference), renderer="builtin", normalize_lists=True):
+        return gdocs_cli.render_cache_key(markdown, ref, renderer=renderer, normalize_lists=normalize_lists)
+
+    base = key()
+    assert key() == base
+    assert key("# CV\r\n- a\r\n") == base
+    others = {key("# CV\n- b\n"), key(normalize_lists=False), key(ref=None)}
+    reference.write_bytes(b"styles v2")
+    others.add(key())
+    assert base not in others and len(others) == 4
+
+
+def test_render_cache_key_tracks_renderer_version(monkeypatch):
+    """Bumping md_docx.RENDERER_VERSION invalidates earlier builtin renders."""
+    before = gdocs_cli.render_cache_key("# CV\n", None, renderer="builtin", normalize_lists=False)
+    monkeypatch.setattr(md_docx, "RENDERER_VERSION", md_docx.RENDERER_VERSION + "-next")
+    assert gdocs_cli.render_cache_key("# CV\n", None, renderer="builtin", normalize_lists=False) != before
+
+
+def test_render_cache_dir_is_anchored_at_repo_root(monkeypatch, tmp_path):
+    """The default cache lives under the repository, not under whatever directory the CLI runs from."""
+    monkeypatch.chdir(tmp_path)
+    assert os.path.isabs(gdocs_cli.RENDER_CACHE_DIR)
+    assert os.path.dirname(os.path.dirname(gdocs_cli.RENDER_CACHE_DIR)) == gdocs_cli.ROOT_DIR
+
+
+def test_render_markdown_to_docx_reuses_cached_render(monkeypatch, tmp_path):
+    """The second render of identical input is copied from the cache without rendering."""
+    md = tmp_path / "cv.md"
+    md.write_text("# CV\n\nHello\n", encoding="utf-8")
+    cache_dir = str(tmp_path / "cache")
+    renders = []
+    render = gdocs_cli._render_docx
+    monkeypatch.setattr(gdocs_cli, "_render_docx", lambda *a, **kw: (renders.append(a), render(*a, **kw)))
+
+    first, second = tmp_path / "a.docx", tmp_path / "b.docx"
+    kwargs = {"normalize_lists": False, "renderer": "builtin", "cache_dir": cache_dir}
+    assert gdocs_cli.render_markdown_to_docx(str(md), str(first), None, **kwargs) is False
+    assert gdocs_cli.render_markdown_to_docx(str(md), str(second), None, **kwargs) is True
+    assert len(renders) == 1
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_resumable_offset_from_range_header():
+    """The next offset follows the last persisted byte; no Range header means nothing was kept."""
+    assert gdocs_cli._resumable_offset("bytes=0-1048575") == 1048576
+    assert gdocs_cli._resumable_offset("bytes=0-0") == 1
+    assert gdocs_cli._resumable_offset(None) == 0
+    assert gdocs_cli._resumable_offset("") == 0
+
+
+def test_resumable_upload_resumes_from_what_the_server_kept(monkeypatch, tmp_path):
+    """308s advance by the Range header; after a 503 the session is queried and the upload resumes there."""
+    path = tmp_path / "cv.docx"
+    path.write_bytes(b"0123456789")
+    monkeypatch.setattr(gdocs_cli.time, "sleep", lambda seconds: None)
+    session = "https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&upload_id=s1"
+    http = canned(
+        monkeypatch,
+        (200, headers(Location=session), ""),
+        (308, headers(Range="bytes=0-3"), ""),
+        (503, headers(), "backend error"),
+        (308, headers(Range="bytes=0-5"), ""),  # only 2 bytes of the failed chunk landed
+        (200, headers(), {"id": "new", "name": "CV"}),
+    )
+
+    result = gdocs_cli.drive_upload_resumable(
+        access_token="tok", file_path=str(path), metadata={"name": "CV"}, media_type="application/x", chunk_size=4
+    )
+
+    assert result == {"id": "new", "name": "CV"}
+    start, *puts = http.requests
+    assert start.get_header("X-upload-content-length") == "10"
+    assert [(r.get_header("Content-range"), r.data) for r in puts] == [
+        ("bytes 0-3/10", b"0123"),
+        ("bytes 4-7/10", b"4567"),
+        ("bytes */10", b""),
+        ("bytes 6-9/10", b"6789"),
+    ]
+    assert all(r.full_url == session for r in puts)
+
+
+def test_resumable_upload_expired_session(monkeypatch, tmp_path):
+    """A 404/410 from the session URL ends the upload with a clear message."""
+    path = tmp_path / "cv.docx"
+    path.write_bytes(b"0123")
+    canned(monkeypatch, (200, headers(Location="https://upload/s1"), ""), (410, headers(), "gone"))
+    try:
+        gdocs_cli.drive_upload_resumable(access_token="t", file_path=str(path), metadata={}, media_type="x")
+    except SystemExit as exc:
+        assert "expired" in str(exc)
+    else:
+        raise AssertionError("expected SystemExit")
+
+
+def test_drive_copy_file_posts_name_and_parents(monkeypatch):
+    """files.copy is one POST with the new name/parents; shared drives are supported."""
+    http = canned(monkeypatch, (200, headers(), {"id": "copy1", "name": "CV - Acme", "mimeType": DOC_MIME}))
+
+    copied = gdocs_cli.drive_copy_file(file_id="tmpl", access_token="tok", name="CV - Acme", parents=["folder"])
+
+    assert copied["id"] == "copy1"
+    (req,) = http.requests
+    assert req.get_method() == "POST"
+    url = urllib.parse.urlsplit(req.full_url)
+    assert url.path == "/drive/v3/files/tmpl/copy"
+    assert urllib.parse.parse_qs(url.query) == {"fields": ["id,name,mimeType"], "supportsAllDrives": ["true"]}
+    assert json.loads(req.data) == {"name": "CV - Acme", "parents": ["folder"]}
+
+
+def test_drive_copy_file_surfaces_http_errors(monkeypatch):
+    """A missing template surfaces as HTTPError with the API's error body."""
+    canned(monkeypatch, (404, headers(), {"error": {"code": 404, "message": "File not found: tmpl."}}))
+    try:
+        gdocs_cli.drive_copy_file(file_id="tmpl", access_token="tok")
+    except HTTPError as exc:
+        assert exc.code == 404 and "File not found" in exc.msg
+    else:
+        raise AssertionError("expected HTTPError")
+
+
+def test_resumable_session_start_backs_off_on_transient_errors(monkeypatch):
+    """429/5xx when opening the session are retried with backoff; other 4xx fail at once."""
+    sleeps = []
+    monkeypatch.setattr(gdocs_cli.time, "sleep", sleeps.append)
+    start = {"access_token": "t", "metadata": {"name": "CV"}, "media_type": "x", "size": 10}
+    http = canned(
+        monkeypatch,
+        (429, headers(), "rate limited"),
+        (503, headers(), "backend error"),
+        (200, headers(Location="https://upload/s1"), ""),
+    )
+    assert gdocs_cli.drive_upload_resumable_start(**start) == "https://upload/s1"
+    assert len(http.requests) == 3 and sleeps == [2, 4]
+
+    canned(monkeypatch, *[(500, headers(), "down")] * (gdocs_cli.RESUMABLE_MAX_RETRIES + 1))
+    try:
+        gdocs_cli.drive_upload_resumable_start(**start)
+    except SystemExit as exc:
+        assert "HTTP 500" in str(exc)
+    else:
+        raise AssertionError("expected SystemExit after the retries")
+
+    http = canned(monkeypatch, (403, headers(), "forbidden"))
+    try:
+        gdocs_cli.drive_upload_resumable_start(**start)
+    except SystemExit as exc:
+        assert "HTTP 403" in str(exc) and len(http.requests) == 1
+    else:
+        raise AssertionError("expected SystemExit")
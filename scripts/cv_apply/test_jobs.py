@@ -0,0 +1,156 @@
+"""
+Unit tests for the persistent job queue and worker pool.
+
+Run with: python -m pytest test_jobs.py
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv_jobs
+from cv_apply.formatters import format_experiences, format_skills
+from cv_apply.jobs import Job, JobQueue, run_workers
+from cv_apply.memo import SECTION_MEMO
+
+
+def test_lease_serializes_per_document_and_dead_letters(tmp_path):
+    """Jobs for one doc run in order one at a time; failures back off, expired leases retry, then dead-letter."""
+    with JobQueue(str(tmp_path / "jobs.db")) as queue:
+        a1 = queue.enqueue("apply", ["--data", "a.json"], doc="A")
+        a2 = queue.enqueue("export", ["--out", "a.docx"], doc="A")
+        b1 = queue.enqueue("apply", [], doc="B", max_attempts=2)
+
+        now = time.time()
+        assert queue.lease("w0", now=now).id == a1
+        assert queue.lease("w1", now=now).id == b1
+        assert queue.lease("w1", now=now) is None  # a2 waits for a1
+
+        assert queue.complete(a1, "w0")
+        job = queue.lease("w0", now=now)
+        assert (job.id, job.args) == (a2, ["--out", "a.docx"])
+
+        # b1 fails once: retried after the backoff, not before
+        assert queue.fail(b1, "w1", "boom", retry_base=10, now=now) == "queued"
+        assert queue.lease("w1", now=now + 5) is None
+        assert queue.lease("w1", now=now + 11).id == b1
+
+        assert queue.complete(a2, "w0")
+        # The worker crashes: the expired lease used the last attempt, so b1 is dead-lettered
+        assert queue.lease("w2", now=now + 11 + 10_000) is None
+        assert queue.complete(b1, "w1") is False
+        assert queue.counts() == {"queued": 0, "leased": 0, "done": 2, "dead": 1}
+
+        assert queue.requeue(b1) == 1
+        assert queue.lease("w2").attempts == 1
+
+
+def test_workers_drain_queue_without_overlapping_docs(tmp_path):
+    """N workers drain the queue; two jobs for the same doc never overlap."""
+    path = str(tmp_path / "jobs.db")
+    with JobQueue(path) as queue:
+        for i in range(6):
+            queue.enqueue("apply", [str(i)], doc="AB"[i % 2])
+        queue.enqueue("apply", ["fail"], doc="C", max_attempts=1)
+
+    active: dict[str, int] = {}
+    overlaps = []
+    order: dict[str, list[str]] = {}
+    lock = threading.Lock()
+
+    def apply(job):
+        with lock:
+            active[job.doc] = active.get(job.doc, 0) + 1
+            if active[job.doc] > 1:
+                overlaps.append(job.doc)
+            order.setdefault(job.doc, []).append(job.args[0])
+        time.sleep(0.01)
+        with lock:
+            active[job.doc] -= 1
+        if job.args == ["fail"]:
+            raise SystemExit("template missing")
+        return 0
+
+    totals = run_workers(path, {"apply": apply}, workers=3, poll=0.01)
+    assert totals == {"done": 6, "failed": 0, "dead": 1}
+    assert overlaps == []
+    assert order["A"] == ["0", "2", "4"] and order["B"] == ["1", "3", "5"]
+    with JobQueue(path) as queue:
+        assert queue.list_jobs("dead")[0]["last_error"] == "template missing"
+
+
+def test_running_job_keeps_its_lease(tmp_path):
+    """A job that runs past the lease length is renewed by its worker, not re-leased by another."""
+    path = str(tmp_path / "jobs.db")
+    with JobQueue(path) as queue:
+        queue.enqueue("apply", [], doc="A")
+    stolen = []
+
+    def apply(job):
+        time.sleep(0.75)  # more than twice the lease below
+        with JobQueue(path) as other:
+            stolen.append(other.lease("intruder", lease_seconds=0.3))
+        return 0
+
+    totals = run_workers(path, {"apply": apply}, workers=1, lease_seconds=0.3, poll=0.01)
+    assert totals == {"done": 1, "failed": 0, "dead": 0}
+    assert stolen == [None]
+
+
+def test_two_workers_share_section_memo(tmp_path):
+    """Two workers formatting two documents at once through a tiny memo: evictions race lookups safely."""
+    path = str(tmp_path / "jobs.db")
+    docs = {
+        "A": {"skills": [{"title": "Languages", "bullets": ["Python"]}], "experience": [{"company": "Acme", "role": "Dev"}]},
+        "B": {"skills": [{"title": "Tools", "bullets": ["Docker"]}], "experience": [{"company": "Beta", "role": "Lead"}]},
+    }
+    with JobQueue(path) as queue:
+        for doc in docs:
+            queue.enqueue("apply", [], doc=doc)
+
+    results = {}
+
+    def apply(job):
+        data = docs[job.doc]
+        for i in range(2000):
+            results[job.doc] = (format_skills(data), format_experiences(data, "en" if i % 2 else "ru"))
+        return 0
+
+    maxsize = SECTION_MEMO.maxsize
+    SECTION_MEMO.clear()
+    SECTION_MEMO.maxsize = 2
+    try:
+        totals = run_workers(path, {"apply": apply}, workers=2, poll=0.01)
+    finally:
+        SECTION_MEMO.maxsize = maxsize
+        SECTION_MEMO.clear()
+    assert totals == {"done": 2, "failed": 0, "dead": 0}
+    assert "Python" in results["A"][0] and "Docker" in results["B"][0]
+
+
+def test_process_wide_options_need_one_worker(tmp_path):
+    """--trace/--profile jobs are refused up front and per job when more than one worker runs."""
+    path = str(tmp_path / "jobs.db")
+    assert cv_jobs.process_wide_options(["--data", "x.json", "--trace=t.json", "--profile-top", "5"]) == ["--trace"]
+    with JobQueue(path) as queue:
+        job_id = queue.enqueue("apply", ["--profile", "p.txt"], doc="A")
+
+    try:
+        cv_jobs.main(["--queue", path, "work", "--workers", "2"])
+    except SystemExit as exc:
+        assert f"#{job_id}" in str(exc)
+    else:
+        raise AssertionError("expected work --workers 2 to refuse the job")
+
+    job = Job(id=job_id, kind="apply", doc="A", args=["--profile", "p.txt"], attempts=1, max_attempts=3)
+    executors = cv_jobs.build_executors("client.json", "token.json", workers=2)
+    try:
+        executors["apply"](job)
+    except SystemExit as exc:
+        assert "--profile" in str(exc)
+    else:
+        raise AssertionError("expected the executor to refuse the job")
@@ -0,0 +1,142 @@
+"""
+Round-trip tests for md_docx: render Markdown, then read it back with gdocs_cli's DOCX decoder.
+
+Run with: python -m pytest test_md_docx.py
+"""
+
+import io
+import sys
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import md_docx
+from gdocs_cli import DocxDocument
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+MARKDOWN = """# Jane Doe
+
+Intro with a [portfolio](https://example.com/jane) and **bold** text.
+
+## Experience
+
+- Led the platform team
+    - Cut deploy time by half
+- Mentored engineers
+
+1. First
+2. Second
+
+| Skill | Years |
+|-------|------:|
+| Go    | 5     |
+
+::: {custom-style="Skills Line"}
+Python, Go, SQL
+:::
+"""
+
+
+def render(markdown=MARKDOWN, **kwargs):
+    """Render and decode; return (DocxDocument, zip parts by name)."""
+    data = md_docx.render_markdown_docx(markdown, **kwargs)
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        parts = {name: zf.read(name) for name in zf.namelist()}
+    return DocxDocument.decode(data), parts
+
+
+def body_paragraphs(doc):
+    return [p for p in doc.paragraphs if p.body_level]
+
+
+def test_headings_round_trip():
+    """ATX headings become HeadingN paragraphs and come back as Markdown headings."""
+    doc, _ = render()
+    headings = [(p.style, p.plain_lines[0]) for p in body_paragraphs(doc) if p.style.startswith("Heading")]
+    assert headings == [("Heading1", "Jane Doe"), ("Heading2", "Experience")]
+    assert doc.markdown.splitlines()[:1] == ["# Jane Doe"]
+
+
+def test_heading_keeps_trailing_hash_without_space():
+    """Only a closing run of # after whitespace is stripped, so "C#" and "F#" survive."""
+    blocks = md_docx.parse_blocks("## Skills: C#\n\n# F#\n\n### Tools ###\n")
+    assert [(b.level, b.text) for b in blocks] == [(2, "Skills: C#"), (1, "F#"), (3, "Tools")]
+    doc, _ = render("## Skills: C#\n\nGo\n")
+    assert doc.paragraphs[0].plain_lines[0] == "Skills: C#"
+
+
+def test_nested_lists_keep_levels_and_numbering():
+    """Nested bullets keep their nesting level; ordered lists get their own decimal numbering."""
+    doc, parts = render()
+    items = [(p.list_level, p.plain_lines[0]) for p in body_paragraphs(doc) if p.list_level is not None]
+    assert items == [
+        (0, "Led the platform team"),
+        (1, "Cut deploy time by half"),
+        (0, "Mentored engineers"),
+        (0, "First"),
+        (0, "Second"),
+    ]
+    numbering = ET.fromstring(parts["word/numbering.xml"])
+    ordered = [n for n in numbering.iter(f"{W}num") if n.get(f"{W}numId") != "1"]
+    assert len(ordered) == 1
+    assert "  - Cut deploy time by half" in doc.markdown.splitlines()
+
+
+def test_table_cells_and_alignment():
+    """Table cells decode as non-body paragraphs; the header row is bold and `--:` right-aligns."""
+    doc, parts = render()
+    cells = [p.plain_lines[0] for p in doc.paragraphs if not p.body_level]
+    assert cells == ["Skill", "Years", "Go", "5"]
+    document = ET.fromstring(parts["word/document.xml"])
+    rows = list(document.iter(f"{W}tr"))
+    assert rows[0].find(f"{W}trPr/{W}tblHeader") is not None
+    assert all(r.find(f"{W}rPr/{W}b") is not None for r in rows[0].iter(f"{W}r"))
+    jcs = [jc.get(f"{W}val") for jc in document.iter(f"{W}jc")]
+    assert jcs == ["right", "right"]
+
+
+def test_links_resolve_through_relationships():
+    """Links are external hyperlink relationships and decode back to the URL."""
+    doc, parts = render()
+    links = [run for p in body_paragraphs(doc) for run in p.runs if run.link]
+    assert [(r.text, r.link) for r in links] == [("portfolio", "https://example.com/jane")]
+    assert b'TargetMode="External"' in parts["word/_rels/document.xml.rels"]
+    assert "[portfolio](https://example.com/jane)" in doc.markdown
+
+
+def test_custom_style_div_adds_style():
+    """A fenced div's custom-style becomes a paragraph style (spaces dropped) based on BodyText."""
+    doc, parts = render()
+    styled = [p for p in body_paragraphs(doc) if p.style == "SkillsLine"]
+    assert [p.plain_lines[0] for p in styled] == ["Python, Go, SQL"]
+    styles = ET.fromstring(parts["word/styles.xml"])
+    style = next(s for s in styles.iter(f"{W}style") if s.get(f"{W}styleId") == "SkillsLine")
+    assert style.find(f"{W}basedOn").get(f"{W}val") == "BodyText"
+
+
+def test_reference_prefixes_stay_local(tmp_path):
+    """Rendering keeps w:/r: and the reference's prefixes without changing ElementTree's global map."""
+    reference = tmp_path / "reference.docx"
+    styles_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        ' xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml">'
+        '<w:style w:type="paragraph" w:styleId="BodyText"><w:name w:val="Body Text"/>'
+        '<w:rPr><w14:ligatures w14:val="standard"/></w:rPr></w:style>'
+        "</w:styles>"
+    )
+    with zipfile.ZipFile(reference, "w") as zf:
+        zf.writestr("word/styles.xml", styles_xml)
+    before = dict(ET._namespace_map)
+
+    doc, parts = render("# Title\n\nBody", reference_docx=str(reference))
+
+    assert dict(ET._namespace_map) == before
+    assert parts["word/document.xml"].count(b"<w:p>") == 2
+    assert b"<w14:ligatures" in parts["word/styles.xml"]
+    assert [p.style for p in doc.paragraphs] == ["Heading1", "BodyText"]
+
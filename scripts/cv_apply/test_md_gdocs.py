@@ -0,0 +1,65 @@
+"""
+Unit tests for compiling Markdown into Docs batchUpdate requests (import-md --in-place).
+
+Run with: python -m pytest test_md_gdocs.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply._fakedoc import make_doc, run_requests
+from md_docx import parse_blocks
+from md_gdocs import compile_blocks, plan_markdown_update, utf16_len
+
+
+def test_section_under_last_heading_is_inserted_before_final_newline():
+    """When the heading is the document's last paragraph, the section lands after it, inside the segment."""
+    doc = make_doc([("Jane Doe\n", "TITLE"), ("Intro\n", "NORMAL_TEXT"), ("Skills\n", "HEADING_2")])
+    requests = plan_markdown_update(doc, "# Jane\n\n## Skills\n\n- Go\n- Rust\n", section="Skills")
+
+    text, styled = run_requests(doc, requests)
+    assert text == "Jane Doe\nIntro\nSkills\nGo\nRust\n"
+    assert not any("deleteContentRange" in req for req in requests)
+    assert ("updateParagraphStyle", "NORMAL_TEXT", "Go\nRust") in styled
+    assert ("createParagraphBullets", None, "Go\nRust") in styled
+    # The heading paragraph itself is never restyled.
+    assert not any("Skills" in covered for _, _, covered in styled)
+
+
+def test_empty_section_under_last_heading_changes_nothing():
+    """An empty replacement section under a trailing heading yields no requests."""
+    doc = make_doc([("Intro\n", "NORMAL_TEXT"), ("Skills\n", "HEADING_2")])
+    assert plan_markdown_update(doc, "## Skills\n", section="Skills") == []
+
+
+def test_section_in_the_middle_is_replaced():
+    """The body under a heading (up to the next same-level heading) is deleted and rewritten."""
+    doc = make_doc([
+        ("Skills\n", "HEADING_2"),
+        ("Old skill\n", "NORMAL_TEXT"),
+        ("Experience\n", "HEADING_2"),
+        ("Acme\n", "NORMAL_TEXT"),
+    ])
+    requests = plan_markdown_update(doc, "## Skills\n\nNew *skill*\n", section="Skills")
+
+    text, _ = run_requests(doc, requests)
+    assert text == "Skills\nNew skill\nExperience\nAcme\n"
+
+
+def test_compile_blocks_counts_utf16_code_units():
+    """Ranges after astral characters (emoji take two UTF-16 units) still cover the right text."""
+    doc = make_doc([("\n", "NORMAL_TEXT")])
+    markdown = "# Team 😀\n\n**Go 😀** and [docs](https://example.com) 😀\n\n- 😀 first\n- second\n"
+    requests = compile_blocks(parse_blocks(markdown), start_index=1, trailing_newline=False)
+
+    text, styled = run_requests(doc, requests)
+    assert text == "Team 😀\nGo 😀 and docs 😀\n😀 first\nsecond\n"
+    spans = {covered for kind, _, covered in styled if kind == "updateTextStyle"}
+    assert {"Go 😀", "docs"} <= spans
+    assert ("updateParagraphStyle", "HEADING_1", "Team 😀\n") in styled
+    assert ("createParagraphBullets", None, "😀 first\nsecond") in styled
+    insert = requests[0]["insertText"]
+    assert utf16_len(insert["text"]) == len(insert["text"]) + 4
@@ -0,0 +1,101 @@
+"""
+Unit tests for section-fingerprint memoization.
+
+Run with: python -m pytest test_memo.py
+"""
+
+import sys
+import os
+import threading
+from collections import OrderedDict
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply.formatters import build_replacements, format_experiences
+from cv_apply.memo import SECTION_MEMO, SectionMemo, fingerprint
+
+
+SAMPLE = {
+    "summary": {"paragraph": "Engineer", "about": "Builds things"},
+    "skills": [{"title": "Languages", "bullets": ["Python", "Go"]}],
+    "experience": [
+        {"company": "Acme", "role": "Engineer", "bullets": ["Shipped"], "technologies": "Python"},
+        {"company": "Startup", "role": "Co-Founder", "bullets": ["Founded"]},
+    ],
+}
+
+
+def test_fingerprint_ignores_key_order():
+    """Test that equal section inputs hash equally regardless of dict order."""
+    a = fingerprint("skills", {"title": "X", "bullets": ["a"]})
+    b = fingerprint("skills", {"bullets": ["a"], "title": "X"})
+    assert a == b
+    assert a != fingerprint("skills", {"title": "X", "bullets": ["a"]}, "ru")
+
+
+def test_lru_eviction():
+    """Test that the memo keeps only the most recently used entries."""
+    memo = SectionMemo(maxsize=2)
+    memo.put("a", "1")
+    memo.put("b", "2")
+    memo.get("a")
+    memo.put("c", "3")
+    assert memo.get("b") == (False, None)
+    assert memo.get("a") == (True, "1")
+    assert len(memo) == 2
+
+
+def test_memoized_output_matches_and_is_reused():
+    """Test that memoized formatters return identical output and hit the memo."""
+    SECTION_MEMO.clear()
+    first = build_replacements(SAMPLE, lang="en")
+    misses = SECTION_MEMO.misses
+    second = build_replacements(dict(SAMPLE, header={"full_name": "Other"}), lang="en")
+    assert SECTION_MEMO.misses == misses
+    assert {k: v for k, v in first.items() if k != "{{fullname}}"} == {
+        k: v for k, v in second.items() if k != "{{fullname}}"
+    }
+    # lang is part of the key for experience
+    format_experiences(SAMPLE, "ru")
+    assert SECTION_MEMO.misses == misses + 1
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    """Test that persisted entries (including tuples) load back unchanged."""
+    SECTION_MEMO.clear()
+    expected = format_experiences(SAMPLE, "en")
+    path = str(tmp_path / "memo.json")
+    SECTION_MEMO.save(path)
+
+    SECTION_MEMO.clear()
+    assert SECTION_MEMO.load(path) >= 1
+    assert format_experiences(SAMPLE, "en") == expected
+    assert SECTION_MEMO.hits == 1
+    assert isinstance(format_experiences(SAMPLE, "en"), tuple)
+
+
+def test_get_is_atomic_against_concurrent_eviction():
+    """Test that a put from another thread cannot evict an entry between get's lookup and its LRU bump."""
+    memo = SectionMemo(maxsize=1)
+    memo.put("a", "1")
+
+    class RacingEntries(OrderedDict):
+        raced = False
+
+        def __contains__(self, key):
+            found = super().__contains__(key)
+            if not RacingEntries.raced:
+                RacingEntries.raced = True
+                # Would evict "a" right here without the memo's lock; with it, the put waits for get.
+                writer = threading.Thread(target=memo.put, args=("b", "2"))
+                writer.start()
+                writer.join(0.1)
+                racing.append(writer)
+            return found
+
+    racing = []
+    memo._entries = RacingEntries(memo._entries)
+    assert memo.get("a") == (True, "1")
+    racing[0].join(5)
+    assert memo.get("b") == (True, "2") and len(memo) == 1
@@ -0,0 +1,95 @@
+"""
+Unit tests for per-endpoint API call accounting.
+
+Run with: python -m pytest test_metrics.py
+"""
+
+import json
+import sys
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.error import HTTPError
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gdocs_cli
+import gdocs_metrics
+
+
+class DocsHandler(BaseHTTPRequestHandler):
+    """GET returns a document, POST fails with 400."""
+
+    def log_message(self, format, *args):
+        return
+
+    def do_GET(self):  # noqa: N802
+        body = b'{"documentId": "d1"}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"error": "stale"}'
+        self.send_response(400)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_endpoint_kinds():
+    """URLs of the Docs/Drive/OAuth endpoints map to stable kinds."""
+    kind = gdocs_metrics.endpoint_kind
+    assert kind("GET", f"{gdocs_cli.DOCS_API_BASE}/documents/abc") == "docs.get"
+    assert kind("POST", f"{gdocs_cli.DOCS_API_BASE}/documents/abc:batchUpdate") == "docs.batchUpdate"
+    assert kind("GET", f"{gdocs_cli.DRIVE_API_BASE}/files/abc?fields=id,name") == "drive.files.get"
+    assert kind("GET", f"{gdocs_cli.DRIVE_API_BASE}/files/abc?alt=media") == "drive.download"
+    assert kind("GET", f"{gdocs_cli.DRIVE_API_BASE}/files/abc/export?mimeType=text/plain") == "drive.export"
+    assert kind("POST", f"{gdocs_cli.DRIVE_API_BASE}/files/abc/copy") == "drive.copy"
+    assert kind("POST", f"{gdocs_cli.DRIVE_UPLOAD_BASE}/files?uploadType=multipart") == "drive.upload"
+    assert kind("POST", gdocs_cli.DRIVE_BATCH_URL) == "drive.batch"
+    assert kind("POST", "https://oauth2.googleapis.com/token") == "oauth.token"
+
+
+def test_urlopen_records_calls_bytes_and_latency(tmp_path):
+    """Successful and failed requests are counted with their bytes; outputs are JSON and Prometheus text."""
+    server = HTTPServer(("127.0.0.1", 0), DocsHandler)
+    thread = threading.Thread(target=lambda: [server.handle_request() for _ in range(3)])
+    thread.start()
+    local = f"http://127.0.0.1:{server.server_address[1]}"
+    gdocs_metrics.reset()
+    try:
+        for _ in range(2):
+            with gdocs_cli._urlopen(urllib.request.Request(f"{local}/v1/documents/d1"), timeout=5) as resp:
+                assert json.loads(resp.read()) == {"documentId": "d1"}
+        req = urllib.request.Request(f"{local}/v1/documents/d1:batchUpdate", data=b'{"requests": []}', method="POST")
+        try:
+            with gdocs_cli._urlopen(req, timeout=5):
+                pass
+        except HTTPError as exc:
+            assert exc.code == 400
+        else:
+            raise AssertionError("expected HTTPError")
+    finally:
+        thread.join(5)
+        server.server_close()
+
+    # Not a Google host, so the kind falls back to "<method> <host>"
+    stats = gdocs_metrics.snapshot()
+    get = stats[f"GET 127.0.0.1:{server.server_address[1]}"]
+    post = stats[f"POST 127.0.0.1:{server.server_address[1]}"]
+    assert (get["calls"], get["errors"], get["bytes_received"], sum(get["buckets"])) == (2, 0, 40, 2)
+    assert (post["calls"], post["errors"], post["bytes_sent"], post["bytes_received"]) == (1, 1, 16, 18)
+    assert post["statuses"] == {"400": 1}
+
+    args = type("Args", (), {"stats": False, "stats_json": str(tmp_path / "s.json"), "stats_prom": str(tmp_path / "s.prom")})
+    gdocs_metrics.report(args, script="test")
+    assert json.loads((tmp_path / "s.json").read_text())["endpoints"] == stats
+    prom = (tmp_path / "s.prom").read_text()
+    assert f'gdocs_api_requests_total{{script="test",endpoint="GET 127.0.0.1:{server.server_address[1]}"}} 2' in prom
+    assert 'le="+Inf"} 2' in prom and "gdocs_api_request_duration_seconds_count" in prom
+    gdocs_metrics.reset()
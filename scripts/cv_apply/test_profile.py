@@ -0,0 +1,53 @@
+"""
+Unit tests for the --profile / --profile-mem reports.
+
+Run with: python -m pytest test_profile.py
+"""
+
+import argparse
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gdocs_profile
+from gdocs_trace import span
+
+
+def build_rows(n):
+    """Allocates enough to show up in the memory report."""
+    return [{"index": i, "text": f"row {i}" * 4} for i in range(n)]
+
+
+def test_cpu_and_memory_reports(tmp_path):
+    """Both reports are written; memory is broken down per phase span; errors still propagate."""
+    parser = argparse.ArgumentParser()
+    gdocs_profile.add_arguments(parser)
+    cpu_path, mem_path = tmp_path / "out" / "cpu.txt", tmp_path / "out" / "mem.txt"
+    args = parser.parse_args(["--profile", str(cpu_path), "--profile-mem", str(mem_path), "--profile-top", "5"])
+
+    kept = []
+    try:
+        with gdocs_profile.from_args(args, title="test run"):
+            with span("apply"):
+                with span("build rows"):
+                    kept.append(build_rows(1000))
+                with span("fetch", cat="http"):
+                    pass
+                with span("state write"):
+                    raise SystemExit("disk full")
+    except SystemExit as exc:
+        assert str(exc) == "disk full"
+    else:
+        raise AssertionError("expected SystemExit")
+
+    cpu = cpu_path.read_text(encoding="utf-8")
+    assert "cProfile report: test run" in cpu and "build_rows" in cpu
+    assert (tmp_path / "out" / "cpu.txt.pstats").exists()
+    assert "_snapshot" not in cpu  # memory snapshots are not billed to the CPU profile
+
+    mem = mem_path.read_text(encoding="utf-8")
+    assert "  == build rows: +" in mem and "  == state write" in mem and "== apply" in mem
+    assert "== fetch" not in mem  # http spans are round trips, not phases
+    assert "test_profile.py" in mem.split("== build rows")[1].split("==")[0]
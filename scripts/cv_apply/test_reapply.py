@@ -0,0 +1,85 @@
+"""
+Unit tests for in-place re-apply planning.
+
+Run with: python -m pytest test_reapply.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply._fakedoc import make_doc, run_requests
+from cv_apply.anchors import plan_anchor_ranges
+from cv_apply.reapply import plan_reapply
+
+
+def test_only_changed_anchors_are_rewritten():
+    """Test that scalars and block sections are rewritten in one batch, others untouched."""
+    old = {
+        "{{fullname}}": "Jane 😀 Doe",
+        "{{title}}": "Engineer",
+        "{{skills}}": "Go\n<<SKILL_BULLET>> gRPC",
+    }
+    new = dict(old, **{"{{title}}": "Staff Engineer", "{{skills}}": "Rust\n<<SKILL_BULLET>> Tokio"})
+    doc = make_doc([
+        ("Jane 😀 Doe\n", "HEADING_1"),
+        ("Engineer\n", "NORMAL_TEXT"),
+        ("Skills\n", "HEADING_2"),
+        ("Go\n", "NORMAL_TEXT"),
+        ("gRPC\n", "NORMAL_TEXT"),
+        ("Experience\n", "HEADING_2"),
+        ("Acme\n", "NORMAL_TEXT"),
+    ])
+
+    requests, rewritten, missing, ambiguous = plan_reapply(doc, old, new)
+
+    assert rewritten == ["{{skills}}", "{{title}}"]
+    assert missing == [] and ambiguous == []
+    assert run_requests(doc, requests)[0] == (
+        "Jane 😀 Doe\nStaff Engineer\nSkills\nRust\nTokio\nExperience\nAcme\n"
+    )
+
+
+def test_shared_previous_values_are_ambiguous():
+    """Test that anchors with identical recorded values are refused."""
+    old = {"{{email}}": "a@x.io", "{{website}}": "a@x.io"}
+    doc = make_doc([("a@x.io\n", "NORMAL_TEXT")])
+
+    requests, _, _, ambiguous = plan_reapply(doc, old, {"{{email}}": "b@x.io", "{{website}}": "a@x.io"})
+
+    assert requests == []
+    assert ambiguous == ["{{email}}"]
+
+
+def test_anchor_ranges_track_replaced_values():
+    """Test that named ranges land on the values replaceAllText inserts."""
+    replacements = {"{{fullname}}": "Jane 😀 Doe", "{{title}}": "Engineer"}
+    doc = make_doc([("{{FullName}} / {{title}}\n", "NORMAL_TEXT"), ("{{title}}\n", "NORMAL_TEXT")])
+    filled = "Jane 😀 Doe / Engineer\nEngineer\n".encode("utf-16-le")
+
+    requests = plan_anchor_ranges(doc, replacements)
+
+    ranges = [(r["createNamedRange"]["name"], r["createNamedRange"]["range"]) for r in requests]
+    assert [name for name, _ in ranges] == ["cv_anchor:{{fullname}}", "cv_anchor:{{title}}", "cv_anchor:{{title}}"]
+    for name, r in ranges:
+        text = filled[(r["startIndex"] - 1) * 2 : (r["endIndex"] - 1) * 2].decode("utf-16-le")
+        assert text == replacements[name.split(":", 1)[1]]
+
+
+def test_reapply_prefers_named_ranges():
+    """Test that named ranges are rewritten exactly and re-registered."""
+    old = {"{{title}}": "Engineer", "{{skills}}": "Go"}
+    doc = make_doc([("Engineer\n", "NORMAL_TEXT"), ("Skills\n", "HEADING_2"), ("Go\n", "NORMAL_TEXT")])
+    doc["namedRanges"] = {
+        "cv_anchor:{{skills}}": {"namedRanges": [{"ranges": [{"startIndex": 17, "endIndex": 19}]}]},
+    }
+
+    requests, rewritten, _, _ = plan_reapply(doc, old, {"{{title}}": "Engineer", "{{skills}}": "Rust"})
+
+    assert rewritten == ["{{skills}}"]
+    assert requests[0] == {"deleteNamedRange": {"name": "cv_anchor:{{skills}}"}}
+    assert run_requests(doc, requests)[0] == "Engineer\nSkills\nRust\n"
+    created = [r["createNamedRange"]["range"] for r in requests if "createNamedRange" in r]
+    assert created == [{"startIndex": 17, "endIndex": 21, "segmentId": None}]
@@ -0,0 +1,68 @@
+"""
+Unit tests for reset planning: a filled document goes back to its placeholders.
+
+Run with: python -m pytest test_reset.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply._fakedoc import make_doc, replay, run_requests
+from cv_apply.formatters import build_replacements
+from cv_apply.reset import plan_reset
+from cv_apply.utils import strip_markers
+from cv_apply.writer import plan_fill
+
+TEMPLATE = [
+    ("{{fullname}}\n", "NORMAL_TEXT"),
+    ("Skills\n", "HEADING_2"),
+    ("{{skills}}\n", "NORMAL_TEXT"),
+    ("Experience\n", "HEADING_2"),
+    ("{{exps}}\n", "NORMAL_TEXT"),
+    ("References\n", "HEADING_2"),
+]
+
+DATA = {
+    "header": {"full_name": "Jane Doe"},
+    "skills": [{"title": "Languages", "bullets": ["Go", "Rust"]}],
+    "experience": [{"company": "Acme", "dates": "2020-2024", "role": "Staff Engineer", "bullets": ["Cut p99 by 40%"]}],
+}
+
+
+def fill(track):
+    """Fill the template with plan_fill; return (template text, filled doc JSON, values as they appear)."""
+    doc = make_doc(TEMPLATE)
+    replacements = {k: v for k, v in build_replacements(DATA).items() if k in {"{{fullname}}", "{{skills}}", "{{exps}}"}}
+    filled = replay(doc, plan_fill(doc, replacements, track=track))
+    return "".join(text for text, _ in TEMPLATE), filled, {k: strip_markers(v) for k, v in replacements.items()}
+
+
+def test_reset_uses_named_ranges():
+    """Anchors registered at fill time are reset exactly: no extra newline for blocks, ranges deleted."""
+    template, filled, stored = fill(track=True)
+    assert set(filled["namedRanges"]) == {"cv_anchor:{{fullname}}", "cv_anchor:{{skills}}", "cv_anchor:{{exps}}"}
+
+    requests, applied = plan_reset(filled, stored)
+
+    assert applied == 3
+    deleted = [req["deleteNamedRange"]["name"] for req in requests if "deleteNamedRange" in req]
+    assert sorted(deleted) == sorted(filled["namedRanges"])
+    assert run_requests(filled, requests)[0] == template
+    assert replay(filled, requests)["namedRanges"] == {}
+
+
+def test_reset_falls_back_to_landmarks():
+    """Without named ranges, block sections are found under their headings and get their newline back."""
+    template, filled, stored = fill(track=False)
+    assert filled["namedRanges"] == {}
+
+    requests, applied = plan_reset(filled, stored)
+
+    assert applied == 3
+    assert not any("deleteNamedRange" in req for req in requests)
+    text, styled = run_requests(filled, requests)
+    assert text == template
+    assert ("updateParagraphStyle", "NORMAL_TEXT", "{{skills}}\n") in styled
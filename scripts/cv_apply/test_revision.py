@@ -0,0 +1,69 @@
+"""
+Unit tests for revision-checked (optimistic concurrency) batch updates.
+
+Run with: python -m pytest test_revision.py
+"""
+
+import sys
+import os
+from urllib.error import HTTPError
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gdocs_cli
+
+
+def test_conflict_refetches_and_replans(monkeypatch):
+    """A stale requiredRevisionId re-fetches the doc, re-plans, and chains later batches by revision."""
+    revisions = iter(["r1", "r2"])
+    sent = []
+    fetches = []
+
+    def fake_get_doc(*, document_id, access_token, fresh=False):
+        fetches.append(fresh)
+        return {"documentId": document_id, "revisionId": next(revisions)}
+
+    def fake_batch_update(*, document_id, access_token, requests, required_revision_id=None):
+        sent.append((required_revision_id, requests))
+        if required_revision_id == "r1":
+            # Another writer committed r2 after our snapshot
+            raise HTTPError("url", 400, "Request had required revision id r1 which is stale", None, None)
+        return {"writeControl": {"requiredRevisionId": f"{required_revision_id}+"}}
+
+    monkeypatch.setattr(gdocs_cli, "get_doc", fake_get_doc)
+    monkeypatch.setattr(gdocs_cli, "docs_batch_update", fake_batch_update)
+    monkeypatch.setattr(gdocs_cli.time, "sleep", lambda s: None)
+
+    plans = []
+
+    def plan(doc):
+        plans.append(doc["revisionId"])
+        return [[{"a": doc["revisionId"]}], [], [{"b": doc["revisionId"]}]]
+
+    doc, responses = gdocs_cli.docs_batch_update_planned(document_id="d", access_token="t", plan=plan)
+    assert plans == ["r1", "r2"]
+    assert fetches == [False, True]  # the re-fetch bypasses the daemon's document cache
+    assert doc["revisionId"] == "r2"
+    assert sent == [("r1", [{"a": "r1"}]), ("r2", [{"a": "r2"}]), ("r2+", [{"b": "r2"}])]
+    assert len(responses) == 2
+
+
+def test_other_errors_are_not_retried(monkeypatch):
+    """Errors other than a revision conflict propagate immediately."""
+    calls = []
+
+    def fake_batch_update(*, document_id, access_token, requests, required_revision_id=None):
+        calls.append(required_revision_id)
+        raise HTTPError("url", 403, "The caller does not have permission", None, None)
+
+    monkeypatch.setattr(gdocs_cli, "docs_batch_update", fake_batch_update)
+    try:
+        gdocs_cli.docs_batch_update_planned(
+            document_id="d", access_token="t", plan=lambda doc: [[{}]], doc={"revisionId": "r1"}
+        )
+    except HTTPError as exc:
+        assert exc.code == 403
+    else:
+        raise AssertionError("expected HTTPError")
+    assert calls == ["r1"]
@@ -0,0 +1,75 @@
+"""
+Startup budget for gdocs_cli.py: `list` and `--help` must not import the heavy modules.
+
+Run with: python -m pytest test_startup.py
+"""
+
+import functools
+import os
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The budget is relative to importing what the parser itself needs (argparse, json), measured in
+# the same run, so slow or loaded machines scale both. Measured ~3.5x after the imports were
+# deferred (~7x before). GDOCS_IMPORT_BUDGET_MS sets an absolute budget instead.
+IMPORT_BUDGET_RATIO = 5.0
+BASELINE = ("-c", "import argparse, json")
+HEAVY_MODULES = ("urllib.request", "http.client", "http.server", "subprocess", "zipfile", "xml.etree.ElementTree")
+
+
+def import_profile(*args: str, script: str | None = "gdocs_cli.py") -> tuple[float, set[str]]:
+    """Run a script (None: python with args only) under -X importtime; return (ms importing after site, modules)."""
+    target = [os.path.join(SCRIPTS_DIR, script)] if script else []
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *target, *args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "GDOCS_DAEMON": "0"},
+    )
+    assert result.returncode == 0, result.stderr
+    total_us = 0
+    modules = set()
+    after_site = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        top_level = not name[1:].startswith(" ")
+        modules.add(name.strip())
+        if top_level and name.strip() == "site":
+            after_site = True
+        elif top_level and after_site:
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+@functools.cache
+def budget_ms() -> float:
+    override = os.environ.get("GDOCS_IMPORT_BUDGET_MS")
+    if override:
+        return float(override)
+    return IMPORT_BUDGET_RATIO * min(import_profile(*BASELINE, script=None)[0] for _ in range(3))
+
+
+def check_budget(*args: str) -> None:
+    # Best of three: the budget is about what gets imported, not scheduler noise.
+    runs = [import_profile(*args) for _ in range(3)]
+    modules = runs[0][1]
+    assert not modules.intersection(HEAVY_MODULES), sorted(modules.intersection(HEAVY_MODULES))
+    best = min(ms for ms, _ in runs)
+    budget = budget_ms()
+    assert best < budget, f"gdocs_cli.py {' '.join(args)} spent {best:.1f}ms importing (budget {budget:.1f}ms)"
+
+
+def test_help_import_budget():
+    """--help imports only what the parser needs."""
+    check_budget("--help")
+
+
+def test_list_import_budget(tmp_path):
+    """list (without --meta) stays offline and light."""
+    links = tmp_path / "links.md"
+    links.write_text("- CV: https://docs.google.com/document/d/abc123/edit\n", encoding="utf-8")
+    check_budget("--links-file", str(links), "list")
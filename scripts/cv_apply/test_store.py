@@ -0,0 +1,83 @@
+"""
+Unit tests for the SQLite apply state store.
+
+Run with: python -m pytest test_store.py
+"""
+
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply.state import doc_history, get_doc_state, open_store, update_state
+from cv_apply.store import StateStore
+
+
+def test_runs_store_only_changed_anchors(tmp_path):
+    """A run writes only changed anchors; values are deduplicated and history rebuilds earlier runs."""
+    db = str(tmp_path / "state.db")
+    first = {"{{title}}": "Engineer", "{{city}}": "Berlin", "{{skills}}": "• Python"}
+    second = {"{{title}}": "Lead Engineer", "{{city}}": "Berlin"}
+    run1 = update_state(state_path=db, doc="CV EN", doc_url=None, doc_id="d1", data_path="a.json", replacements=first)
+    run2 = update_state(state_path=db, doc="CV EN", doc_url=None, doc_id="d1", data_path="a.json", replacements=second)
+    update_state(state_path=db, doc="CV RU", doc_url=None, doc_id="d2", data_path="b.json", replacements=second)
+
+    doc_state = get_doc_state(db, "CV EN")
+    assert doc_state["replacements"] == second
+    assert doc_state["cleaned_replacements"]["{{title}}"] == "Lead Engineer"
+
+    with open_store(db) as store:
+        assert store.run_changes(run2) == {"{{skills}}": None, "{{title}}": "Lead Engineer"}
+        assert store.values_at("CV EN", run1) == first
+        blobs = store.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        assert blobs == 4  # "Berlin" and "Lead Engineer" are shared across runs and docs
+
+    runs = doc_history(db, "CV EN")
+    assert [r["id"] for r in runs] == [run2, run1]
+    assert [r["changed"] for r in runs] == [2, 3]
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    """A legacy .json state path maps to a sibling .db that imports the JSON once."""
+    legacy = tmp_path / ".cv_apply_state.json"
+    legacy.write_text(json.dumps({
+        "docs": {
+            "CV EN": {
+                "updated_at": "2024-01-01T10:00:00",
+                "doc_url": "https://docs.google.com/document/d/abc/edit",
+                "doc_id": "abc",
+                "data_path": "cv.json",
+                "replacements": {"{{title}}": "Engineer"},
+                "template_id": "tpl",
+            }
+        }
+    }), encoding="utf-8")
+
+    doc_state = get_doc_state(str(legacy), "CV EN")
+    assert doc_state["doc_id"] == "abc"
+    assert doc_state["template_id"] == "tpl"
+    assert doc_state["replacements"] == {"{{title}}": "Engineer"}
+    assert (tmp_path / ".cv_apply_state.db").exists()
+
+    # A second open does not import the JSON again
+    get_doc_state(str(tmp_path / ".cv_apply_state.db"), "CV EN")
+    assert len(doc_history(str(legacy), "CV EN")) == 1
+
+
+def test_concurrent_first_opens_import_once(tmp_path):
+    """Two stores that both saw "not migrated yet" still import the legacy JSON only once."""
+    legacy = tmp_path / ".cv_apply_state.json"
+    legacy.write_text(json.dumps({
+        "docs": {name: {"doc_id": name, "replacements": {"{{title}}": "Engineer"}} for name in ("CV EN", "CV RU")}
+    }), encoding="utf-8")
+    db = str(tmp_path / ".cv_apply_state.db")
+
+    with StateStore(db) as first, StateStore(db) as second:
+        assert first.migrate_json(str(legacy)) == 2
+        # The second process checked the marker before the first one wrote it.
+        second.get_meta = lambda key: None
+        assert second.migrate_json(str(legacy)) == 0
+        runs = second.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    assert runs == 2
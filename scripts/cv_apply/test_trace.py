@@ -0,0 +1,71 @@
+"""
+Unit tests for tracing spans and the Chrome trace-event export.
+
+Run with: python -m pytest test_trace.py
+"""
+
+import json
+import sys
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gdocs_cli
+import gdocs_trace
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a small JSON body."""
+
+    def log_message(self, format, *args):
+        return
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"ok": true}')
+
+
+def test_phase_and_http_spans_export_as_chrome_trace(tmp_path):
+    """Nested phase spans contain the HTTP span; failures are recorded; the file is Chrome trace JSON."""
+    server = HTTPServer(("127.0.0.1", 0), OkHandler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/documents/d1:batchUpdate"
+
+    gdocs_trace.enable()
+    try:
+        with gdocs_trace.span("apply"):
+            with gdocs_trace.span("replace") as phase:
+                phase["requests"] = 1
+                req = urllib.request.Request(url, data=b'{"requests": []}', method="POST")
+                with gdocs_cli._urlopen(req, timeout=5) as resp:
+                    assert json.loads(resp.read()) == {"ok": True}
+            try:
+                with gdocs_trace.span("state write"):
+                    raise SystemExit("disk full")
+            except SystemExit:
+                pass
+        out = tmp_path / "trace.json"
+        assert gdocs_trace.write(str(out), process_name="test") == 4
+    finally:
+        gdocs_trace._events = None
+        thread.join(5)
+        server.server_close()
+
+    trace = json.loads(out.read_text(encoding="utf-8"))
+    spans = {e["name"]: e for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert set(spans) == {"apply", "replace", "POST /v1/documents/d1:batchUpdate", "state write"}
+    http = spans["POST /v1/documents/d1:batchUpdate"]
+    assert http["cat"] == "http" and http["args"]["status"] == 200 and http["args"]["bytes_sent"] == 16
+    outer, inner = spans["replace"], http
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert spans["replace"]["args"] == {"requests": 1}
+    assert spans["state write"]["args"]["error"] == "SystemExit: disk full"
+    assert any(e["ph"] == "M" and e["name"] == "process_name" for e in trace["traceEvents"])
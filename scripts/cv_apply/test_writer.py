@@ -0,0 +1,49 @@
+"""
+Unit tests for the structural section writer.
+
+Run with: python -m pytest test_writer.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cv_apply._fakedoc import make_doc, run_requests
+from cv_apply.formatters import build_replacements
+from cv_apply.writer import plan_fill
+
+
+def test_full_cv_lands_in_one_batch_without_markers():
+    """Test that sections are written, bulleted and styled at computed indices."""
+    data = {
+        "header": {"full_name": "Jane Doe"},
+        "skills": [{"title": "Languages", "bullets": ["Go", "Rust"]}],
+        "experience": [{
+            "company": "Acme",
+            "dates": "2020-2024",
+            "role": "Staff Engineer",
+            "bullets": ["Cut p99 by 40%"],
+        }],
+    }
+    replacements = build_replacements(data)
+    doc = make_doc([
+        ("{{fullname}}\n", "NORMAL_TEXT"),
+        ("Skills\n", "NORMAL_TEXT"),
+        ("{{skills}}\n", "NORMAL_TEXT"),
+        ("Experience\n", "NORMAL_TEXT"),
+        ("{{exps}}\n", "NORMAL_TEXT"),
+    ])
+
+    text, styled = run_requests(doc, plan_fill(doc, replacements))
+
+    assert "<<" not in text
+    assert text.startswith("Jane Doe\nSkills\nLanguages\nGo\nRust\nExperience\n")
+    assert ("updateParagraphStyle", "HEADING_2", "Skills\n") in styled
+    assert ("updateParagraphStyle", "HEADING_1", "Jane Doe\n") in styled
+    assert ("updateParagraphStyle", "HEADING_3", "Languages\n") in styled
+    assert ("createParagraphBullets", None, "Go\nRust\n") in styled
+    assert ("createParagraphBullets", None, "Cut p99 by 40%\n") in styled
+    named = [body for req in plan_fill(doc, replacements) for kind, body in req.items() if kind == "createNamedRange"]
+    assert {n["name"] for n in named} >= {"cv_anchor:{{fullname}}", "cv_anchor:{{skills}}", "cv_anchor:{{exps}}"}
@@ -0,0 +1,281 @@
+"""Structural fill: write anchor values with computed-index requests in one batch."""
+
+import json
+import os
+import sys
+from typing import Any
+
+from .anchors import create_range_request, doc_segments, find_placeholders, stale_range_requests
+from .constants import BLOCK_LANDMARKS, EXP_BULLET_MARKER
+from .document import build_text_index, create_link_requests, paragraph_at, utf16_len
+from .styling import (
+    section_header_requests,
+    style_education_paragraphs,
+    style_experience_paragraphs,
+    style_skills_paragraphs,
+    tight_anchor_requests,
+)
+from .utils import extract_placeholders, log_line, strip_markers
+
+# Import gdocs_cli functions
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from gdocs_cli import docs_batch_update_planned, ensure_access_token, get_doc, load_oauth_client
+from gdocs_trace import span
+
+
+# Block anchors whose paragraphs get bullets/headings computed from their markers
+SECTION_STYLERS = {
+    "{{skills}}": style_skills_paragraphs,
+    "{{exps}}": lambda paragraphs: style_experience_paragraphs(paragraphs, EXP_BULLET_MARKER),
+    "{{entrepreneurship}}": lambda paragraphs: style_experience_paragraphs(paragraphs, EXP_BULLET_MARKER),
+    "{{education}}": style_education_paragraphs,
+}
+
+
+def layout_value(
+    value: str,
+    *,
+    start: int,
+    para_start: int,
+    tail: int,
+) -> tuple[str, list[dict[str, Any]], list[int]]:
+    """
+    Lay out a value inserted at `start` inside an existing paragraph.
+
+    Args:
+        value: Replacement value (bullet markers are dropped from the text)
+        start: Insertion index
+        para_start: Start of the paragraph that receives the insertion
+        tail: Units of that paragraph after the insertion point (at least its newline)
+
+    Returns:
+        Tuple of (text to insert, resulting paragraphs as {"start", "end", "text"}
+        with markers kept in "text" for classification, start index of each line)
+    """
+    lines = value.split("\n")
+    clean: list[str] = []
+    paragraphs: list[dict[str, Any]] = []
+    line_starts: list[int] = []
+    pos = start
+    for i, line in enumerate(lines):
+        text = strip_markers(line)
+        clean.append(text)
+        line_starts.append(pos)
+        p_start = para_start if i == 0 else pos
+        pos += utf16_len(text)
+        if i < len(lines) - 1:
+            pos += 1
+            p_end = pos
+        else:
+            p_end = pos + tail
+        paragraphs.append({"start": p_start, "end": p_end, "text": line.strip()})
+    return "\n".join(clean), paragraphs, line_starts
+
+
+def value_requests(
+    anchor: str,
+    value: str,
+    *,
+    start: int,
+    para_start: int,
+    tail: int,
+    seg_id: str | None,
+    track: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Build the requests that write one anchor value at `start` (old text already deleted).
+
+    Block sections get their paragraph style reset, then bullets and styles at
+    computed indices; header fields get their tight spacing; URLs, emails and
+    phones become links.
+
+    Args:
+        anchor: Placeholder key
+        value: Replacement value (may contain bullet markers)
+        start: Insertion index
+        para_start: Start of the paragraph that receives the insertion
+        tail: Units of that paragraph after the insertion point
+        seg_id: Segment ID (None = body)
+        track: Register an anchor named range over the inserted text
+
+    Returns:
+        List of API request objects
+    """
+    text, paragraphs, line_starts = layout_value(value, start=start, para_start=para_start, tail=tail)
+    requests: list[dict[str, Any]] = []
+    if text:
+        requests.append({"insertText": {"location": {"index": start, "segmentId": seg_id}, "text": text}})
+        if track:
+            requests.append(create_range_request(anchor, start, start + utf16_len(text), seg_id))
+
+    # Section styling and links are body-only, like apply_block_styles()
+    if seg_id is not None:
+        return requests
+
+    if anchor in BLOCK_LANDMARKS:
+        whole = {"startIndex": paragraphs[0]["start"], "endIndex": paragraphs[-1]["end"]}
+        requests.append({"deleteParagraphBullets": {"range": whole}})
+        requests.append({
+            "updateParagraphStyle": {
+                "range": whole,
+                "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+                "fields": "namedStyleType",
+            }
+        })
+        requests.append({
+            "updateTextStyle": {
+                "range": whole,
+                "textStyle": {"bold": False, "italic": False},
+                "fields": "bold,italic",
+            }
+        })
+    styler = SECTION_STYLERS.get(anchor)
+    if styler:
+        bullets, styles = styler(paragraphs)
+        requests.extend(bullets)
+        requests.extend(styles)
+    elif para_start == start and tail == 1 and len(paragraphs) == 1:
+        # The placeholder was the whole paragraph
+        requests.extend(tight_anchor_requests(anchor, paragraphs[0]["start"], paragraphs[0]["end"]))
+
+    for line, line_start in zip(text.split("\n"), line_starts):
+        requests.extend(create_link_requests(line, line_start))
+    return requests
+
+
+class ParagraphShifts:
+    """Length changes already applied inside paragraphs, for edits sent from the end backwards."""
+
+    def __init__(self, doc_data: dict[str, Any]):
+        self.segments = {seg_id: content for content, seg_id in doc_segments(doc_data)}
+        self._delta: dict[tuple[str | None, int], int] = {}
+
+    def bounds(self, seg_id: str | None, start: int, end: int) -> tuple[int, int]:
+        """
+        Return (para_start, tail) for replacing [start, end) with new text.
+
+        Args:
+            seg_id: Segment ID
+            start: Start of the replaced range
+            end: End of the replaced range (original indices)
+
+        Returns:
+            Tuple of (start of the paragraph holding start, units after end in the paragraph holding end)
+        """
+        content = self.segments.get(seg_id) or []
+        first = paragraph_at(content, start)
+        last = paragraph_at(content, end) or first
+        para_start = (first.get("startIndex") or 0) if first else start
+        if last is None:
+            return para_start, 1
+        last_start = last.get("startIndex") or 0
+        tail = (last.get("endIndex") or 0) - end + self._delta.get((seg_id, last_start), 0)
+        return para_start, tail
+
+    def record(self, seg_id: str | None, start: int, removed: int, inserted: int) -> None:
+        """Remember a length change inside the paragraph that holds start."""
+        content = self.segments.get(seg_id) or []
+        para = paragraph_at(content, start)
+        if para is not None:
+            key = (seg_id, para.get("startIndex") or 0)
+            self._delta[key] = self._delta.get(key, 0) + inserted - removed
+
+
+def plan_fill(
+    doc_data: dict[str, Any],
+    replacements: dict[str, str],
+    *,
+    match_case: bool = False,
+    track: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Plan one batchUpdate that fills every placeholder and styles the result.
+
+    Section headers are styled first, at the unedited indices. Placeholders are
+    then rewritten from the end of the document backwards, so every request's
+    indices are valid when it runs; no re-fetch or marker cleanup is needed.
+
+    Args:
+        doc_data: Document JSON of the unfilled document
+        replacements: Placeholder -> value (block values may contain bullet markers)
+        match_case: Whether placeholders match case-sensitively
+        track: Register anchor named ranges
+
+    Returns:
+        List of API request objects
+    """
+    body = (doc_data.get("body") or {}).get("content") or []
+    requests = stale_range_requests(doc_data) if track else []
+    requests.extend(section_header_requests(body))
+
+    shifts = ParagraphShifts(doc_data)
+    occurrences = find_placeholders(doc_data, list(replacements), match_case=match_case)
+    for key, start, end, seg_id in sorted(occurrences, key=lambda o: o[1], reverse=True):
+        value = replacements.get(key)
+        value = "" if value is None else str(value)
+        para_start, tail = shifts.bounds(seg_id, start, end)
+        requests.append({"deleteContentRange": {"range": {"startIndex": start, "endIndex": end, "segmentId": seg_id}}})
+        requests.extend(value_requests(key, value, start=start, para_start=para_start, tail=tail, seg_id=seg_id, track=track))
+        shifts.record(seg_id, start, end - start, utf16_len(strip_markers(value)))
+    return requests
+
+
+def placeholders_in_doc(doc_data: dict[str, Any]) -> set[str]:
+    """Extract all {{placeholder}} markers from a document's body, headers and footers."""
+    found: set[str] = set()
+    for content, _ in doc_segments(doc_data):
+        text, _ = build_text_index(content)
+        found |= extract_placeholders(text)
+    return found
+
+
+def fetch_unfilled(*, doc_id: str, client_path: str, token_path: str) -> tuple[str, dict[str, Any]]:
+    """Fetch document JSON; returns (access_token, doc_data) for a following fill_document()."""
+    access_token = ensure_access_token(client=load_oauth_client(client_path), token_path=token_path)
+    return access_token, get_doc(document_id=doc_id, access_token=access_token)
+
+
+def fill_document(
+    *,
+    doc_id: str,
+    doc_data: dict[str, Any],
+    access_token: str,
+    replacements: dict[str, str],
+    match_case: bool = False,
+    track: bool = True,
+    dry_run: bool = False,
+) -> int:
+    """
+    Fill and style a document in a single batchUpdate.
+
+    The batch requires the snapshot's revision; if the document changed in the
+    meantime, it is re-fetched and the fill re-planned.
+
+    Args:
+        doc_id: Google Doc ID
+        doc_data: Document JSON from fetch_unfilled()
+        access_token: OAuth access token
+        replacements: Placeholder -> value
+        match_case: Whether placeholders match case-sensitively
+        track: Register anchor named ranges
+        dry_run: Print the requests instead of sending them
+
+    Returns:
+        Number of requests planned
+    """
+    with span("plan fill"):
+        requests = plan_fill(doc_data, replacements, match_case=match_case, track=track)
+    if dry_run:
+        print(json.dumps({"documentId": doc_id, "requests": requests}, ensure_ascii=False, indent=2))
+        return len(requests)
+    if requests:
+
+        def plan(current: dict[str, Any]) -> list[list[dict[str, Any]]]:
+            if current is not doc_data:
+                requests[:] = plan_fill(current, replacements, match_case=match_case, track=track)
+            return [requests]
+
+        docs_batch_update_planned(document_id=doc_id, access_token=access_token, plan=plan, doc=doc_data)
+    log_line(f"🧱 Filled and styled in one batch ({len(requests)} requests).")
+    return len(requests)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+CV Batch Render - Build replacements for many CV JSON files and variants at once.
+
+Expands globs over structured CV JSON files and variant manifests, runs
+build_replacements across a process pool and streams one JSON line per
+input/variant/language with per-file timing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Setup path for imports
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from cv_apply.batch import LANGS, expand_inputs, iter_jobs, run_batch
+
+
+def main(argv: list[str]) -> int:
+    """
+    Main entry point for batch rendering.
+
+    Args:
+        argv: Command-line arguments
+
+    Returns:
+        Exit code (1 if any input failed)
+    """
+    parser = argparse.ArgumentParser(
+        description="Render replacements JSONL for many CV JSON files / variant manifests.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=[os.path.join(ROOT_DIR, "cv_components", "*.json")],
+        help="Globs of CV JSON files or variant manifests (default: cv_components/*.json)",
+    )
+    parser.add_argument("--out", help="Write JSONL here instead of stdout")
+    parser.add_argument(
+        "--lang",
+        action="append",
+        choices=list(LANGS),
+        help="Render in this language (repeatable; default: from file name, e.g. cv.x.ru.json)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count; 1 = no pool)",
+    )
+    parser.add_argument("--memo", help="Persisted section memo to preload in workers")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        raise SystemExit(f"No input files match: {' '.join(args.inputs)}")
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    started = time.perf_counter()
+    rendered = 0
+    skipped = 0
+    failed = 0
+    try:
+        for record in run_batch(iter_jobs(paths, args.lang), workers=max(1, args.jobs), memo_path=args.memo):
+            if "error" in record:
+                failed += 1
+            elif "skipped" in record:
+                skipped += 1
+            else:
+                rendered += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if args.out:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Rendered {rendered} records ({failed} failed, {skipped} skipped) from {len(paths)} files in {elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
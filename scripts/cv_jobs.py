@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+CV Jobs - Persistent queue of apply/reset/theme/export jobs and a worker pool.
+
+Jobs live in a SQLite file, so queued work survives restarts: a crashed
+worker's leases expire and its jobs are retried; jobs that keep failing are
+dead-lettered. Workers run the existing scripts in-process as threads (one
+token refresh for all of them) and never run two jobs for the same document
+at once. Jobs passing --trace / --profile / --profile-mem to their script need
+`work --workers 1`, since those set up process-wide state.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+# Setup path for imports
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import gdocs_metrics
+from cv_apply.jobs import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    RETRY_BASE_SECONDS,
+    STATUSES,
+    Executor,
+    Job,
+    JobQueue,
+    SharedToken,
+    run_workers,
+)
+
+DEFAULT_QUEUE = ".cv_jobs.db"
+JOB_KINDS = ("apply", "reset", "theme", "export")
+# Job options that set up process-wide state (the trace buffer, cProfile, tracemalloc):
+# concurrent jobs would reset or mix each other's, so they need --workers 1.
+PROCESS_WIDE_OPTIONS = ("--trace", "--profile", "--profile-mem")
+
+
+def process_wide_options(job_args: list[str]) -> list[str]:
+    """Return the PROCESS_WIDE_OPTIONS a job's arguments use (also in --opt=value form)."""
+    return [arg.split("=", 1)[0] for arg in job_args if arg.split("=", 1)[0] in PROCESS_WIDE_OPTIONS]
+
+
+def build_executors(client_path: str, token_path: str, *, workers: int = 1) -> dict[str, Executor]:
+    """
+    Map job kinds to in-process calls of the existing scripts.
+
+    Args:
+        client_path: OAuth client JSON
+        token_path: Token cache
+        workers: Number of workers that will run the jobs concurrently
+
+    Returns:
+        Job kind -> callable(job) returning an exit code
+    """
+    auth = ["--client", client_path, "--token", token_path]
+
+    def exclusive(executor: Executor) -> Executor:
+        def run(job: Job) -> int | None:
+            options = process_wide_options(job.args)
+            if options and workers > 1:
+                raise SystemExit(f"{', '.join(options)} cannot run with --workers {workers}; use work --workers 1")
+            return executor(job)
+
+        return run
+
+    def apply(job: Job) -> int:
+        import cv_structured_apply_refactored
+
+        return cv_structured_apply_refactored.main([*auth, "--doc", job.doc, *job.args])
+
+    def reset(job: Job) -> int:
+        import cv_structured_apply_refactored
+
+        return cv_structured_apply_refactored.main([*auth, "--doc", job.doc, "--reset", *job.args])
+
+    def theme(job: Job) -> int:
+        import apply_cv_styles_themed
+
+        return apply_cv_styles_themed.main([*auth, "--doc", job.doc, *job.args])
+
+    def export(job: Job) -> int:
+        import gdocs_cli
+
+        return gdocs_cli.main([*auth, "export-docx", "--doc", job.doc, *job.args])
+
+    executors = {"apply": apply, "reset": reset, "theme": theme, "export": export}
+    return {kind: exclusive(executor) for kind, executor in executors.items()}
+
+
+def cmd_enqueue(args: argparse.Namespace) -> int:
+    """Queue one job per --doc."""
+    with JobQueue(args.queue) as queue:
+        for doc in args.doc:
+            job_id = queue.enqueue(args.kind, args.job_args, doc=doc, max_attempts=args.max_attempts)
+            print(f"Queued #{job_id} {args.kind} {doc!r}")
+    return 0
+
+
+def cmd_work(args: argparse.Namespace) -> int:
+    """Run workers until the queue is drained (or forever with --forever)."""
+    if args.reclaim:
+        with JobQueue(args.queue) as queue:
+            released = queue.release_leases()
+        print(f"Released {released} leased jobs", file=sys.stderr)
+    if args.workers > 1:
+        with JobQueue(args.queue) as queue:
+            exclusive = [job for job in queue.list_jobs("queued") if process_wide_options(job["args"])]
+        if exclusive:
+            ids = ", ".join(f"#{job['id']}" for job in exclusive)
+            raise SystemExit(f"Jobs {ids} use {'/'.join(PROCESS_WIDE_OPTIONS)}; run them with work --workers 1")
+
+    try:
+        totals = run_workers(
+            args.queue,
+            build_executors(args.client, args.token, workers=args.workers),
+            workers=args.workers,
+            lease_seconds=args.lease,
+            retry_base=args.retry_base,
+            drain=not args.forever,
+            before_job=SharedToken(args.client, args.token),
+        )
+    finally:
+        # API calls of all jobs this process ran
+        gdocs_metrics.report(args, script="cv_jobs")
+    print(f"Done: {totals['done']}, failed attempts: {totals['failed']}, dead-lettered: {totals['dead']}", file=sys.stderr)
+    return 1 if totals["dead"] else 0
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    """List jobs, or print per-status counts."""
+    with JobQueue(args.queue) as queue:
+        if args.counts:
+            print(json.dumps(queue.counts()))
+            return 0
+        for job in queue.list_jobs(args.status, args.limit):
+            error = f"  {job['last_error']}" if job["last_error"] else ""
+            print(f"#{job['id']}  {job['status']:<6}  {job['kind']:<6}  {job['doc'] or '-'}  "
+                  f"{job['attempts']}/{job['max_attempts']}  {' '.join(job['args'])}{error}")
+    return 0
+
+
+def cmd_requeue(args: argparse.Namespace) -> int:
+    """Move dead-lettered jobs back to the queue."""
+    with JobQueue(args.queue) as queue:
+        count = queue.requeue(args.id)
+    print(f"Requeued {count} jobs")
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    """
+    Main entry point for the job queue.
+
+    Args:
+        argv: Command-line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Persistent queue and worker pool for CV document jobs.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE, help=f"Queue database (default: {DEFAULT_QUEUE})")
+    parser.add_argument(
+        "--client",
+        default=os.environ.get("GDOCS_OAUTH_CLIENT", ".secrets/google-oauth-client.json"),
+        help="OAuth client JSON (default: .secrets/google-oauth-client.json or $GDOCS_OAUTH_CLIENT)",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("GDOCS_TOKEN", ".secrets/google-token.json"),
+        help="Path to token cache (default: .secrets/google-token.json or $GDOCS_TOKEN)",
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_enqueue = sub.add_parser(
+        "enqueue",
+        help="Queue a job for one or more documents; arguments after -- go to the job's script",
+    )
+    p_enqueue.add_argument("kind", choices=JOB_KINDS)
+    p_enqueue.add_argument("--doc", action="append", required=True, help="Document name (repeatable)")
+    p_enqueue.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Attempts before dead-lettering (default: {DEFAULT_MAX_ATTEMPTS})",
+    )
+    p_enqueue.set_defaults(func=cmd_enqueue)
+
+    p_work = sub.add_parser("work", help="Run workers over the queue")
+    p_work.add_argument("--workers", type=int, default=2, help="Concurrent workers (default: 2)")
+    p_work.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help=f"Lease seconds; jobs of a crashed worker are retried after it (default: {DEFAULT_LEASE_SECONDS})",
+    )
+    p_work.add_argument(
+        "--retry-base",
+        type=float,
+        default=RETRY_BASE_SECONDS,
+        help=f"Backoff seconds after a first failure, doubling per attempt (default: {RETRY_BASE_SECONDS:g})",
+    )
+    p_work.add_argument("--forever", action="store_true", help="Keep polling after the queue is drained")
+    p_work.add_argument(
+        "--reclaim",
+        action="store_true",
+        help="Release all leases first (after a crash, when no other worker runs)",
+    )
+    gdocs_metrics.add_arguments(p_work)
+    p_work.set_defaults(func=cmd_work)
+
+    p_list = sub.add_parser("list", help="List jobs")
+    p_list.add_argument("--status", choices=STATUSES)
+    p_list.add_argument("--limit", type=int, default=50)
+    p_list.add_argument("--counts", action="store_true", help="Print job counts per status as JSON")
+    p_list.set_defaults(func=cmd_list)
+
+    p_requeue = sub.add_parser("requeue", help="Requeue dead-lettered jobs")
+    p_requeue.add_argument("--id", type=int, help="Only this job (default: all dead jobs)")
+    p_requeue.set_defaults(func=cmd_requeue)
+
+    # Everything after "--" is passed to the job's script (e.g. -- --data cv.json)
+    job_args: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, job_args = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+    args.job_args = job_args
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
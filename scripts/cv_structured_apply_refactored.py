@@ -19,12 +19,21 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, ROOT_DIR)
 
 from cv_apply.formatters import build_replacements
+from cv_apply.memo import SECTION_MEMO
 from cv_apply.document import find_doc_info, strip_print_header
 from cv_apply.styling import apply_block_styles
-from cv_apply.state import update_state
+from cv_apply.state import doc_history, update_state
 from cv_apply.cli import apply_with_auto_auth, get_doc_text
 from cv_apply.reset import reset_document
+from cv_apply.template import copy_template, resolve_template
+from cv_apply.reapply import reapply_document
+from cv_apply.anchors import fetch_document, register_anchor_ranges
+from cv_apply.writer import fetch_unfilled, fill_document, placeholders_in_doc
 from cv_apply.utils import read_json, write_json, log_line, extract_placeholders
+import gdocs_metrics
+import gdocs_profile
+import gdocs_trace
+from gdocs_trace import span
 
 
 def handle_reset(args: argparse.Namespace) -> int:
@@ -49,6 +58,68 @@ def handle_reset(args: argparse.Namespace) -> int:
     )
 
 
+def handle_history(args: argparse.Namespace) -> int:
+    """
+    Handle history listing: recorded apply runs of a document, newest first.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Exit code
+    """
+    if not args.doc:
+        raise SystemExit("--history requires --doc")
+
+    runs = doc_history(args.state_file, args.doc)
+    if not runs:
+        log_line(f"ℹ️ No recorded runs for {args.doc!r} in {args.state_file}")
+        return 0
+    for run in runs:
+        log_line(f"#{run['id']}  {run['created_at']}  {run['doc_id'] or '-'}  {run['changed']} changed  ({run['data_path'] or '-'})")
+        for anchor, value in run["changes"].items():
+            log_line(f"    {'-' if value is None else '~'} {anchor}")
+    return 0
+
+
+def handle_reapply(args: argparse.Namespace, replacements: dict[str, str]) -> int:
+    """
+    Handle in-place re-apply: rewrite only changed anchors of an already filled doc.
+
+    Args:
+        args: Parsed command-line arguments
+        replacements: Freshly built replacements
+
+    Returns:
+        Exit code
+    """
+    doc_url, doc_id = find_doc_info(args.links_file, args.doc)
+    log_line(f"🔁 Re-apply mode: {args.doc}")
+    doc_id, changed = reapply_document(
+        doc=args.doc,
+        doc_id=doc_id,
+        replacements=replacements,
+        state_file=args.state_file,
+        client_path=args.client,
+        token_path=args.token,
+        dry_run=args.dry_run,
+    )
+    if args.dry_run or not changed:
+        return 0
+
+    update_state(
+        state_path=args.state_file,
+        doc=args.doc,
+        doc_url=doc_url,
+        doc_id=doc_id,
+        data_path=args.data,
+        replacements=replacements,
+    )
+    log_line(f"💾 State saved: {args.state_file}")
+    log_line("✅ Done.")
+    return 0
+
+
 def handle_apply(args: argparse.Namespace) -> int:
     """
     Handle document apply operation.
@@ -63,14 +134,24 @@ def handle_apply(args: argparse.Namespace) -> int:
         raise SystemExit("--data is required unless --reset is set")
 
     # Load and validate data
-    data = read_json(args.data)
+    with span("load data", path=args.data):
+        data = read_json(args.data)
     if not isinstance(data, dict):
         raise SystemExit("Structured CV data must be a JSON object.")
 
-    # Build replacements
-    replacements = build_replacements(data, lang=args.lang)
+    # Build replacements (reusing formatted sections from previous runs if --memo is set)
+    with span("build replacements") as phase:
+        if args.memo:
+            SECTION_MEMO.load(args.memo)
+        replacements = build_replacements(data, lang=args.lang)
+        if args.memo:
+            SECTION_MEMO.save(args.memo)
+        phase["placeholders"] = len(replacements)
     payload = {"replacements": replacements}
 
+    if args.reapply:
+        return handle_reapply(args, replacements)
+
     should_log = bool(args.out or args.doc)
 
     if should_log:
@@ -100,21 +181,52 @@ def handle_apply(args: argparse.Namespace) -> int:
 
     # Apply to document if specified
     if args.doc:
-        doc_url, doc_id = find_doc_info(args.links_file, args.doc)
-        log_line(f"📄 Target doc: {args.doc}")
-        if doc_url:
-            log_line(f"🔗 Target link: {doc_url}")
+        template_id = None
+        if args.template:
+            # Template mode: the output is a fresh copy, so placeholders are read from the template.
+            template_url, template_id = resolve_template(args.links_file, args.template)
+            doc_url, doc_id = None, None
+            log_line(f"📄 Target doc: {args.doc} (new copy)")
+            log_line(f"🧬 Template: {args.template}")
+            log_line(f"🔗 Template link: {template_url}")
         else:
-            log_line(f"🔗 Target link: not found in {args.links_file}")
-        if doc_id:
+            doc_url, doc_id = find_doc_info(args.links_file, args.doc)
+            log_line(f"📄 Target doc: {args.doc}")
+            if doc_url:
+                log_line(f"🔗 Target link: {doc_url}")
+            else:
+                log_line(f"🔗 Target link: not found in {args.links_file}")
+            if doc_id:
+                log_line(f"🆔 Document ID: {doc_id}")
+            else:
+                log_line("🆔 Document ID: unknown")
+
+        if template_id and not args.dry_run:
+            with span("copy template"):
+                doc_id, doc_url = copy_template(
+                    template_id=template_id,
+                    name=args.doc,
+                    client_path=args.client,
+                    token_path=args.token,
+                    folder=args.copy_folder,
+                )
+            log_line(f"🔗 Target link: {doc_url}")
             log_line(f"🆔 Document ID: {doc_id}")
-        else:
-            log_line("🆔 Document ID: unknown")
 
-        # Analyze placeholders
-        raw_text = get_doc_text(doc=args.doc, gdocs_cli=args.gdocs_cli, auto_auth=args.auto_auth)
-        doc_text = strip_print_header(raw_text)
-        doc_placeholders = extract_placeholders(doc_text)
+        # Analyze placeholders (a template dry-run previews against the template)
+        target_id = template_id if template_id and args.dry_run else doc_id
+        if args.legacy_fill:
+            with span("fetch doc", legacy=True):
+                raw_text = get_doc_text(doc=args.template or args.doc, gdocs_cli=args.gdocs_cli, auto_auth=args.auto_auth)
+            with span("placeholder analysis"):
+                doc_placeholders = extract_placeholders(strip_print_header(raw_text))
+        else:
+            if not target_id:
+                raise SystemExit("Document ID unknown; the structural fill needs it (or use --legacy-fill).")
+            with span("fetch doc"):
+                access_token, doc_data = fetch_unfilled(doc_id=target_id, client_path=args.client, token_path=args.token)
+            with span("placeholder analysis"):
+                doc_placeholders = placeholders_in_doc(doc_data)
         repl_keys = set(replacements.keys())
         applied = sorted(repl_keys & doc_placeholders)
         missing = sorted(repl_keys - doc_placeholders)
@@ -135,38 +247,71 @@ def handle_apply(args: argparse.Namespace) -> int:
             for key in extras:
                 log_line(f"  - {key}")
 
-        # Apply replacements
         log_line("🚀 Applying replacements...")
-        apply_with_auto_auth(
-            doc=args.doc,
-            data_path=out_path,
-            gdocs_cli=args.gdocs_cli,
-            match_case=args.match_case,
-            dry_run=args.dry_run,
-            auto_auth=args.auto_auth,
-            client=args.client,
-            token=args.token,
-        )
-
-        # Apply styling
-        if not args.dry_run and not args.reset:
-            apply_block_styles(
-                doc_id=doc_id,
-                client_path=args.client,
-                token_path=args.token,
-                replacements=replacements
-            )
-
-        # Update state
-        update_state(
-            state_path=args.state_file,
-            doc=args.doc,
-            doc_url=doc_url,
-            doc_id=doc_id,
-            data_path=args.data,
-            replacements=replacements,
-        )
-        log_line(f"💾 State saved: {args.state_file}")
+        if not args.legacy_fill:
+            # Text, bullets, styles and anchor ranges in one batchUpdate
+            with span("replace", structural=True):
+                fill_document(
+                    doc_id=target_id,
+                    doc_data=doc_data,
+                    access_token=access_token,
+                    replacements=replacements,
+                    match_case=args.match_case,
+                    track=args.anchor_ranges,
+                    dry_run=args.dry_run,
+                )
+        else:
+            with span("replace"):
+                # Placeholder positions before the fill, for anchor named ranges
+                pre_doc = None
+                if args.anchor_ranges and doc_id and not args.dry_run:
+                    pre_doc = fetch_document(doc_id=doc_id, client_path=args.client, token_path=args.token)
+
+                apply_with_auto_auth(
+                    doc=args.template if template_id and args.dry_run else args.doc,
+                    data_path=out_path,
+                    gdocs_cli=args.gdocs_cli,
+                    match_case=args.match_case,
+                    dry_run=args.dry_run,
+                    auto_auth=args.auto_auth,
+                    client=args.client,
+                    token=args.token,
+                    document_id=doc_id if template_id else None,
+                )
+
+                if pre_doc is not None:
+                    register_anchor_ranges(
+                        doc_id=doc_id,
+                        doc_data=pre_doc,
+                        replacements=replacements,
+                        client_path=args.client,
+                        token_path=args.token,
+                        match_case=args.match_case,
+                    )
+
+            # Apply styling (markers -> bullets, then marker cleanup)
+            if not args.dry_run:
+                with span("style"):
+                    apply_block_styles(
+                        doc_id=doc_id,
+                        client_path=args.client,
+                        token_path=args.token,
+                        replacements=replacements
+                    )
+
+        # Update state (a template dry-run created no document)
+        if not (template_id and args.dry_run):
+            with span("state write"):
+                update_state(
+                    state_path=args.state_file,
+                    doc=args.doc,
+                    doc_url=doc_url,
+                    doc_id=doc_id,
+                    data_path=args.data,
+                    replacements=replacements,
+                    template_id=template_id,
+                )
+            log_line(f"💾 State saved: {args.state_file}")
         log_line("✅ Done.")
 
     # Cleanup temp file
@@ -198,6 +343,11 @@ def main(argv: list[str]) -> int:
     parser.add_argument("--data", help="Path to structured CV JSON")
     parser.add_argument("--out", help="Where to write replacements JSON (optional)")
     parser.add_argument("--doc", help="Google Doc name to update (optional)")
+    parser.add_argument(
+        "--template",
+        help="Pristine template doc name (from links file): copy it via Drive files.copy and fill the copy named --doc",
+    )
+    parser.add_argument("--copy-folder", help="Drive folder ID for template copies (default: template's folder)")
 
     # Configuration
     parser.add_argument(
@@ -222,8 +372,12 @@ def main(argv: list[str]) -> int:
     )
     parser.add_argument(
         "--state-file",
-        default=".cv_apply_state.json",
-        help="Path to apply state JSON"
+        default=".cv_apply_state.db",
+        help="Path to apply state SQLite DB (a legacy .cv_apply_state.json next to it is imported once)"
+    )
+    parser.add_argument(
+        "--memo",
+        help="Path to a persisted section memo (formatted sections reused across runs)"
     )
 
     # Options
@@ -248,20 +402,66 @@ def main(argv: list[str]) -> int:
         action="store_true",
         help="Reset document back to last applied anchors"
     )
+    parser.add_argument(
+        "--reapply",
+        action="store_true",
+        help="Rewrite only the anchors whose values changed since the last apply (no reset needed)"
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="Print the recorded apply runs of --doc (with changed anchors) and exit"
+    )
+    parser.add_argument(
+        "--legacy-fill",
+        action="store_true",
+        help="Fill via gdocs_cli replaceAllText + bullet markers, then restyle (default: one structural batch)",
+    )
+    parser.add_argument(
+        "--anchor-ranges",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Register a named range per filled anchor so --reset/--reapply need no text search (default: true)",
+    )
     parser.add_argument(
         "--auto-auth",
         action=argparse.BooleanOptionalAction,
         default=True,
         help="Re-run OAuth auth if the token is expired or revoked (default: true)",
     )
+    parser.add_argument(
+        "--trace",
+        metavar="OUT_JSON",
+        help="Write per-phase and per-request spans as a Chrome trace-event JSON file",
+    )
+    gdocs_metrics.add_arguments(parser)
+    gdocs_profile.add_arguments(parser)
 
     args = parser.parse_args(argv)
 
-    # Handle reset or apply
-    if args.reset:
-        return handle_reset(args)
-    else:
-        return handle_apply(args)
+    if args.template and args.reset:
+        raise SystemExit("--template never modifies the template; --reset is not needed.")
+    if args.reapply and (args.reset or args.template or not args.doc):
+        raise SystemExit("--reapply requires --doc and cannot be combined with --reset or --template")
+    if args.template and not args.doc:
+        raise SystemExit("--template requires --doc (name for the new copy)")
+
+    # Handle history, reset or apply
+    if args.history:
+        return handle_history(args)
+    handler = handle_reset if args.reset else handle_apply
+    mode = "reset" if args.reset else "apply"
+    if args.trace:
+        gdocs_trace.enable()
+    try:
+        with gdocs_profile.from_args(args, title=f"cv_structured_apply {mode} {args.doc or ''}".rstrip()):
+            with span(mode, doc=args.doc):
+                return handler(args)
+    finally:
+        if args.trace:
+            count = gdocs_trace.write(args.trace, process_name=f"cv_structured_apply {mode}")
+            log_line(f"⏱️ Trace written: {args.trace} ({count} spans)")
+        gdocs_metrics.report(args, script=f"cv_structured_apply {mode}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+asyncio client for the Docs/Drive endpoints used by gdocs_cli.
+
+Speaks HTTP/1.1 directly over `asyncio.open_connection` + `ssl`, keeps idle
+keep-alive connections per host and bounds in-flight requests with a
+semaphore, so dozens of documents can be fetched on one thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import email.message
+import json
+import ssl
+import time
+import urllib.parse
+from typing import Any, Awaitable, Iterable, TypeVar
+from urllib.error import HTTPError, URLError
+
+import gdocs_cli
+import gdocs_metrics
+
+T = TypeVar("T")
+
+DEFAULT_CONCURRENCY = 8
+
+
+class _NoResponse(ConnectionError):
+    # The connection failed before any response byte arrived (typically a stale keep-alive socket).
+    pass
+
+
+class _Conn:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+class AsyncGoogleClient:
+    def __init__(self, access_token: str, *, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = 60.0):
+        self.access_token = access_token
+        self.timeout = timeout
+        self._ssl = ssl.create_default_context()
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._idle: dict[tuple[str, int], list[_Conn]] = {}
+
+    async def __aenter__(self) -> "AsyncGoogleClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    # --- connection pool ---
+
+    async def _acquire(self, host: str, port: int, use_tls: bool) -> tuple[_Conn, bool]:
+        idle = self._idle.get((host, port)) or []
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                return conn, True
+            conn.close()
+        if use_tls:
+            reader, writer = await asyncio.open_connection(host, port, ssl=self._ssl, server_hostname=host)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return _Conn(reader, writer), False
+
+    def _release(self, host: str, port: int, conn: _Conn) -> None:
+        self._idle.setdefault((host, port), []).append(conn)
+
+    # --- HTTP/1.1 ---
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> tuple[bytes, bool]:
+        # Returns (body, connection_reusable).
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks: list[bytes] = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailer section ends with an empty line.
+                    while (await reader.readline()).strip():
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return b"".join(chunks), True
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"])), True
+        return await reader.read(), False
+
+    async def _roundtrip(
+        self,
+        conn: _Conn,
+        method: str,
+        host: str,
+        target: str,
+        headers: dict[str, str],
+        body: bytes,
+    ) -> tuple[int, dict[str, str], bytes, bool]:
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", "Connection: keep-alive", "Accept-Encoding: identity"]
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        lines.append(f"Content-Length: {len(body)}")
+        try:
+            conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+            await conn.writer.drain()
+            status_line = await conn.reader.readline()
+        except ConnectionError as exc:
+            raise _NoResponse(f"connection failed before response: {exc!r}") from None
+        if not status_line:
+            raise _NoResponse("connection closed before response")
+        if not status_line.endswith(b"\n"):
+            raise ConnectionResetError("connection closed in the status line")
+        status = int(status_line.split()[1])
+        resp_headers: dict[str, str] = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            resp_headers[name.strip().lower()] = value.strip()
+        resp_body, reusable = await self._read_body(conn.reader, resp_headers)
+        if resp_headers.get("connection", "").lower() == "close":
+            reusable = False
+        return status, resp_headers, resp_body, reusable
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes = b"",
+        content_type: str | None = None,
+        access_token: str | None = None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        parsed = urllib.parse.urlsplit(url)
+        host = parsed.hostname or ""
+        use_tls = parsed.scheme == "https"
+        port = parsed.port or (443 if use_tls else 80)
+        target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        # access_token overrides the client's token for one request (daemon callers send their own).
+        headers = {"Authorization": f"Bearer {access_token or self.access_token}"}
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        async with self._sem:
+            started = time.perf_counter()
+            status, resp_body = 0, b""
+            try:
+                for attempt in range(2):
+                    conn, reused = await self._acquire(host, port, use_tls)
+                    try:
+                        status, resp_headers, resp_body, reusable = await asyncio.wait_for(
+                            self._roundtrip(conn, method, host, target, headers, body),
+                            timeout=self.timeout,
+                        )
+                    except _NoResponse as exc:
+                        conn.close()
+                        # A pooled keep-alive socket may have been dropped by the server; retry once on a fresh one.
+                        # Only when nothing came back: after a response started the server has the request,
+                        # and a POST (batchUpdate, upload) must not be sent twice.
+                        if reused and attempt == 0:
+                            continue
+                        raise URLError(f"{method} {url}: {exc!r}") from None
+                    except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                        conn.close()
+                        raise URLError(f"{method} {url}: {exc!r}") from None
+                    except (OSError, asyncio.TimeoutError) as exc:
+                        conn.close()
+                        raise URLError(f"{method} {url}: {exc!r}") from None
+                    if reusable:
+                        self._release(host, port, conn)
+                    else:
+                        conn.close()
+                    break
+            finally:
+                gdocs_metrics.record(
+                    gdocs_metrics.endpoint_kind(method, url),
+                    seconds=time.perf_counter() - started,
+                    status=status,
+                    bytes_sent=len(body),
+                    bytes_received=len(resp_body),
+                )
+
+        if status >= 400:
+            hdrs = email.message.Message()
+            for k, v in resp_headers.items():
+                hdrs[k] = v
+            raise HTTPError(url, status, resp_body.decode("utf-8", errors="replace"), hdrs, None)
+        return status, resp_headers, resp_body
+
+    async def _json(self, method: str, url: str, **kwargs: Any) -> dict[str, Any]:
+        _, _, body = await self.request(method, url, **kwargs)
+        text = body.decode("utf-8")
+        if not text.strip():
+            return {}
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError(f"Non-JSON response from {method} {url}: {text[:500]}") from None
+
+    # --- API surface (mirrors the sync helpers in gdocs_cli) ---
+
+    async def get_doc(self, document_id: str, *, access_token: str | None = None) -> dict[str, Any]:
+        return await self._json("GET", f"{gdocs_cli.DOCS_API_BASE}/documents/{document_id}", access_token=access_token)
+
+    async def batch_update(
+        self,
+        document_id: str,
+        requests: list[dict[str, Any]],
+        *,
+        required_revision_id: str | None = None,
+        access_token: str | None = None,
+    ) -> dict[str, Any]:
+        body: dict[str, Any] = {"requests": requests}
+        if required_revision_id:
+            body["writeControl"] = {"requiredRevisionId": required_revision_id}
+        payload = json.dumps(body).encode("utf-8")
+        return await self._json(
+            "POST",
+            f"{gdocs_cli.DOCS_API_BASE}/documents/{document_id}:batchUpdate",
+            body=payload,
+            content_type="application/json; charset=utf-8",
+            access_token=access_token,
+        )
+
+    async def export(self, file_id: str, mime_type: str, *, access_token: str | None = None) -> bytes:
+        qs = urllib.parse.urlencode({"mimeType": mime_type})
+        _, _, body = await self.request(
+            "GET", f"{gdocs_cli.DRIVE_API_BASE}/files/{file_id}/export?{qs}", access_token=access_token
+        )
+        return body
+
+    async def files_get(self, file_id: str, *, fields: str = gdocs_cli.DRIVE_METADATA_FIELDS) -> dict[str, Any]:
+        qs = urllib.parse.urlencode({"fields": fields})
+        return await self._json("GET", f"{gdocs_cli.DRIVE_API_BASE}/files/{file_id}?{qs}")
+
+    async def download(self, file_id: str) -> bytes:
+        _, _, body = await self.request("GET", f"{gdocs_cli.DRIVE_API_BASE}/files/{file_id}?alt=media")
+        return body
+
+    async def upload(
+        self,
+        *,
+        metadata: dict[str, Any],
+        media_bytes: bytes,
+        media_type: str,
+        file_id: str | None = None,
+    ) -> dict[str, Any]:
+        body, content_type = gdocs_cli.build_multipart_related(metadata, media_bytes, media_type)
+        if file_id:
+            url = f"{gdocs_cli.DRIVE_UPLOAD_BASE}/files/{file_id}?uploadType=multipart"
+            return await self._json("PATCH", url, body=body, content_type=content_type)
+        url = f"{gdocs_cli.DRIVE_UPLOAD_BASE}/files?uploadType=multipart"
+        return await self._json("POST", url, body=body, content_type=content_type)
+
+
+async def gather_settled(aws: Iterable[Awaitable[T]]) -> list[T | BaseException]:
+    # Concurrency is bounded by the client's semaphore; this only collects results and errors in order.
+    # Errors are HTTPError/URLError/ValueError (never SystemExit, which would tear down the loop).
+    return await asyncio.gather(*aws, return_exceptions=True)
+
+
+def fetch_docs(
+    document_ids: list[str],
+    *,
+    access_token: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, dict[str, Any] | BaseException]:
+    async def run() -> dict[str, dict[str, Any] | BaseException]:
+        async with AsyncGoogleClient(access_token, concurrency=concurrency) as client:
+            unique = list(dict.fromkeys(document_ids))
+            results = await gather_settled(client.get_doc(doc_id) for doc_id in unique)
+            return dict(zip(unique, results))
+
+    return asyncio.run(run())
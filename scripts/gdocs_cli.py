@@ -2,31 +2,40 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import json
 import os
 import re
-import secrets
-import shutil
-import subprocess
 import sys
-import tempfile
 import time
-import zipfile
-import io
 import urllib.parse
-import urllib.request
-import webbrowser
 from dataclasses import dataclass
-from http.server import BaseHTTPRequestHandler, HTTPServer
 from urllib.error import HTTPError, URLError
-from typing import Any, Iterable
-import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+
+import gdocs_metrics
+import gdocs_profile
+import gdocs_trace
+
+# Heavier modules (urllib.request, http.server, subprocess, tempfile, zipfile,
+# xml.etree, ...) are imported by the functions that need them, so that
+# `list` and `--help` don't pay for them at startup.
+if TYPE_CHECKING:
+    import zipfile
+    import xml.etree.ElementTree as ET
 
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DOCS_API_BASE = "https://docs.googleapis.com/v1"
 DRIVE_API_BASE = "https://www.googleapis.com/drive/v3"
 DRIVE_UPLOAD_BASE = "https://www.googleapis.com/upload/drive/v3"
+DRIVE_BATCH_URL = "https://www.googleapis.com/batch/drive/v3"
+# Google rejects batch requests with more than 100 parts.
+DRIVE_BATCH_MAX_PARTS = 100
+DRIVE_METADATA_FIELDS = "id,name,mimeType,shortcutDetails(targetId,targetMimeType)"
+RENDER_CACHE_DIR = os.path.join(ROOT_DIR, ".tmp", "render-cache")
+RENDER_CACHE_MAX_ENTRIES = 32
 
 
 def eprint(*args: object) -> None:
@@ -118,39 +127,94 @@ def load_oauth_client(path: str) -> OAuthClient:
     )
 
 
-class _OAuthCallbackHandler(BaseHTTPRequestHandler):
-    server_version = "gdocs-cli/1.0"
-    oauth_result: dict[str, str] | None = None
+def _oauth_callback_handler() -> type:
+    from http.server import BaseHTTPRequestHandler
 
-    def log_message(self, format: str, *args: object) -> None:
-        return
+    class _OAuthCallbackHandler(BaseHTTPRequestHandler):
+        server_version = "gdocs-cli/1.0"
+        oauth_result: dict[str, str] | None = None
 
-    def do_GET(self) -> None:  # noqa: N802
-        parsed = urllib.parse.urlparse(self.path)
-        params = urllib.parse.parse_qs(parsed.query)
-        code = (params.get("code") or [None])[0]
-        state = (params.get("state") or [None])[0]
-        error = (params.get("error") or [None])[0]
+        def log_message(self, format: str, *args: object) -> None:
+            return
 
-        self.send_response(200)
-        self.send_header("Content-Type", "text/plain; charset=utf-8")
-        self.end_headers()
+        def do_GET(self) -> None:  # noqa: N802
+            parsed = urllib.parse.urlparse(self.path)
+            params = urllib.parse.parse_qs(parsed.query)
+            code = (params.get("code") or [None])[0]
+            state = (params.get("state") or [None])[0]
+            error = (params.get("error") or [None])[0]
 
-        if error:
-            self.wfile.write(f"OAuth error: {error}\n".encode("utf-8"))
-            self.__class__.oauth_result = {"error": error, "state": state or ""}
-            return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
 
-        if not code:
-            self.wfile.write(b"Missing code\n")
-            self.__class__.oauth_result = {"error": "missing_code", "state": state or ""}
-            return
+            if error:
+                self.wfile.write(f"OAuth error: {error}\n".encode("utf-8"))
+                self.__class__.oauth_result = {"error": error, "state": state or ""}
+                return
+
+            if not code:
+                self.wfile.write(b"Missing code\n")
+                self.__class__.oauth_result = {"error": "missing_code", "state": state or ""}
+                return
+
+            self.wfile.write(b"OK. You can close this tab.\n")
+            self.__class__.oauth_result = {"code": code, "state": state or ""}
 
-        self.wfile.write(b"OK. You can close this tab.\n")
-        self.__class__.oauth_result = {"code": code, "state": state or ""}
+    return _OAuthCallbackHandler
+
+
+class _CountingResponse:
+    def __init__(self, resp: Any):
+        self._resp = resp
+        self.status = resp.status
+        self.headers = resp.headers
+        self.bytes_read = 0
+
+    def read(self, amt: int | None = None) -> bytes:
+        data = self._resp.read() if amt is None else self._resp.read(amt)
+        self.bytes_read += len(data)
+        return data
+
+
+@contextlib.contextmanager
+def _urlopen(req: Any, *, timeout: float, opener: Any = None) -> Iterator[Any]:
+    # Every direct API round trip goes through here: it is counted per endpoint kind (gdocs_metrics)
+    # and, with --trace, is an "http" span. Both last until the caller has read the response body.
+    import urllib.request
+
+    method = req.get_method()
+    parsed = urllib.parse.urlsplit(req.full_url)
+    sent = len(req.data or b"")
+    status = received = 0
+    started = time.perf_counter()
+    try:
+        with gdocs_trace.span(f"{method} {parsed.path}", cat="http", host=parsed.netloc, bytes_sent=sent) as span:
+            with (opener.open if opener else urllib.request.urlopen)(req, timeout=timeout) as raw:
+                status = span["status"] = raw.status
+                resp = _CountingResponse(raw)
+                try:
+                    yield resp
+                finally:
+                    received = resp.bytes_read
+    except HTTPError as exc:
+        status = exc.code
+        length = exc.headers.get("Content-Length") if exc.headers else None
+        received = int(length) if length and length.isdigit() else 0
+        raise
+    finally:
+        gdocs_metrics.record(
+            gdocs_metrics.endpoint_kind(method, req.full_url),
+            seconds=time.perf_counter() - started,
+            status=status,
+            bytes_sent=sent,
+            bytes_received=received,
+        )
 
 
 def http_post_form(url: str, data: dict[str, str]) -> dict[str, Any]:
+    import urllib.request
+
     encoded = urllib.parse.urlencode(data).encode("utf-8")
     req = urllib.request.Request(
         url=url,
@@ -159,7 +223,7 @@ def http_post_form(url: str, data: dict[str, str]) -> dict[str, Any]:
         headers={"Content-Type": "application/x-www-form-urlencoded"},
     )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with _urlopen(req, timeout=30) as resp:
             body = resp.read().decode("utf-8")
     except HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace")
@@ -173,13 +237,15 @@ def http_post_form(url: str, data: dict[str, str]) -> dict[str, Any]:
 
 
 def http_get_json(url: str, access_token: str) -> dict[str, Any]:
+    import urllib.request
+
     req = urllib.request.Request(
         url=url,
         method="GET",
         headers={"Authorization": f"Bearer {access_token}"},
     )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with _urlopen(req, timeout=30) as resp:
             body = resp.read().decode("utf-8")
     except HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace")
@@ -193,13 +259,15 @@ def http_get_json(url: str, access_token: str) -> dict[str, Any]:
 
 
 def http_get_bytes(url: str, access_token: str) -> bytes:
+    import urllib.request
+
     req = urllib.request.Request(
         url=url,
         method="GET",
         headers={"Authorization": f"Bearer {access_token}"},
     )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with _urlopen(req, timeout=30) as resp:
             return resp.read()
     except HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace")
@@ -208,7 +276,100 @@ def http_get_bytes(url: str, access_token: str) -> bytes:
         raise SystemExit(f"Network error during GET {url}: {exc}") from None
 
 
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+class DownloadProgress:
+    # Live progress/throughput line on stderr; silent unless stderr is a terminal.
+
+    def __init__(self, label: str):
+        self.label = label
+        self.enabled = sys.stderr.isatty()
+        self._shown_at = -1.0
+
+    def __call__(self, done: int, total: int | None, elapsed: float) -> None:
+        if not self.enabled:
+            return
+        finished = total is not None and done >= total
+        if not finished and elapsed - self._shown_at < 0.1:
+            return
+        self._shown_at = elapsed
+        rate = done / elapsed if elapsed > 0 else 0.0
+        pct = f" ({done * 100 // total}%)" if total else ""
+        sys.stderr.write(f"\r{self.label}: {format_bytes(done)}{pct}, {format_bytes(rate)}/s ")
+        sys.stderr.flush()
+
+    def finish(self) -> None:
+        if self.enabled and self._shown_at >= 0:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+
+
+def http_download_to_file(
+    url: str,
+    access_token: str,
+    dest_path: str,
+    *,
+    progress: Callable[[int, int | None, float], None] | None = None,
+) -> tuple[int, float]:
+    # Streams the response body to dest_path in chunks (atomic rename at the end).
+    # Returns (bytes written, seconds elapsed).
+    import urllib.request
+
+    req = urllib.request.Request(
+        url=url,
+        method="GET",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    tmp = f"{dest_path}.tmp"
+    started = time.monotonic()
+    done = 0
+    try:
+        with _urlopen(req, timeout=30) as resp:
+            length = resp.headers.get("Content-Length") or ""
+            total = int(length) if length.isdigit() else None
+            with open(tmp, "wb") as f:
+                while True:
+                    chunk = resp.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, total, time.monotonic() - started)
+    except HTTPError as exc:
+        _remove_quietly(tmp)
+        err_body = exc.read().decode("utf-8", errors="replace")
+        raise HTTPError(url, exc.code, err_body, exc.headers, None) from None
+    except URLError as exc:
+        _remove_quietly(tmp)
+        raise SystemExit(f"Network error during GET {url}: {exc}") from None
+    except BaseException:
+        _remove_quietly(tmp)
+        raise
+    os.replace(tmp, dest_path)
+    return done, time.monotonic() - started
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
 def http_post_json(url: str, access_token: str, payload: dict[str, Any]) -> dict[str, Any]:
+    import urllib.request
+
     data = json.dumps(payload).encode("utf-8")
     req = urllib.request.Request(
         url=url,
@@ -220,7 +381,7 @@ def http_post_json(url: str, access_token: str, payload: dict[str, Any]) -> dict
         },
     )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with _urlopen(req, timeout=30) as resp:
             body = resp.read().decode("utf-8")
     except HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace")
@@ -307,9 +468,12 @@ def oauth_authorize_interactive(
     token_path: str,
     scopes: list[str],
 ) -> None:
-    _OAuthCallbackHandler.oauth_result = None
+    import secrets
+    import webbrowser
+    from http.server import HTTPServer
 
-    server = HTTPServer(("127.0.0.1", 0), _OAuthCallbackHandler)
+    handler = _oauth_callback_handler()
+    server = HTTPServer(("127.0.0.1", 0), handler)
     _, port = server.server_address
     redirect_uri = f"http://localhost:{port}"
 
@@ -333,7 +497,7 @@ def oauth_authorize_interactive(
         pass
 
     server.handle_request()
-    result = _OAuthCallbackHandler.oauth_result
+    result = handler.oauth_result
     if not result:
         raise SystemExit("OAuth callback not received.")
 
@@ -428,51 +592,423 @@ def iter_text_runs(doc_json: dict[str, Any]) -> Iterable[str]:
                 yield content
 
 
+def daemon_socket_path() -> str:
+    import tempfile
+
+    return os.environ.get("GDOCS_SOCKET") or os.path.join(tempfile.gettempdir(), f"gdocs-{os.getuid()}.sock")
+
+
+def _daemon() -> Any:
+    # A running `serve` daemon (warm token, keep-alive pool, doc cache) takes the API calls; GDOCS_DAEMON=0 opts out.
+    if os.environ.get("GDOCS_DAEMON") == "0":
+        return None
+    path = daemon_socket_path()
+    if not os.path.exists(path):
+        return None
+    import gdocs_daemon
+
+    return gdocs_daemon.connect(path)
+
+
 def get_doc(
     *,
     document_id: str,
     access_token: str,
+    fresh: bool = False,
 ) -> dict[str, Any]:
+    daemon = _daemon()
+    if daemon is not None:
+        doc = daemon.try_call("get_doc", document_id=document_id, fresh=fresh, access_token=access_token)
+        if doc is not None:
+            return doc
     return http_get_json(f"{DOCS_API_BASE}/documents/{document_id}", access_token)
 
 
-def docs_batch_update(*, document_id: str, access_token: str, requests: list[dict[str, Any]]) -> dict[str, Any]:
+def replace_all_requests(replacements: dict[str, Any], *, match_case: bool = False) -> list[dict[str, Any]]:
+    requests: list[dict[str, Any]] = []
+    for k, v in replacements.items():
+        if not isinstance(k, str):
+            continue
+        if v is None:
+            v = ""
+        if not isinstance(v, str):
+            v = str(v)
+        requests.append(
+            {
+                "replaceAllText": {
+                    "containsText": {"text": k, "matchCase": bool(match_case)},
+                    "replaceText": v,
+                }
+            }
+        )
+    return requests
+
+
+def docs_batch_update(
+    *,
+    document_id: str,
+    access_token: str,
+    requests: list[dict[str, Any]],
+    required_revision_id: str | None = None,
+) -> dict[str, Any]:
+    daemon = _daemon()
+    if daemon is not None:
+        resp = daemon.try_call(
+            "batch_update",
+            document_id=document_id,
+            requests=requests,
+            required_revision_id=required_revision_id,
+            access_token=access_token,
+        )
+        if resp is not None:
+            return resp
     url = f"{DOCS_API_BASE}/documents/{document_id}:batchUpdate"
-    return http_post_json(url, access_token, {"requests": requests})
+    payload: dict[str, Any] = {"requests": requests}
+    if required_revision_id:
+        payload["writeControl"] = {"requiredRevisionId": required_revision_id}
+    return http_post_json(url, access_token, payload)
+
+
+REVISION_RETRIES = 5
+
+
+def is_revision_conflict(exc: HTTPError) -> bool:
+    # batchUpdate with a stale writeControl.requiredRevisionId fails with 400 FAILED_PRECONDITION.
+    body = str(exc.msg or "")
+    return exc.code in (400, 409) and ("requiredRevisionId" in body or "revision" in body.lower())
+
+
+def docs_batch_update_planned(
+    *,
+    document_id: str,
+    access_token: str,
+    plan: Callable[[dict[str, Any]], list[list[dict[str, Any]]]],
+    doc: dict[str, Any] | None = None,
+    retries: int = REVISION_RETRIES,
+    pause: float = 0.0,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    # Optimistic concurrency: plan(doc) returns batches computed from one snapshot. Each batch
+    # requires the revision it was planned against (the first one the snapshot's, later ones the
+    # revision our previous batch produced); if another writer got in between, re-fetch and re-plan.
+    for attempt in range(retries + 1):
+        if doc is None:
+            doc = get_doc(document_id=document_id, access_token=access_token, fresh=attempt > 0)
+        revision = doc.get("revisionId")
+        responses: list[dict[str, Any]] = []
+        with gdocs_trace.span("plan", attempt=attempt) as span:
+            batches = plan(doc)
+            span["requests"] = sum(len(batch) for batch in batches)
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+                if responses and pause:
+                    time.sleep(pause)
+                resp = docs_batch_update(
+                    document_id=document_id,
+                    access_token=access_token,
+                    requests=batch,
+                    required_revision_id=revision,
+                )
+                responses.append(resp)
+                revision = (resp.get("writeControl") or {}).get("requiredRevisionId")
+            return doc, responses
+        except HTTPError as exc:
+            if not is_revision_conflict(exc) or attempt >= retries:
+                raise
+            eprint(f"Document {document_id} changed since it was read; re-planning (retry {attempt + 1}/{retries}).")
+            doc = None
+            time.sleep(min(0.5 * 2**attempt, 8.0))
+    raise AssertionError("unreachable")
 
 
 def drive_export_bytes(*, file_id: str, access_token: str, mime_type: str) -> bytes:
+    import base64
+
+    daemon = _daemon()
+    if daemon is not None:
+        resp = daemon.try_call("export", file_id=file_id, mime_type=mime_type, access_token=access_token)
+        if resp is not None:
+            return base64.b64decode(resp["data"])
     qs = urllib.parse.urlencode({"mimeType": mime_type})
     url = f"{DRIVE_API_BASE}/files/{file_id}/export?{qs}"
     return http_get_bytes(url, access_token)
 
 
+def drive_export_to_file(
+    *,
+    file_id: str,
+    access_token: str,
+    mime_type: str,
+    dest_path: str,
+    progress: Callable[[int, int | None, float], None] | None = None,
+) -> tuple[int, float]:
+    daemon = _daemon()
+    if daemon is not None:
+        started = time.perf_counter()
+        resp = daemon.try_call(
+            "export",
+            file_id=file_id,
+            mime_type=mime_type,
+            dest_path=os.path.abspath(dest_path),
+            access_token=access_token,
+        )
+        if resp is not None:
+            elapsed = time.perf_counter() - started
+            if progress:
+                progress(resp["size"], resp["size"], elapsed)
+            return resp["size"], elapsed
+    qs = urllib.parse.urlencode({"mimeType": mime_type})
+    url = f"{DRIVE_API_BASE}/files/{file_id}/export?{qs}"
+    return http_download_to_file(url, access_token, dest_path, progress=progress)
+
+
 def drive_export_plain_text(*, file_id: str, access_token: str) -> str:
     raw = drive_export_bytes(file_id=file_id, access_token=access_token, mime_type="text/plain")
     return raw.decode("utf-8", errors="replace")
 
 
+def drive_export_markdown(*, file_id: str, access_token: str) -> str:
+    raw = drive_export_bytes(file_id=file_id, access_token=access_token, mime_type="text/markdown")
+    return raw.decode("utf-8-sig", errors="replace")
+
+
+MARKDOWN_EXPORT_SUPPORT_PATH = os.path.join(ROOT_DIR, ".tmp", "markdown-export-support.json")
+# Docs that failed the native markdown export are re-probed after this long.
+MARKDOWN_EXPORT_RETRY_SECONDS = 7 * 24 * 3600
+# 403 reasons that say the document itself cannot be exported as markdown.
+MARKDOWN_EXPORT_UNSUPPORTED_REASONS = ("cannotExportFile", "exportSizeLimitExceeded")
+_markdown_export_support: dict[str, Any] | None = None
+
+
+def _load_markdown_export_support() -> dict[str, Any]:
+    global _markdown_export_support
+    if _markdown_export_support is None:
+        try:
+            data = read_json(MARKDOWN_EXPORT_SUPPORT_PATH)
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        _markdown_export_support = data if isinstance(data, dict) else {}
+    return _markdown_export_support
+
+
+def markdown_export_supported(file_id: str) -> bool | None:
+    # True/False from earlier attempts, None if unknown (or a failure old enough to retry).
+    entry = _load_markdown_export_support().get(file_id)
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("markdown"):
+        return True
+    if now_epoch() - int(entry.get("checked_at") or 0) > MARKDOWN_EXPORT_RETRY_SECONDS:
+        return None
+    return False
+
+
+def is_markdown_export_unsupported(exc: HTTPError) -> bool:
+    # Only these failures are remembered; auth, quota (429, other 403s) and 5xx are transient.
+    if exc.code == 400:
+        return True
+    body = str(exc.msg or "")
+    return exc.code == 403 and any(reason in body for reason in MARKDOWN_EXPORT_UNSUPPORTED_REASONS)
+
+
+def record_markdown_export_support(file_id: str, supported: bool) -> None:
+    support = _load_markdown_export_support()
+    entry = support.get(file_id)
+    if supported and isinstance(entry, dict) and entry.get("markdown"):
+        return
+    support[file_id] = {"markdown": supported, "checked_at": now_epoch()}
+    try:
+        write_json(MARKDOWN_EXPORT_SUPPORT_PATH, support)
+    except OSError:
+        pass
+
+
 def drive_get_metadata(*, file_id: str, access_token: str) -> dict[str, Any]:
-    fields = "id,name,mimeType,shortcutDetails(targetId,targetMimeType)"
-    qs = urllib.parse.urlencode({"fields": fields})
+    qs = urllib.parse.urlencode({"fields": DRIVE_METADATA_FIELDS})
     url = f"{DRIVE_API_BASE}/files/{file_id}?{qs}"
     return http_get_json(url, access_token)
 
 
+def drive_copy_file(
+    *,
+    file_id: str,
+    access_token: str,
+    name: str | None = None,
+    parents: list[str] | None = None,
+) -> dict[str, Any]:
+    # Server-side copy: the new file gets the source's content, styles and named ranges.
+    qs = urllib.parse.urlencode({"fields": "id,name,mimeType", "supportsAllDrives": "true"})
+    url = f"{DRIVE_API_BASE}/files/{file_id}/copy?{qs}"
+    body: dict[str, Any] = {}
+    if name:
+        body["name"] = name
+    if parents:
+        body["parents"] = parents
+    return http_post_json(url, access_token, body)
+
+
+def doc_edit_url(document_id: str) -> str:
+    return f"https://docs.google.com/document/d/{document_id}/edit"
+
+
+def _split_head_body(raw: bytes) -> tuple[dict[str, str], bytes, str]:
+    # Returns (lower-cased headers, body, first line). The first line is the
+    # status line for an embedded HTTP response and empty for MIME part headers.
+    head, sep, body = raw.partition(b"\r\n\r\n")
+    if not sep:
+        head, _, body = raw.partition(b"\n\n")
+    lines = head.decode("latin-1").splitlines()
+    first = ""
+    if lines and ":" not in lines[0]:
+        first = lines.pop(0)
+    headers: dict[str, str] = {}
+    for line in lines:
+        name, colon, value = line.partition(":")
+        if colon:
+            headers[name.strip().lower()] = value.strip()
+    return headers, body, first
+
+
+def parse_multipart_mixed(body: bytes, boundary: str) -> list[tuple[dict[str, str], bytes]]:
+    delimiter = f"--{boundary}".encode("latin-1")
+    parts: list[tuple[dict[str, str], bytes]] = []
+    for chunk in body.split(delimiter)[1:]:
+        if chunk.startswith(b"--"):
+            break
+        chunk = chunk.removeprefix(b"\r\n").removeprefix(b"\n")
+        chunk = chunk.removesuffix(b"\r\n").removesuffix(b"\n")
+        headers, payload, _ = _split_head_body(chunk)
+        parts.append((headers, payload))
+    return parts
+
+
+def http_post_batch(
+    url: str,
+    access_token: str,
+    calls: list[tuple[str, str]],
+) -> list[tuple[int, Any]]:
+    # Packs bodiless (method, path) calls into one multipart/mixed request.
+    # Returns (status, parsed JSON body) per call, in the order of `calls`.
+    import secrets
+    import urllib.request
+
+    boundary = f"gdocs_cli_batch_{secrets.token_hex(12)}"
+    chunks: list[str] = []
+    for idx, (method, path) in enumerate(calls):
+        chunks.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <item{idx}>\r\n\r\n"
+            f"{method} {path} HTTP/1.1\r\n\r\n"
+        )
+    chunks.append(f"--{boundary}--\r\n")
+    data = "".join(chunks).encode("utf-8")
+
+    req = urllib.request.Request(
+        url=url,
+        data=data,
+        method="POST",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": f"multipart/mixed; boundary={boundary}",
+        },
+    )
+    try:
+        with _urlopen(req, timeout=60) as resp:
+            content_type = resp.headers.get("Content-Type") or ""
+            body = resp.read()
+    except HTTPError as exc:
+        err_body = exc.read().decode("utf-8", errors="replace")
+        raise HTTPError(url, exc.code, err_body, exc.headers, None) from None
+    except URLError as exc:
+        raise SystemExit(f"Network error during POST {url}: {exc}") from None
+
+    m = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not m:
+        raise SystemExit(f"Batch response without multipart boundary from {url}: {content_type!r}")
+
+    results: list[tuple[int, Any]] = [(0, None)] * len(calls)
+    for headers, payload in parse_multipart_mixed(body, m.group(1)):
+        cid = re.search(r"item(\d+)", headers.get("content-id", ""))
+        if not cid or int(cid.group(1)) >= len(calls):
+            continue
+        _, inner_body, status_line = _split_head_body(payload)
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            status = 0
+        text = inner_body.decode("utf-8", errors="replace").strip()
+        try:
+            parsed = json.loads(text) if text else {}
+        except json.JSONDecodeError:
+            parsed = {"error": {"code": status, "message": text[:500]}}
+        results[int(cid.group(1))] = (status, parsed)
+    return results
+
+
+def drive_batch_get_metadata(*, file_ids: Iterable[str], access_token: str) -> dict[str, dict[str, Any]]:
+    # Failed parts keep Google's {"error": {...}} body instead of raising,
+    # so one inaccessible file does not hide the others.
+    unique = list(dict.fromkeys(file_ids))
+    qs = urllib.parse.urlencode({"fields": DRIVE_METADATA_FIELDS})
+    out: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(unique), DRIVE_BATCH_MAX_PARTS):
+        chunk = unique[start : start + DRIVE_BATCH_MAX_PARTS]
+        calls = [("GET", f"/drive/v3/files/{urllib.parse.quote(fid)}?{qs}") for fid in chunk]
+        for fid, (status, body) in zip(chunk, http_post_batch(DRIVE_BATCH_URL, access_token, calls)):
+            if not isinstance(body, dict):
+                body = {}
+            if status != 200 and "error" not in body:
+                body = {"error": {"code": status, "message": "missing batch response part"}}
+            out[fid] = body
+    return out
+
+
+def drive_batch_resolve_targets(
+    *,
+    file_ids: Iterable[str],
+    access_token: str,
+) -> dict[str, tuple[str, dict[str, Any]]]:
+    # Batch version of drive_resolve_target: two round-trips at most (files, then shortcut targets).
+    metas = drive_batch_get_metadata(file_ids=file_ids, access_token=access_token)
+    shortcuts: dict[str, str] = {}
+    for fid, meta in metas.items():
+        if meta.get("mimeType") == "application/vnd.google-apps.shortcut":
+            target_id = (meta.get("shortcutDetails") or {}).get("targetId")
+            if target_id:
+                shortcuts[fid] = target_id
+    targets = drive_batch_get_metadata(file_ids=shortcuts.values(), access_token=access_token) if shortcuts else {}
+
+    out: dict[str, tuple[str, dict[str, Any]]] = {}
+    for fid, meta in metas.items():
+        target_id = shortcuts.get(fid)
+        if target_id:
+            out[fid] = (target_id, targets.get(target_id) or {})
+        else:
+            out[fid] = (fid, meta)
+    return out
+
+
 def drive_download_bytes(*, file_id: str, access_token: str) -> bytes:
     url = f"{DRIVE_API_BASE}/files/{file_id}?alt=media"
     return http_get_bytes(url, access_token)
 
 
-def drive_upload_multipart(
+def drive_download_to_file(
     *,
+    file_id: str,
     access_token: str,
-    url: str,
-    metadata: dict[str, Any],
-    media_bytes: bytes,
-    media_type: str,
-    method: str = "POST",
-) -> dict[str, Any]:
+    dest_path: str,
+    progress: Callable[[int, int | None, float], None] | None = None,
+) -> tuple[int, float]:
+    url = f"{DRIVE_API_BASE}/files/{file_id}?alt=media"
+    return http_download_to_file(url, access_token, dest_path, progress=progress)
+
+
+def build_multipart_related(metadata: dict[str, Any], media_bytes: bytes, media_type: str) -> tuple[bytes, str]:
+    import secrets
+
     boundary = f"===============gdocs_cli_{secrets.token_hex(12)}"
     meta_json = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
     body = (
@@ -486,6 +1022,21 @@ def drive_upload_multipart(
     ).encode("utf-8")
     body += media_bytes + b"\r\n"
     body += f"--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/related; boundary={boundary}"
+
+
+def drive_upload_multipart(
+    *,
+    access_token: str,
+    url: str,
+    metadata: dict[str, Any],
+    media_bytes: bytes,
+    media_type: str,
+    method: str = "POST",
+) -> dict[str, Any]:
+    import urllib.request
+
+    body, content_type = build_multipart_related(metadata, media_bytes, media_type)
 
     req = urllib.request.Request(
         url=url,
@@ -493,11 +1044,11 @@ def drive_upload_multipart(
         method=method,
         headers={
             "Authorization": f"Bearer {access_token}",
-            "Content-Type": f"multipart/related; boundary={boundary}",
+            "Content-Type": content_type,
         },
     )
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
+        with _urlopen(req, timeout=60) as resp:
             resp_body = resp.read().decode("utf-8")
     except HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace")
@@ -512,20 +1063,298 @@ def drive_upload_multipart(
         raise SystemExit(f"Non-JSON response from {method} {url}: {resp_body[:500]}") from None
 
 
-def render_markdown_to_docx(
-    md_path: str,
-    out_path: str,
+# Above this size import-md switches to a resumable session that streams the file in chunks.
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+# Drive requires chunk sizes in multiples of 256 KiB (except the last chunk).
+RESUMABLE_CHUNK_SIZE = 8 * 256 * 1024
+RESUMABLE_MAX_RETRIES = 5
+
+
+@functools.lru_cache(maxsize=None)
+def _upload_opener() -> Any:
+    import urllib.request
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        # Resumable uploads answer 308 "Resume Incomplete" without Location; it must not be followed.
+        def redirect_request(self, req, fp, code, msg, headers, newurl):  # type: ignore[override]
+            return None
+
+    return urllib.request.build_opener(_NoRedirect)
+
+
+def _resumable_offset(range_header: str | None) -> int:
+    # "bytes=0-1048575" -> next offset 1048576; no header means nothing was persisted yet.
+    if not range_header or "-" not in range_header:
+        return 0
+    return int(range_header.rsplit("-", 1)[1]) + 1
+
+
+def drive_upload_resumable_start(
+    *,
+    access_token: str,
+    metadata: dict[str, Any],
+    media_type: str,
+    size: int,
+    file_id: str | None = None,
+) -> str:
+    import urllib.request
+
+    if file_id:
+        url = f"{DRIVE_UPLOAD_BASE}/files/{file_id}?uploadType=resumable"
+        method = "PATCH"
+    else:
+        url = f"{DRIVE_UPLOAD_BASE}/files?uploadType=resumable"
+        method = "POST"
+    req = urllib.request.Request(
+        url=url,
+        data=json.dumps(metadata).encode("utf-8"),
+        method=method,
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json; charset=UTF-8",
+            "X-Upload-Content-Type": media_type,
+            "X-Upload-Content-Length": str(size),
+        },
+    )
+    # Opening the session backs off on 429/5xx and network errors like the chunk PUTs do.
+    failures = 0
+    while True:
+        try:
+            with _urlopen(req, timeout=60, opener=_upload_opener()) as resp:
+                session_url = resp.headers.get("Location")
+            break
+        except HTTPError as exc:
+            err_body = exc.read().decode("utf-8", errors="replace")
+            if (exc.code < 500 and exc.code != 429) or failures >= RESUMABLE_MAX_RETRIES:
+                raise SystemExit(f"HTTP {exc.code} during {method} {url}: {err_body}") from None
+        except URLError as exc:
+            if failures >= RESUMABLE_MAX_RETRIES:
+                raise SystemExit(f"Network error during {method} {url}: {exc}") from None
+        failures += 1
+        time.sleep(min(2**failures, 30))
+    if not session_url:
+        raise SystemExit(f"No upload session URL in response to {method} {url}")
+    return session_url
+
+
+def _resumable_put(
+    session_url: str,
+    access_token: str,
+    body: bytes,
+    content_range: str,
+) -> tuple[int, str | None, str]:
+    # Returns (status, Range header, body). 308 means "more bytes expected".
+    import urllib.request
+
+    req = urllib.request.Request(
+        url=session_url,
+        data=body,
+        method="PUT",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Length": str(len(body)),
+            "Content-Range": content_range,
+        },
+    )
+    try:
+        with _urlopen(req, timeout=60, opener=_upload_opener()) as resp:
+            return resp.status, resp.headers.get("Range"), resp.read().decode("utf-8")
+    except HTTPError as exc:
+        err_body = exc.read().decode("utf-8", errors="replace")
+        if exc.code == 308:
+            return 308, exc.headers.get("Range"), err_body
+        raise HTTPError(session_url, exc.code, err_body, exc.headers, None) from None
+
+
+def drive_upload_resumable(
+    *,
+    access_token: str,
+    file_path: str,
+    metadata: dict[str, Any],
+    media_type: str,
+    file_id: str | None = None,
+    chunk_size: int = RESUMABLE_CHUNK_SIZE,
+    progress: Callable[[int, int | None, float], None] | None = None,
+) -> dict[str, Any]:
+    size = os.path.getsize(file_path)
+    session_url = drive_upload_resumable_start(
+        access_token=access_token,
+        metadata=metadata,
+        media_type=media_type,
+        size=size,
+        file_id=file_id,
+    )
+    started = time.monotonic()
+    offset = 0
+    failures = 0
+    with open(file_path, "rb") as f:
+        while True:
+            try:
+                if failures:
+                    # After an interruption ask the server how much it actually kept.
+                    status, range_header, body = _resumable_put(session_url, access_token, b"", f"bytes */{size}")
+                else:
+                    f.seek(offset)
+                    chunk = f.read(chunk_size)
+                    end = offset + len(chunk) - 1
+                    content_range = f"bytes {offset}-{end}/{size}" if chunk else f"bytes */{size}"
+                    status, range_header, body = _resumable_put(session_url, access_token, chunk, content_range)
+            except HTTPError as exc:
+                if exc.code in (404, 410):
+                    raise SystemExit(f"Upload session expired (HTTP {exc.code}); re-run import-md to start over.") from None
+                if exc.code < 500 and exc.code != 429:
+                    raise SystemExit(f"HTTP {exc.code} during resumable upload: {exc.msg}") from None
+                last_error = f"HTTP {exc.code}"
+            except OSError as exc:
+                # URLError, timeouts and dropped connections: the chunk may or may not have landed.
+                last_error = str(exc)
+            else:
+                if status in (200, 201):
+                    if progress is not None:
+                        progress(size, size, time.monotonic() - started)
+                    return json.loads(body) if body.strip() else {}
+                offset = _resumable_offset(range_header)
+                failures = 0
+                if progress is not None:
+                    progress(offset, size, time.monotonic() - started)
+                continue
+            failures += 1
+            if failures > RESUMABLE_MAX_RETRIES:
+                raise SystemExit(f"Resumable upload failed after {RESUMABLE_MAX_RETRIES} retries: {last_error}")
+            time.sleep(min(2**failures, 30))
+
+
+def drive_upload_file(
+    *,
+    access_token: str,
+    file_path: str,
+    metadata: dict[str, Any],
+    media_type: str,
+    file_id: str | None = None,
+    resumable_threshold: int = RESUMABLE_UPLOAD_THRESHOLD,
+) -> dict[str, Any]:
+    # Small files go in a single multipart request; large ones through a resumable session.
+    if os.path.getsize(file_path) > resumable_threshold:
+        progress = DownloadProgress(f"Uploading {os.path.basename(file_path)}")
+        try:
+            return drive_upload_resumable(
+                access_token=access_token,
+                file_path=file_path,
+                metadata=metadata,
+                media_type=media_type,
+                file_id=file_id,
+                progress=progress,
+            )
+        finally:
+            progress.finish()
+
+    with open(file_path, "rb") as f:
+        media_bytes = f.read()
+    if file_id:
+        url = f"{DRIVE_UPLOAD_BASE}/files/{file_id}?uploadType=multipart"
+        method = "PATCH"
+    else:
+        url = f"{DRIVE_UPLOAD_BASE}/files?uploadType=multipart"
+        method = "POST"
+    return drive_upload_multipart(
+        access_token=access_token,
+        url=url,
+        metadata=metadata,
+        media_bytes=media_bytes,
+        media_type=media_type,
+        method=method,
+    )
+
+
+def _renderer_version(renderer: str) -> str:
+    import subprocess
+
+    if renderer == "builtin":
+        import md_docx
+
+        return f"builtin-{md_docx.RENDERER_VERSION}"
+    try:
+        out = subprocess.run(["pandoc", "--version"], check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "pandoc-unknown"
+    return out.splitlines()[0] if out else "pandoc-unknown"
+
+
+def render_cache_key(
+    markdown: str,
     reference_docx: str | None,
     *,
+    renderer: str,
     normalize_lists: bool,
-) -> None:
-    if not shutil.which("pandoc"):
-        raise SystemExit("pandoc not found; install it or make sure it's on PATH.")
-    md_format = "markdown+pipe_tables+fenced_divs+markdown_attribute"
-    raw = read_text(md_path)
-    if normalize_lists:
-        raw = normalize_markdown_lists(raw)
+) -> str:
+    import hashlib
+
+    h = hashlib.sha256()
+    for part in (_renderer_version(renderer), f"normalize_lists={normalize_lists}", markdown.replace("\r\n", "\n")):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    if reference_docx:
+        with open(reference_docx, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _copy_atomic(src: str, dest: str) -> None:
+    import shutil
 
+    tmp = f"{dest}.tmp"
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+    finally:
+        _remove_quietly(tmp)
+
+
+def render_cache_get(cache_dir: str, key: str, out_path: str) -> bool:
+    cached = os.path.join(cache_dir, f"{key}.docx")
+    if not os.path.isfile(cached):
+        return False
+    _copy_atomic(cached, out_path)
+    # mtime doubles as the LRU clock for eviction.
+    os.utime(cached)
+    return True
+
+
+def render_cache_put(cache_dir: str, key: str, docx_path: str, *, max_entries: int = RENDER_CACHE_MAX_ENTRIES) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    _copy_atomic(docx_path, os.path.join(cache_dir, f"{key}.docx"))
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".docx"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        _remove_quietly(path)
+
+
+def _render_docx(raw: str, out_path: str, reference_docx: str | None, *, renderer: str) -> None:
+    import subprocess
+    import tempfile
+
+    if renderer == "builtin":
+        import md_docx
+
+        docx_bytes = md_docx.render_markdown_docx(raw, reference_docx=reference_docx)
+        tmp_out = f"{out_path}.tmp"
+        try:
+            write_bytes(tmp_out, docx_bytes)
+            os.replace(tmp_out, out_path)
+        finally:
+            _remove_quietly(tmp_out)
+        return
+
+    md_format = "markdown+pipe_tables+fenced_divs+markdown_attribute"
     tmp_path = None
     try:
         with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, suffix=".md") as tmp:
@@ -547,6 +1376,39 @@ def render_markdown_to_docx(
                 pass
 
 
+def render_markdown_to_docx(
+    md_path: str,
+    out_path: str,
+    reference_docx: str | None,
+    *,
+    normalize_lists: bool,
+    renderer: str = "builtin",
+    cache_dir: str | None = RENDER_CACHE_DIR,
+) -> bool:
+    # Returns True when the DOCX came from the render cache.
+    import shutil
+
+    if renderer == "pandoc" and not shutil.which("pandoc"):
+        raise SystemExit("pandoc not found; install it, make sure it's on PATH, or use --renderer builtin.")
+    raw = read_text(md_path)
+    if normalize_lists:
+        raw = normalize_markdown_lists(raw)
+
+    key = None
+    if cache_dir:
+        key = render_cache_key(raw, reference_docx, renderer=renderer, normalize_lists=normalize_lists)
+        if render_cache_get(cache_dir, key, out_path):
+            return True
+
+    _render_docx(raw, out_path, reference_docx, renderer=renderer)
+    if cache_dir and key:
+        try:
+            render_cache_put(cache_dir, key, out_path)
+        except OSError as exc:
+            eprint(f"Warning: could not update render cache: {exc}")
+    return False
+
+
 def drive_resolve_target(*, file_id: str, access_token: str) -> tuple[str, dict[str, Any]]:
     meta = drive_get_metadata(file_id=file_id, access_token=access_token)
     if meta.get("mimeType") == "application/vnd.google-apps.shortcut":
@@ -559,177 +1421,233 @@ def drive_resolve_target(*, file_id: str, access_token: str) -> tuple[str, dict[
     return file_id, meta
 
 
-def extract_text_from_docx(data: bytes) -> str:
-    zf = zipfile.ZipFile(io.BytesIO(data))
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = f"{_W_NS}p"
+_W_BODY = f"{_W_NS}body"
+_W_R = f"{_W_NS}r"
+_W_T = f"{_W_NS}t"
+_W_TAB = f"{_W_NS}tab"
+_W_BR = f"{_W_NS}br"
+_W_HYPERLINK = f"{_W_NS}hyperlink"
+_W_VAL = f"{_W_NS}val"
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+
+def _docx_external_rels(zf: zipfile.ZipFile) -> dict[str, str]:
+    import xml.etree.ElementTree as ET
+
+    rels: dict[str, str] = {}
+    try:
+        rels_xml = zf.read("word/_rels/document.xml.rels")
+    except KeyError:
+        return rels
+    rel_root = ET.fromstring(rels_xml)
+    for rel in rel_root.findall(".//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"):
+        rid = rel.attrib.get("Id") or ""
+        target = rel.attrib.get("Target") or ""
+        mode = rel.attrib.get("TargetMode") or ""
+        if rid and target and mode.lower() == "external":
+            rels[rid] = target
+    return rels
+
+
+def iter_docx_paragraphs(zf: zipfile.ZipFile) -> Iterable[tuple[ET.Element, bool]]:
+    # Streams word/document.xml with iterparse and yields (paragraph, is_body_level) for
+    # every outermost <w:p>, including table cells. Yielded elements are only valid until
+    # the next iteration: finished subtrees are dropped so memory stays flat.
+    import xml.etree.ElementTree as ET
+
     try:
-        xml_bytes = zf.read("word/document.xml")
+        stream = zf.open("word/document.xml")
     except KeyError:
         raise SystemExit("DOCX missing word/document.xml") from None
 
-    root = ET.fromstring(xml_bytes)
-    ns = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
-
-    lines: list[str] = []
-    for p in root.findall(".//w:p", ns):
-        parts: list[str] = []
-        for node in p.iter():
-            tag = node.tag
-            if tag.endswith("}t") and node.text:
-                parts.append(node.text)
-            elif tag.endswith("}tab"):
-                parts.append("\t")
-            elif tag.endswith("}br"):
-                parts.append("\n")
-        line = "".join(parts).strip("\r")
-        lines.append(line)
-    text = "\n".join([ln for ln in lines if ln != ""])
-    return text
-
-
-def extract_markdown_from_docx(data: bytes) -> str:
-    def escape_md(s: str) -> str:
-        return (
-            s.replace("\\", "\\\\")
-            .replace("*", "\\*")
-            .replace("_", "\\_")
-            .replace("[", "\\[")
-            .replace("]", "\\]")
-            .replace("(", "\\(")
-            .replace(")", "\\)")
-            .replace("`", "\\`")
-        )
+    with stream:
+        stack: list[ET.Element] = []
+        p_depth = 0
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == _W_P:
+                    p_depth += 1
+                continue
 
-    def apply_styles(text: str, *, bold: bool, italic: bool, strike: bool, underline: bool) -> str:
-        out = text
-        if strike:
-            out = f"~~{out}~~"
-        if bold and italic:
-            out = f"***{out}***"
-        elif bold:
-            out = f"**{out}**"
-        elif italic:
-            out = f"*{out}*"
-        if underline:
-            out = f"<u>{out}</u>"
-        return out
+            stack.pop()
+            parent = stack[-1] if stack else None
+            at_body = parent is not None and parent.tag == _W_BODY
+            if elem.tag == _W_P:
+                p_depth -= 1
+                if p_depth == 0:
+                    yield elem, at_body
+                    if not at_body and parent is not None:
+                        parent.remove(elem)
+            if at_body:
+                del parent[:]
 
-    zf = zipfile.ZipFile(io.BytesIO(data))
-    try:
-        doc_xml = zf.read("word/document.xml")
-    except KeyError:
-        raise SystemExit("DOCX missing word/document.xml") from None
 
-    rels: dict[str, str] = {}
-    try:
-        rels_xml = zf.read("word/_rels/document.xml.rels")
-        rel_root = ET.fromstring(rels_xml)
-        for rel in rel_root.findall(".//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"):
-            rid = rel.attrib.get("Id") or ""
-            target = rel.attrib.get("Target") or ""
-            mode = rel.attrib.get("TargetMode") or ""
-            if rid and target and mode.lower() == "external":
-                rels[rid] = target
-    except KeyError:
-        pass
+@dataclass(frozen=True)
+class DocxRun:
+    text: str
+    bold: bool = False
+    italic: bool = False
+    strike: bool = False
+    underline: bool = False
+    font_family: str | None = None
+    font_size_pt: float | None = None
+    foreground_color: str | None = None
+    link: str | None = None
 
-    ns = {
-        "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
-        "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
-    }
-    root = ET.fromstring(doc_xml)
 
-    out_lines: list[str] = []
-    for p in root.findall(".//w:body/w:p", ns):
-        p_style = ""
-        ppr = p.find("w:pPr", ns)
-        if ppr is not None:
-            ps = ppr.find("w:pStyle", ns)
-            if ps is not None:
-                p_style = ps.attrib.get(f"{{{ns['w']}}}val", "") or ""
+@dataclass(frozen=True)
+class DocxParagraph:
+    style: str
+    list_level: int | None
+    runs: tuple[DocxRun, ...]
+    # Lines for the plain-text view: this paragraph plus any nested (text box) paragraphs.
+    plain_lines: tuple[str, ...]
+    # Only body-level paragraphs feed the markdown/struct views; table cells are plain-text only.
+    body_level: bool
+
+
+def _docx_plain_line(p: ET.Element) -> str:
+    parts: list[str] = []
+    for node in p.iter():
+        tag = node.tag
+        if tag.endswith("}t") and node.text:
+            parts.append(node.text)
+        elif tag.endswith("}tab"):
+            parts.append("\t")
+        elif tag.endswith("}br"):
+            parts.append("\n")
+    return "".join(parts).strip("\r")
+
+
+def _docx_flag(rpr: ET.Element, name: str, off: str) -> bool:
+    node = rpr.find(f"{_W_NS}{name}")
+    return node is not None and node.attrib.get(_W_VAL, "") != off
+
+
+def _decode_docx_run(r: ET.Element, link: str | None) -> DocxRun | None:
+    parts: list[str] = []
+    for node in r:
+        if node.tag == _W_T and node.text:
+            parts.append(node.text)
+        elif node.tag == _W_TAB:
+            parts.append("\t")
+        elif node.tag == _W_BR:
+            parts.append("\n")
+    text = "".join(parts)
+    if not text:
+        return None
 
-        heading_prefix = ""
-        style_norm = p_style.lower()
-        if style_norm in ("title",):
-            heading_prefix = "# "
-        elif style_norm in ("subtitle",):
-            heading_prefix = "## "
-        elif style_norm.startswith("heading"):
-            # Heading1/Heading2/etc
-            level_str = "".join(ch for ch in p_style if ch.isdigit())
-            level = int(level_str) if level_str else 1
-            level = max(1, min(6, level))
-            heading_prefix = "#" * level + " "
+    rpr = r.find(f"{_W_NS}rPr")
+    if rpr is None:
+        return DocxRun(text=text, link=link)
 
-        list_prefix = ""
-        indent = ""
-        if ppr is not None:
-            num_pr = ppr.find("w:numPr", ns)
-            if num_pr is not None:
-                ilvl = num_pr.find("w:ilvl", ns)
-                level = 0
-                if ilvl is not None:
-                    level = int(ilvl.attrib.get(f"{{{ns['w']}}}val", "0") or 0)
-                indent = "  " * max(0, level)
-                list_prefix = "- "
+    font_family: str | None = None
+    rfonts = rpr.find(f"{_W_NS}rFonts")
+    if rfonts is not None:
+        font_family = rfonts.attrib.get(f"{_W_NS}ascii") or rfonts.attrib.get(f"{_W_NS}hAnsi") or None
 
-        parts: list[str] = []
+    font_size_pt: float | None = None
+    sz = rpr.find(f"{_W_NS}sz")
+    if sz is not None:
+        raw = sz.attrib.get(_W_VAL)
+        try:
+            # DOCX stores half-points
+            font_size_pt = int(raw) / 2.0 if raw is not None else None
+        except Exception:
+            font_size_pt = None
+
+    foreground_color: str | None = None
+    col = rpr.find(f"{_W_NS}color")
+    if col is not None:
+        val = (col.attrib.get(_W_VAL) or "").strip()
+        if val and val.lower() != "auto" and len(val) in (6, 8):
+            # Usually RRGGBB; sometimes AARRGGBB. Keep last 6.
+            foreground_color = "#" + val[-6:].upper()
+
+    return DocxRun(
+        text=text,
+        bold=_docx_flag(rpr, "b", "0"),
+        italic=_docx_flag(rpr, "i", "0"),
+        strike=_docx_flag(rpr, "strike", "0"),
+        underline=_docx_flag(rpr, "u", "none"),
+        font_family=font_family,
+        font_size_pt=font_size_pt,
+        foreground_color=foreground_color,
+        link=link,
+    )
 
-        def handle_run(r: ET.Element, link_url: str | None) -> None:
-            rpr = r.find("w:rPr", ns)
-            bold = italic = strike = underline = False
-            if rpr is not None:
-                b = rpr.find("w:b", ns)
-                if b is not None and (b.attrib.get(f"{{{ns['w']}}}val", "1") != "0"):
-                    bold = True
-                i = rpr.find("w:i", ns)
-                if i is not None and (i.attrib.get(f"{{{ns['w']}}}val", "1") != "0"):
-                    italic = True
-                s = rpr.find("w:strike", ns)
-                if s is not None and (s.attrib.get(f"{{{ns['w']}}}val", "1") != "0"):
-                    strike = True
-                u = rpr.find("w:u", ns)
-                if u is not None and (u.attrib.get(f"{{{ns['w']}}}val", "single") != "none"):
-                    underline = True
-
-            text_chunks: list[str] = []
-            for node in r:
-                if node.tag == f"{{{ns['w']}}}t" and node.text:
-                    text_chunks.append(node.text)
-                elif node.tag == f"{{{ns['w']}}}tab":
-                    text_chunks.append("\t")
-                elif node.tag == f"{{{ns['w']}}}br":
-                    text_chunks.append("\n")
-            raw_text = "".join(text_chunks)
-            if not raw_text:
-                return
 
-            text = escape_md(raw_text)
-            styled = apply_styles(text, bold=bold, italic=italic, strike=strike, underline=underline)
-            if link_url:
-                parts.append(f"[{styled}]({link_url})")
-            else:
-                parts.append(styled)
+def _decode_docx_paragraph(p: ET.Element, *, body_level: bool, rels: dict[str, str]) -> DocxParagraph:
+    plain_lines = tuple(_docx_plain_line(q) for q in p.iter(_W_P))
+    if not body_level:
+        return DocxParagraph(style="", list_level=None, runs=(), plain_lines=plain_lines, body_level=False)
+
+    p_style = ""
+    list_level: int | None = None
+    ppr = p.find(f"{_W_NS}pPr")
+    if ppr is not None:
+        ps = ppr.find(f"{_W_NS}pStyle")
+        if ps is not None:
+            p_style = ps.attrib.get(_W_VAL, "") or ""
+        num_pr = ppr.find(f"{_W_NS}numPr")
+        if num_pr is not None:
+            ilvl = num_pr.find(f"{_W_NS}ilvl")
+            list_level = int(ilvl.attrib.get(_W_VAL, "0") or 0) if ilvl is not None else 0
+
+    runs: list[DocxRun] = []
+    for child in p:
+        if child.tag == _W_R:
+            run = _decode_docx_run(child, None)
+            if run:
+                runs.append(run)
+        elif child.tag == _W_HYPERLINK:
+            rid = child.attrib.get(_R_ID, "")
+            link_url = rels.get(rid) if rid else None
+            for r in child.findall(_W_R):
+                run = _decode_docx_run(r, link_url)
+                if run:
+                    runs.append(run)
+
+    return DocxParagraph(style=p_style, list_level=list_level, runs=tuple(runs), plain_lines=plain_lines, body_level=True)
+
+
+def _docx_heading_level(p_style: str) -> int | None:
+    style_norm = (p_style or "").lower()
+    if style_norm == "title":
+        return 1
+    if style_norm == "subtitle":
+        return 2
+    if style_norm.startswith("heading"):
+        # Heading1/Heading2/etc
+        level_str = "".join(ch for ch in p_style if ch.isdigit())
+        level = int(level_str) if level_str else 1
+        return max(1, min(6, level))
+    return None
+
+
+def _md_wrap_styles(text: str, *, bold: bool, italic: bool, strike: bool, underline: bool) -> str:
+    out = text
+    if strike:
+        out = f"~~{out}~~"
+    if bold and italic:
+        out = f"***{out}***"
+    elif bold:
+        out = f"**{out}**"
+    elif italic:
+        out = f"*{out}*"
+    if underline:
+        out = f"<u>{out}</u>"
+    return out
 
-        for child in p:
-            if child.tag == f"{{{ns['w']}}}r":
-                handle_run(child, None)
-            elif child.tag == f"{{{ns['w']}}}hyperlink":
-                rid = child.attrib.get(f"{{{ns['r']}}}id", "")
-                link_url = rels.get(rid) if rid else None
-                for r in child.findall("w:r", ns):
-                    handle_run(r, link_url)
-
-        line = "".join(parts).strip("\r")
-        line = line.strip()
-        if not line:
-            out_lines.append("")
-            continue
-        out_lines.append(f"{indent}{heading_prefix}{list_prefix}{line}".rstrip())
 
+def _collapse_blank_lines(lines: list[str]) -> str:
     # Collapse excessive blank lines a bit
     normalized: list[str] = []
     blank_run = 0
-    for line in out_lines:
+    for line in lines:
         if line == "":
             blank_run += 1
             if blank_run <= 1:
@@ -740,6 +1658,103 @@ def extract_markdown_from_docx(data: bytes) -> str:
     return "\n".join(normalized).strip() + "\n"
 
 
+class DocxDocument:
+    # One decoded DOCX. document.xml and the relationships part are parsed once;
+    # the plain, markdown and struct views are rendered on first access and cached.
+
+    def __init__(self, paragraphs: list[DocxParagraph]):
+        self.paragraphs = paragraphs
+        self._structs: dict[tuple[str | None, str | None], dict[str, Any]] = {}
+
+    @classmethod
+    def decode(cls, source: bytes | str) -> "DocxDocument":
+        # `source` is the DOCX bytes or a path; a path is read by zipfile straight from disk.
+        import io
+        import zipfile
+
+        with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as zf:
+            rels = _docx_external_rels(zf)
+            return cls([_decode_docx_paragraph(p, body_level=at_body, rels=rels) for p, at_body in iter_docx_paragraphs(zf)])
+
+    @functools.cached_property
+    def text(self) -> str:
+        lines = [line for p in self.paragraphs for line in p.plain_lines]
+        return "\n".join([ln for ln in lines if ln != ""])
+
+    @functools.cached_property
+    def markdown(self) -> str:
+        out_lines: list[str] = []
+        for p in self.paragraphs:
+            if not p.body_level:
+                continue
+            level = _docx_heading_level(p.style)
+            heading_prefix = "#" * level + " " if level else ""
+            indent = "  " * max(0, p.list_level) if p.list_level is not None else ""
+            list_prefix = "- " if p.list_level is not None else ""
+
+            parts: list[str] = []
+            for run in p.runs:
+                styled = _md_wrap_styles(
+                    _escape_md_text(run.text),
+                    bold=run.bold,
+                    italic=run.italic,
+                    strike=run.strike,
+                    underline=run.underline,
+                )
+                parts.append(f"[{styled}]({run.link})" if run.link else styled)
+
+            line = "".join(parts).strip("\r").strip()
+            if not line:
+                out_lines.append("")
+                continue
+            out_lines.append(f"{indent}{heading_prefix}{list_prefix}{line}".rstrip())
+        return _collapse_blank_lines(out_lines)
+
+    def to_struct(self, *, file_id: str | None = None, title: str | None = None) -> dict[str, Any]:
+        key = (file_id, title)
+        if key not in self._structs:
+            blocks: list[dict[str, Any]] = []
+            for p in self.paragraphs:
+                if not p.body_level:
+                    continue
+                blocks.append(
+                    {
+                        "type": "paragraph",
+                        "namedStyleType": p.style or None,
+                        "headingLevel": _docx_heading_level(p.style),
+                        "list": {"nestingLevel": p.list_level, "ordered": None} if p.list_level is not None else None,
+                        "runs": [
+                            {
+                                "text": run.text,
+                                "style": {
+                                    "bold": run.bold,
+                                    "italic": run.italic,
+                                    "underline": run.underline,
+                                    "strikethrough": run.strike,
+                                    "fontFamily": run.font_family,
+                                    "fontSize": {"magnitude": run.font_size_pt, "unit": "PT"} if run.font_size_pt is not None else None,
+                                    "foregroundColor": run.foreground_color,
+                                    "backgroundColor": None,
+                                },
+                                "link": run.link,
+                            }
+                            for run in p.runs
+                        ],
+                    }
+                )
+            self._structs[key] = enrich_struct({"documentId": file_id, "title": title, "blocks": blocks})
+        # Shallow copy so callers can attach top-level keys (e.g. "source") without touching the cache.
+        return dict(self._structs[key])
+
+
+def extract_text_from_docx(data: bytes | str) -> str:
+    return DocxDocument.decode(data).text
+
+
+def extract_markdown_from_docx(data: bytes | str) -> str:
+    return DocxDocument.decode(data).markdown
+
+
 def _escape_md_text(s: str) -> str:
     return (
         s.replace("\\", "\\\\")
@@ -840,17 +1855,7 @@ def docs_to_markdown(doc_json: dict[str, Any]) -> str:
             continue
         out_lines.append(f"{indent}{heading_prefix}{list_prefix}{line}".rstrip())
 
-    normalized: list[str] = []
-    blank_run = 0
-    for line in out_lines:
-        if line == "":
-            blank_run += 1
-            if blank_run <= 1:
-                normalized.append("")
-            continue
-        blank_run = 0
-        normalized.append(line)
-    return "\n".join(normalized).strip() + "\n"
+    return _collapse_blank_lines(out_lines)
 
 
 def docs_to_struct(doc_json: dict[str, Any]) -> dict[str, Any]:
@@ -1079,184 +2084,107 @@ def enrich_struct(doc: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
-def docx_to_struct(data: bytes, *, file_id: str | None = None, title: str | None = None) -> dict[str, Any]:
-    zf = zipfile.ZipFile(io.BytesIO(data))
-    try:
-        doc_xml = zf.read("word/document.xml")
-    except KeyError:
-        raise SystemExit("DOCX missing word/document.xml") from None
-
-    rels: dict[str, str] = {}
-    try:
-        rels_xml = zf.read("word/_rels/document.xml.rels")
-        rel_root = ET.fromstring(rels_xml)
-        for rel in rel_root.findall(".//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"):
-            rid = rel.attrib.get("Id") or ""
-            target = rel.attrib.get("Target") or ""
-            mode = rel.attrib.get("TargetMode") or ""
-            if rid and target and mode.lower() == "external":
-                rels[rid] = target
-    except KeyError:
-        pass
+def docx_to_struct(data: bytes | str, *, file_id: str | None = None, title: str | None = None) -> dict[str, Any]:
+    return DocxDocument.decode(data).to_struct(file_id=file_id, title=title)
 
-    ns = {
-        "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
-        "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
-    }
-    root = ET.fromstring(doc_xml)
 
-    def style_to_level(p_style: str) -> int | None:
-        style_norm = (p_style or "").lower()
-        if style_norm == "title":
-            return 1
-        if style_norm == "subtitle":
-            return 2
-        if style_norm.startswith("heading"):
-            level_str = "".join(ch for ch in p_style if ch.isdigit())
-            level = int(level_str) if level_str else 1
-            return max(1, min(6, level))
-        return None
+def drive_get_text_smart(
+    *,
+    file_id: str,
+    access_token: str,
+    output_format: str,
+    resolved: tuple[str, dict[str, Any]] | None = None,
+) -> tuple[str, str]:
+    if resolved is None:
+        resolved = drive_resolve_target(file_id=file_id, access_token=access_token)
+    resolved_id, meta = resolved
+    name = meta.get("name") or resolved_id
+    mime = meta.get("mimeType") or ""
 
-    blocks: list[dict[str, Any]] = []
-    for p in root.findall(".//w:body/w:p", ns):
-        p_style = ""
-        ppr = p.find("w:pPr", ns)
-        if ppr is not None:
-            ps = ppr.find("w:pStyle", ns)
-            if ps is not None:
-                p_style = ps.attrib.get(f"{{{ns['w']}}}val", "") or ""
-
-        heading_level = style_to_level(p_style)
-
-        list_info: dict[str, Any] | None = None
-        if ppr is not None:
-            num_pr = ppr.find("w:numPr", ns)
-            if num_pr is not None:
-                ilvl = num_pr.find("w:ilvl", ns)
-                nesting = 0
-                if ilvl is not None:
-                    nesting = int(ilvl.attrib.get(f"{{{ns['w']}}}val", "0") or 0)
-                list_info = {"nestingLevel": nesting, "ordered": None}
-
-        runs: list[dict[str, Any]] = []
-
-        def run_style(r: ET.Element) -> dict[str, Any]:
-            rpr = r.find("w:rPr", ns)
-            bold = italic = strike = underline = False
-            font_family: str | None = None
-            font_size_pt: float | None = None
-            foreground_color: str | None = None
-            if rpr is not None:
-                rfonts = rpr.find("w:rFonts", ns)
-                if rfonts is not None:
-                    ascii_font = rfonts.attrib.get(f"{{{ns['w']}}}ascii")
-                    hansi_font = rfonts.attrib.get(f"{{{ns['w']}}}hAnsi")
-                    font_family = (ascii_font or hansi_font or None)
-
-                sz = rpr.find("w:sz", ns)
-                if sz is not None:
-                    raw = sz.attrib.get(f"{{{ns['w']}}}val")
-                    try:
-                        # DOCX stores half-points
-                        font_size_pt = int(raw) / 2.0 if raw is not None else None
-                    except Exception:
-                        font_size_pt = None
-
-                col = rpr.find("w:color", ns)
-                if col is not None:
-                    val = (col.attrib.get(f"{{{ns['w']}}}val") or "").strip()
-                    if val and val.lower() != "auto" and len(val) in (6, 8):
-                        # Usually RRGGBB; sometimes AARRGGBB. Keep last 6.
-                        foreground_color = "#" + val[-6:].upper()
-
-                b = rpr.find("w:b", ns)
-                if b is not None and (b.attrib.get(f"{{{ns['w']}}}val", "1") != "0"):
-                    bold = True
-                i = rpr.find("w:i", ns)
-                if i is not None and (i.attrib.get(f"{{{ns['w']}}}val", "1") != "0"):
-                    italic = True
-                s = rpr.find("w:strike", ns)
-                if s is not None and (s.attrib.get(f"{{{ns['w']}}}val", "1") != "0"):
-                    strike = True
-                u = rpr.find("w:u", ns)
-                if u is not None and (u.attrib.get(f"{{{ns['w']}}}val", "single") != "none"):
-                    underline = True
-            return {
-                "bold": bold,
-                "italic": italic,
-                "underline": underline,
-                "strikethrough": strike,
-                "fontFamily": font_family,
-                "fontSize": {"magnitude": font_size_pt, "unit": "PT"} if font_size_pt is not None else None,
-                "foregroundColor": foreground_color,
-                "backgroundColor": None,
-            }
+    if mime == "application/vnd.google-apps.document" and output_format == "plain":
+        return name, drive_export_plain_text(file_id=resolved_id, access_token=access_token)
 
-        def run_text(r: ET.Element) -> str:
-            parts: list[str] = []
-            for node in r:
-                if node.tag == f"{{{ns['w']}}}t" and node.text:
-                    parts.append(node.text)
-                elif node.tag == f"{{{ns['w']}}}tab":
-                    parts.append("\t")
-                elif node.tag == f"{{{ns['w']}}}br":
-                    parts.append("\n")
-            return "".join(parts)
-
-        for child in p:
-            if child.tag == f"{{{ns['w']}}}r":
-                txt = run_text(child)
-                if txt:
-                    runs.append({"text": txt, "style": run_style(child), "link": None})
-            elif child.tag == f"{{{ns['w']}}}hyperlink":
-                rid = child.attrib.get(f"{{{ns['r']}}}id", "")
-                link_url = rels.get(rid) if rid else None
-                for r in child.findall("w:r", ns):
-                    txt = run_text(r)
-                    if txt:
-                        runs.append({"text": txt, "style": run_style(r), "link": link_url})
-
-        blocks.append(
-            {
-                "type": "paragraph",
-                "namedStyleType": p_style or None,
-                "headingLevel": heading_level,
-                "list": list_info,
-                "runs": runs,
-            }
-        )
+    if (
+        mime == "application/vnd.google-apps.document"
+        and output_format == "md"
+        and markdown_export_supported(resolved_id) is not False
+    ):
+        # Drive's own markdown export: smaller transfer, no local DOCX parsing.
+        try:
+            text = drive_export_markdown(file_id=resolved_id, access_token=access_token)
+        except HTTPError as exc:
+            if exc.code == 401:
+                raise
+            # Anything else falls back to the DOCX path for this call.
+            if is_markdown_export_unsupported(exc):
+                record_markdown_export_support(resolved_id, False)
+        else:
+            record_markdown_export_support(resolved_id, True)
+            return name, text
 
-    return enrich_struct({"documentId": file_id, "title": title, "blocks": blocks})
+    name, docx = drive_get_docx_document(file_id=file_id, access_token=access_token, resolved=resolved)
+    if output_format == "plain":
+        return name, docx.text
+    return name, docx.markdown
 
 
-def drive_get_text_smart(*, file_id: str, access_token: str, output_format: str) -> tuple[str, str]:
-    resolved_id, meta = drive_resolve_target(file_id=file_id, access_token=access_token)
+def drive_get_docx_document(
+    *,
+    file_id: str,
+    access_token: str,
+    resolved: tuple[str, dict[str, Any]] | None = None,
+) -> tuple[str, DocxDocument]:
+    # Fetch a Google Doc (DOCX export) or a DOCX file (download) once and decode it for every view.
+    import tempfile
+
+    if resolved is None:
+        resolved = drive_resolve_target(file_id=file_id, access_token=access_token)
+    resolved_id, meta = resolved
     name = meta.get("name") or resolved_id
     mime = meta.get("mimeType") or ""
 
-    if mime == "application/vnd.google-apps.document":
-        if output_format == "plain":
-            return name, drive_export_plain_text(file_id=resolved_id, access_token=access_token)
-        docx = drive_export_bytes(
-            file_id=resolved_id,
-            access_token=access_token,
-            mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-        return name, extract_markdown_from_docx(docx)
+    if mime not in (
+        "application/vnd.google-apps.document",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ):
+        raise SystemExit(f"Unsupported Drive mimeType for printing: {mime} (file: {resolved_id})")
 
-    if mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        raw = drive_download_bytes(file_id=resolved_id, access_token=access_token)
-        if output_format == "plain":
-            return name, extract_text_from_docx(raw)
-        return name, extract_markdown_from_docx(raw)
-
-    raise SystemExit(f"Unsupported Drive mimeType for printing: {mime} (file: {resolved_id})")
+    # Stream to a temp file and let zipfile read it from disk; the decoded model outlives the file.
+    fd, tmp_path = tempfile.mkstemp(prefix="gdocs_", suffix=".docx")
+    os.close(fd)
+    try:
+        if mime == "application/vnd.google-apps.document":
+            drive_export_to_file(
+                file_id=resolved_id,
+                access_token=access_token,
+                mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                dest_path=tmp_path,
+            )
+        else:
+            drive_download_to_file(file_id=resolved_id, access_token=access_token, dest_path=tmp_path)
+        return name, DocxDocument.decode(tmp_path)
+    finally:
+        _remove_quietly(tmp_path)
 
 
 def cmd_list(args: argparse.Namespace) -> int:
     links = parse_doc_links(read_text(args.links_file))
+    if not args.meta:
+        for link in links:
+            print(f"{link.name}\t{link.document_id}\t{link.url}")
+        return 0
+
+    client = load_oauth_client(args.client)
+    access_token = ensure_access_token(client=client, token_path=args.token)
+    try:
+        resolved = drive_batch_resolve_targets(file_ids=[l.document_id for l in links], access_token=access_token)
+    except HTTPError as exc:
+        raise SystemExit(f"Drive batch error HTTP {exc.code}: {exc.msg}") from None
     for link in links:
-        print(f"{link.name}\t{link.document_id}\t{link.url}")
+        _, meta = resolved.get(link.document_id) or (link.document_id, {})
+        err = meta.get("error")
+        status = f"error {err.get('code')}" if isinstance(err, dict) else (meta.get("mimeType") or "unknown")
+        print(f"{link.name}\t{link.document_id}\t{status}\t{link.url}")
     return 0
 
 
@@ -1277,10 +2205,43 @@ def cmd_print(args: argparse.Namespace) -> int:
             raise SystemExit(f"Unknown --doc {args.doc!r}. Use `list` to see available names.")
         links = [by_name[args.doc]]
 
+    # With --method drive every document needs its metadata first; fetch it in one batch.
+    prefetched: dict[str, tuple[str, dict[str, Any]]] = {}
+    if args.method == "drive" and len(links) > 1:
+        try:
+            prefetched = drive_batch_resolve_targets(file_ids=[l.document_id for l in links], access_token=access_token)
+        except HTTPError as exc:
+            eprint(f"Drive batch metadata failed (HTTP {exc.code}); falling back to per-document requests.")
+
+    def resolve(link: DocLink) -> tuple[str, dict[str, Any]]:
+        hit = prefetched.get(link.document_id)
+        if hit and "error" not in hit[1]:
+            return hit
+        return drive_resolve_target(file_id=link.document_id, access_token=access_token)
+
+    # Docs API documents are fetched concurrently up front; rendering below stays sequential and ordered.
+    docs_prefetched: dict[str, Any] = {}
+    if args.method in ("docs", "auto") and args.concurrency > 1 and len(links) > 1:
+        import gdocs_aio
+
+        docs_prefetched = gdocs_aio.fetch_docs(
+            [l.document_id for l in links],
+            access_token=access_token,
+            concurrency=args.concurrency,
+        )
+
+    def fetch_doc(link: DocLink) -> dict[str, Any]:
+        hit = docs_prefetched.get(link.document_id)
+        if isinstance(hit, HTTPError):
+            raise hit
+        if isinstance(hit, dict):
+            return hit
+        return get_doc(document_id=link.document_id, access_token=access_token)
+
     def render_one(link: DocLink) -> dict[str, Any] | None:
         if args.method in ("docs", "auto"):
             try:
-                doc = get_doc(document_id=link.document_id, access_token=access_token)
+                doc = fetch_doc(link)
                 if args.format == "plain":
                     title = doc.get("title") or link.name
                     print(f"===== {title} ({link.document_id}) =====")
@@ -1309,33 +2270,28 @@ def cmd_print(args: argparse.Namespace) -> int:
                     file_id=link.document_id,
                     access_token=access_token,
                     output_format=args.format,
+                    resolved=resolve(link),
                 )
                 print(f"===== {title} ({link.document_id}) =====")
                 print(text.rstrip())
                 print()
                 return None
 
-            resolved_id, meta = drive_resolve_target(file_id=link.document_id, access_token=access_token)
+            resolved_id, meta = resolve(link)
             mime = meta.get("mimeType") or ""
             name = meta.get("name") or link.name
 
             if mime == "application/vnd.google-apps.document":
-                docx = drive_export_bytes(
-                    file_id=resolved_id,
-                    access_token=access_token,
-                    mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                )
-                structured = docx_to_struct(docx, file_id=link.document_id, title=name)
-                structured["source"] = {"method": "drive_export_docx", "mimeType": mime, "resolvedFileId": resolved_id}
-                return structured
-
-            if mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                raw = drive_download_bytes(file_id=resolved_id, access_token=access_token)
-                structured = docx_to_struct(raw, file_id=link.document_id, title=name)
-                structured["source"] = {"method": "drive_download_docx", "mimeType": mime, "resolvedFileId": resolved_id}
-                return structured
+                method = "drive_export_docx"
+            elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+                method = "drive_download_docx"
+            else:
+                raise SystemExit(f"Unsupported Drive mimeType for JSON output: {mime} (file: {resolved_id})")
 
-            raise SystemExit(f"Unsupported Drive mimeType for JSON output: {mime} (file: {resolved_id})")
+            _, docx = drive_get_docx_document(file_id=link.document_id, access_token=access_token, resolved=(resolved_id, meta))
+            structured = docx.to_struct(file_id=link.document_id, title=name)
+            structured["source"] = {"method": method, "mimeType": mime, "resolvedFileId": resolved_id}
+            return structured
         except HTTPError as exc:
             raise SystemExit(f"Drive error HTTP {exc.code}: {exc.msg}") from None
 
@@ -1393,11 +2349,15 @@ def cmd_apply_template(args: argparse.Namespace) -> int:
     require_scopes(args.token, ["https://www.googleapis.com/auth/documents"])
     access_token = ensure_access_token(client=client, token_path=args.token)
 
-    links = parse_doc_links(read_text(args.links_file))
-    by_name = {d.name: d for d in links}
-    if args.doc not in by_name:
-        raise SystemExit(f"Unknown --doc {args.doc!r}. Use `list` to see available names.")
-    link = by_name[args.doc]
+    if args.document_id:
+        # Documents outside the links file (e.g. fresh template copies).
+        link = DocLink(name=args.document_id, document_id=args.document_id, url=doc_edit_url(args.document_id))
+    else:
+        links = parse_doc_links(read_text(args.links_file))
+        by_name = {d.name: d for d in links}
+        if args.doc not in by_name:
+            raise SystemExit(f"Unknown --doc {args.doc!r}. Use `list` to see available names.")
+        link = by_name[args.doc]
 
     data = read_json(args.data)
     if isinstance(data, dict) and isinstance(data.get("replacements"), dict):
@@ -1408,23 +2368,7 @@ def cmd_apply_template(args: argparse.Namespace) -> int:
     else:
         raise SystemExit("Template data must be a JSON object or {\"replacements\": {...}}")
 
-    requests: list[dict[str, Any]] = []
-    for k, v in replacements.items():
-        if not isinstance(k, str):
-            continue
-        if v is None:
-            v = ""
-        if not isinstance(v, str):
-            v = str(v)
-        requests.append(
-            {
-                "replaceAllText": {
-                    "containsText": {"text": k, "matchCase": bool(args.match_case)},
-                    "replaceText": v,
-                }
-            }
-        )
-
+    requests = replace_all_requests(replacements, match_case=args.match_case)
     if not requests:
         raise SystemExit("No replacements to apply.")
 
@@ -1433,13 +2377,18 @@ def cmd_apply_template(args: argparse.Namespace) -> int:
         return 0
 
     try:
-        resp = docs_batch_update(document_id=link.document_id, access_token=access_token, requests=requests)
+        _, responses = docs_batch_update_planned(
+            document_id=link.document_id,
+            access_token=access_token,
+            plan=lambda doc: [requests],
+        )
     except HTTPError as exc:
         msg = exc.msg
         if exc.code in (401, 403):
             msg += "\nLikely missing scope; re-run: python3 gdocs_cli.py auth --scopes https://www.googleapis.com/auth/documents"
         raise SystemExit(f"Docs batchUpdate failed HTTP {exc.code}: {msg}") from None
 
+    resp = responses[0]
     if args.json:
         print(json.dumps(resp, ensure_ascii=False, indent=2))
     else:
@@ -1448,6 +2397,34 @@ def cmd_apply_template(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_copy(args: argparse.Namespace) -> int:
+    client = load_oauth_client(args.client)
+    require_scopes(args.token, ["https://www.googleapis.com/auth/drive"])
+    access_token = ensure_access_token(client=client, token_path=args.token)
+
+    links = parse_doc_links(read_text(args.links_file))
+    by_name = {d.name: d for d in links}
+    if args.doc not in by_name:
+        raise SystemExit(f"Unknown --doc {args.doc!r}. Use `list` to see available names.")
+    link = by_name[args.doc]
+
+    try:
+        meta = drive_copy_file(
+            file_id=link.document_id,
+            access_token=access_token,
+            name=args.name,
+            parents=[args.folder] if args.folder else None,
+        )
+    except HTTPError as exc:
+        raise SystemExit(f"Drive files.copy failed HTTP {exc.code}: {exc.msg}") from None
+
+    if args.json:
+        print(json.dumps(meta, ensure_ascii=False, indent=2))
+    else:
+        print(f"OK. Copied {link.name} -> {meta.get('name')} id={meta.get('id')} url={doc_edit_url(meta.get('id') or '')}")
+    return 0
+
+
 def cmd_export_docx(args: argparse.Namespace) -> int:
     client = load_oauth_client(args.client)
     require_scopes(args.token, ["https://www.googleapis.com/auth/drive.readonly"])
@@ -1461,19 +2438,77 @@ def cmd_export_docx(args: argparse.Namespace) -> int:
 
     resolved_id, meta = drive_resolve_target(file_id=link.document_id, access_token=access_token)
     mime = meta.get("mimeType") or ""
-    if mime == "application/vnd.google-apps.document":
-        raw = drive_export_bytes(
-            file_id=resolved_id,
-            access_token=access_token,
-            mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-    elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        raw = drive_download_bytes(file_id=resolved_id, access_token=access_token)
-    else:
-        raise SystemExit(f"Unsupported mimeType for DOCX export: {mime}")
+    progress = DownloadProgress("export-docx")
+    try:
+        if mime == "application/vnd.google-apps.document":
+            size, elapsed = drive_export_to_file(
+                file_id=resolved_id,
+                access_token=access_token,
+                mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                dest_path=args.out,
+                progress=progress,
+            )
+        elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            size, elapsed = drive_download_to_file(
+                file_id=resolved_id,
+                access_token=access_token,
+                dest_path=args.out,
+                progress=progress,
+            )
+        else:
+            raise SystemExit(f"Unsupported mimeType for DOCX export: {mime}")
+    finally:
+        progress.finish()
+
+    rate = size / elapsed if elapsed > 0 else 0.0
+    print(f"OK. Wrote DOCX to {args.out} ({format_bytes(size)} in {elapsed:.1f}s, {format_bytes(rate)}/s)")
+    return 0
+
+
+def import_md_in_place(args: argparse.Namespace) -> int:
+    import md_gdocs
+
+    if not args.doc:
+        raise SystemExit("--in-place needs --doc (the document to update).")
+    raw = read_text(args.md)
+    if not args.preserve_list_spacing:
+        raw = normalize_markdown_lists(raw)
+
+    client = load_oauth_client(args.client)
+    require_scopes(args.token, ["https://www.googleapis.com/auth/documents"])
+    access_token = ensure_access_token(client=client, token_path=args.token)
+
+    links = parse_doc_links(read_text(args.links_file))
+    by_name = {d.name: d for d in links}
+    if args.doc not in by_name:
+        raise SystemExit(f"Unknown --doc {args.doc!r}. Use `list` to see available names.")
+    link = by_name[args.doc]
+
+    doc = get_doc(document_id=link.document_id, access_token=access_token)
+    requests = md_gdocs.plan_markdown_update(doc, raw, section=args.section)
+
+    if args.dry_run:
+        print(json.dumps({"document": link.name, "documentId": link.document_id, "requests": requests}, ensure_ascii=False, indent=2))
+        return 0
+    if not requests:
+        print(f"OK. Nothing to apply to {link.name}.")
+        return 0
+
+    def plan(current: dict[str, Any]) -> list[list[dict[str, Any]]]:
+        if current is not doc:
+            return [md_gdocs.plan_markdown_update(current, raw, section=args.section)]
+        return [requests]
+
+    try:
+        docs_batch_update_planned(document_id=link.document_id, access_token=access_token, plan=plan, doc=doc)
+    except HTTPError as exc:
+        msg = exc.msg
+        if exc.code in (401, 403):
+            msg += "\nLikely missing scope; re-run: python3 gdocs_cli.py auth --scopes https://www.googleapis.com/auth/documents"
+        raise SystemExit(f"Docs batchUpdate failed HTTP {exc.code}: {msg}") from None
 
-    write_bytes(args.out, raw)
-    print(f"OK. Wrote DOCX to {args.out}")
+    target = f"section {args.section!r} of {link.name}" if args.section else link.name
+    print(f"OK. Updated {target} in place ({len(requests)} requests, id={link.document_id}).")
     return 0
 
 
@@ -1481,20 +2516,27 @@ def cmd_import_md(args: argparse.Namespace) -> int:
     md_path = args.md
     if not os.path.exists(md_path):
         raise SystemExit(f"Markdown file not found: {md_path}")
+    if args.section and not args.in_place:
+        raise SystemExit("--section requires --in-place.")
+    if args.in_place:
+        return import_md_in_place(args)
     if args.reference_docx and not os.path.exists(args.reference_docx):
         raise SystemExit(f"Reference DOCX not found: {args.reference_docx}")
 
     docx_out = args.docx_out or os.path.join(".tmp", "rendered.docx")
     os.makedirs(os.path.dirname(os.path.abspath(docx_out)), exist_ok=True)
-    render_markdown_to_docx(
+    cached = render_markdown_to_docx(
         md_path,
         docx_out,
         args.reference_docx,
         normalize_lists=not args.preserve_list_spacing,
+        renderer=args.renderer,
+        cache_dir=None if args.no_cache else RENDER_CACHE_DIR,
     )
 
     if args.dry_run:
-        print(f"OK. Rendered DOCX to {docx_out} (dry-run, not uploaded).")
+        source = "from render cache" if cached else "rendered"
+        print(f"OK. DOCX at {docx_out} ({source}, dry-run, not uploaded).")
         return 0
 
     if not args.doc and not args.name:
@@ -1504,12 +2546,11 @@ def cmd_import_md(args: argparse.Namespace) -> int:
     require_scopes(args.token, ["https://www.googleapis.com/auth/drive"])
     access_token = ensure_access_token(client=client, token_path=args.token)
 
-    with open(docx_out, "rb") as f:
-        docx_bytes = f.read()
-
     metadata: dict[str, Any] = {"mimeType": "application/vnd.google-apps.document"}
     if args.name:
         metadata["name"] = args.name
+    media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    threshold = args.resumable_threshold_mb * 1024 * 1024
 
     if args.doc:
         links = parse_doc_links(read_text(args.links_file))
@@ -1517,26 +2558,23 @@ def cmd_import_md(args: argparse.Namespace) -> int:
         if args.doc not in by_name:
             raise SystemExit(f"Unknown --doc {args.doc!r}. Use `list` to see available names.")
         link = by_name[args.doc]
-        url = f"{DRIVE_UPLOAD_BASE}/files/{link.document_id}?uploadType=multipart"
-        resp = drive_upload_multipart(
+        resp = drive_upload_file(
             access_token=access_token,
-            url=url,
+            file_path=docx_out,
             metadata=metadata,
-            media_bytes=docx_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            method="PATCH",
+            media_type=media_type,
+            file_id=link.document_id,
+            resumable_threshold=threshold,
         )
         doc_id = resp.get("id") or link.document_id
         print(f"OK. Updated doc {link.name} ({doc_id}).")
     else:
-        url = f"{DRIVE_UPLOAD_BASE}/files?uploadType=multipart"
-        resp = drive_upload_multipart(
+        resp = drive_upload_file(
             access_token=access_token,
-            url=url,
+            file_path=docx_out,
             metadata=metadata,
-            media_bytes=docx_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            method="POST",
+            media_type=media_type,
+            resumable_threshold=threshold,
         )
         doc_id = resp.get("id")
         name = resp.get("name") or args.name or "Untitled"
@@ -1544,6 +2582,32 @@ def cmd_import_md(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_serve(args: argparse.Namespace) -> int:
+    import gdocs_daemon
+
+    socket_path = args.socket or daemon_socket_path()
+    if args.status:
+        info = gdocs_daemon.ping(socket_path)
+        if info is None:
+            print(f"Not running ({socket_path})")
+            return 1
+        print(json.dumps({"socket": socket_path, **info}, ensure_ascii=False, indent=2))
+        return 0
+    if args.stop:
+        if not gdocs_daemon.stop(socket_path):
+            print(f"Not running ({socket_path})")
+            return 1
+        print(f"Stopped daemon on {socket_path}")
+        return 0
+    return gdocs_daemon.serve(
+        socket_path=socket_path,
+        client_path=args.client,
+        token_path=args.token,
+        cache_ttl=args.cache_ttl,
+        concurrency=args.concurrency,
+    )
+
+
 def cmd_token_info(args: argparse.Namespace) -> int:
     try:
         token = read_json(args.token)
@@ -1576,10 +2640,18 @@ def build_parser() -> argparse.ArgumentParser:
         default=os.path.join(ROOT_DIR, "docs", "resources", "GOOGLE_DOCS_LINKS.md"),
         help="Markdown file with doc links (default: docs/resources/GOOGLE_DOCS_LINKS.md)",
     )
+    p.add_argument("--trace", metavar="OUT_JSON", help="Write per-request spans as a Chrome trace-event JSON file")
+    gdocs_metrics.add_arguments(p)
+    gdocs_profile.add_arguments(p)
 
     sub = p.add_subparsers(dest="cmd", required=True)
 
     p_list = sub.add_parser("list", help="List documents parsed from links file")
+    p_list.add_argument(
+        "--meta",
+        action="store_true",
+        help="Also show Drive mimeType/access for every document (one batch request)",
+    )
     p_list.set_defaults(func=cmd_list)
 
     p_auth = sub.add_parser("auth", help="Run interactive OAuth and save token")
@@ -1608,6 +2680,12 @@ def build_parser() -> argparse.ArgumentParser:
         default="auto",
         help="How to fetch text: auto=Docs API then Drive export fallback (default: auto)",
     )
+    p_print.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Max concurrent Docs API requests when printing several documents; 1 disables (default: 8)",
+    )
     p_print.set_defaults(func=cmd_print)
 
     p_replace = sub.add_parser("replace", help="Replace text in a Google Doc via Docs API (replaceAllText)")
@@ -1619,23 +2697,58 @@ def build_parser() -> argparse.ArgumentParser:
     p_replace.set_defaults(func=cmd_replace)
 
     p_apply = sub.add_parser("apply", help="Apply many replacements from JSON via Docs API")
-    p_apply.add_argument("--doc", required=True, help="Document name (as in links file)")
+    apply_target = p_apply.add_mutually_exclusive_group(required=True)
+    apply_target.add_argument("--doc", help="Document name (as in links file)")
+    apply_target.add_argument("--document-id", help="Document id (for docs not in the links file)")
     p_apply.add_argument("--data", required=True, help="Path to JSON with replacements")
     p_apply.add_argument("--match-case", action="store_true", help="Match case (default: false)")
     p_apply.add_argument("--dry-run", action="store_true", help="Print requests JSON without changing the document")
     p_apply.add_argument("--json", action="store_true", help="Print full API response as JSON")
     p_apply.set_defaults(func=cmd_apply_template)
 
+    p_copy = sub.add_parser("copy", help="Copy a document (e.g. a pristine template) via Drive files.copy")
+    p_copy.add_argument("--doc", required=True, help="Source document name (as in links file)")
+    p_copy.add_argument("--name", help="Name for the copy (default: Drive's \"Copy of ...\")")
+    p_copy.add_argument("--folder", help="Drive folder id to place the copy in (default: source's folder)")
+    p_copy.add_argument("--json", action="store_true", help="Print the new file metadata as JSON")
+    p_copy.set_defaults(func=cmd_copy)
+
     p_export_docx = sub.add_parser("export-docx", help="Export a Google Doc as DOCX via Drive API")
     p_export_docx.add_argument("--doc", required=True, help="Document name (as in links file)")
     p_export_docx.add_argument("--out", required=True, help="Output DOCX path")
     p_export_docx.set_defaults(func=cmd_export_docx)
 
-    p_import_md = sub.add_parser("import-md", help="Render Markdown to DOCX (pandoc) and upload to Google Docs")
+    p_import_md = sub.add_parser("import-md", help="Render Markdown to DOCX and upload to Google Docs")
     p_import_md.add_argument("md", help="Path to Markdown file")
     p_import_md.add_argument("--doc", help="Document name to update (as in links file)")
     p_import_md.add_argument("--name", help="Name for a new document (or rename existing)")
-    p_import_md.add_argument("--reference-docx", help="DOCX with styles for pandoc (optional)")
+    p_import_md.add_argument("--reference-docx", help="DOCX with styles (like pandoc --reference-doc, optional)")
+    p_import_md.add_argument(
+        "--renderer",
+        choices=["builtin", "pandoc"],
+        default="builtin",
+        help="Markdown -> DOCX renderer (default: builtin, no external tools; pandoc: run pandoc)",
+    )
+    p_import_md.add_argument(
+        "--resumable-threshold-mb",
+        type=float,
+        default=RESUMABLE_UPLOAD_THRESHOLD / (1024 * 1024),
+        help="Upload larger DOCX files via a resumable chunked session (default: 5)",
+    )
+    p_import_md.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Update --doc via Docs batchUpdate (no DOCX, no upload; keeps id and history)",
+    )
+    p_import_md.add_argument(
+        "--section",
+        help="With --in-place: replace only the body under this heading",
+    )
+    p_import_md.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always re-render (default: reuse renders from {RENDER_CACHE_DIR} for identical inputs)",
+    )
     p_import_md.add_argument("--docx-out", help="Where to write rendered DOCX (default: .tmp/rendered.docx)")
     p_import_md.add_argument("--dry-run", action="store_true", help="Only render DOCX, do not upload")
     p_import_md.add_argument(
@@ -1648,12 +2761,38 @@ def build_parser() -> argparse.ArgumentParser:
     p_token = sub.add_parser("token-info", help="Show cached token scopes/expiry")
     p_token.set_defaults(func=cmd_token_info)
 
+    p_serve = sub.add_parser(
+        "serve",
+        help="Run a daemon (warm token, keep-alive connections, doc cache) that other commands use automatically",
+    )
+    p_serve.add_argument("--socket", help="Unix socket path (default: $GDOCS_SOCKET or $TMPDIR/gdocs-<uid>.sock)")
+    p_serve.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=30.0,
+        help="Seconds a cached document is served without re-fetching (writes via the daemon invalidate it; default: 30)",
+    )
+    p_serve.add_argument("--concurrency", type=int, default=8, help="Max in-flight API requests (default: 8)")
+    serve_mode = p_serve.add_mutually_exclusive_group()
+    serve_mode.add_argument("--status", action="store_true", help="Show whether a daemon is running, then exit")
+    serve_mode.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    p_serve.set_defaults(func=cmd_serve)
+
     return p
 
 
 def main(argv: list[str]) -> int:
     args = build_parser().parse_args(argv)
-    return int(args.func(args))
+    if args.trace:
+        gdocs_trace.enable()
+    try:
+        with gdocs_profile.from_args(args, title=f"gdocs_cli {args.cmd}"), gdocs_trace.span(args.cmd):
+            return int(args.func(args))
+    finally:
+        if args.trace:
+            count = gdocs_trace.write(args.trace, process_name=f"gdocs_cli {args.cmd}")
+            eprint(f"Trace: {count} spans -> {args.trace}")
+        gdocs_metrics.report(args, script=f"gdocs_cli {args.cmd}")
 
 
 if __name__ == "__main__":
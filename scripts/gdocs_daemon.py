@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Long-running gdocs daemon: newline-delimited JSON-RPC 2.0 over a Unix socket.
+
+`gdocs_cli.py serve` keeps one authenticated AsyncGoogleClient (keep-alive
+connection pool) and a document cache alive between invocations. While the
+socket exists, gdocs_cli's get_doc / docs_batch_update / export helpers go
+through it, so cv_structured_apply_refactored.py and the TUI use it without
+changes. Methods: get_doc, batch_update, export, apply_replacements, ping,
+shutdown.
+
+Each call may carry the caller's access_token; the daemon then acts with the
+caller's credentials (and caches documents per token), never with its own.
+Calls without one use the token the daemon was started with. The document
+cache is only invalidated by writes made through the daemon.
+
+The client records each call in gdocs_metrics under the endpoint kind it
+stands for (docs.get, docs.batchUpdate, drive.export), so --stats reports
+daemon-routed calls too; a get_doc served from the daemon's cache still counts.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import itertools
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from urllib.error import HTTPError, URLError
+
+import gdocs_cli
+import gdocs_metrics
+import gdocs_trace
+
+DEFAULT_CACHE_TTL = 30.0
+DEFAULT_CACHE_MAX_DOCS = 64
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# JSON-RPC error codes (-32000 and up are ours)
+ERR_PARSE = -32700
+ERR_INVALID = -32600
+ERR_METHOD = -32601
+ERR_PARAMS = -32602
+ERR_INTERNAL = -32603
+ERR_HTTP = -32000
+ERR_NETWORK = -32001
+
+# RPC method -> gdocs_metrics endpoint kind of the API call it stands for
+RPC_ENDPOINTS = {
+    "get_doc": "docs.get",
+    "batch_update": "docs.batchUpdate",
+    "apply_replacements": "docs.batchUpdate",
+    "export": "drive.export",
+}
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data: dict[str, Any] | None = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class GdocsService:
+    def __init__(
+        self,
+        api: Any,
+        *,
+        authorize: Callable[[], tuple[str, float]] | None = None,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_max_docs: int = DEFAULT_CACHE_MAX_DOCS,
+    ):
+        # api: AsyncGoogleClient (or anything with its get_doc/batch_update/export coroutines).
+        # authorize() -> (access_token, expires_at) runs in a thread when the token is near expiry.
+        self.api = api
+        self.authorize = authorize
+        self.cache_ttl = cache_ttl
+        self.cache_max_docs = cache_max_docs
+        self.started = time.time()
+        self.stop = asyncio.Event()
+        self.stats = {"calls": 0, "cache_hits": 0, "api_calls": 0}
+        # (access token or "" for the daemon's own, document id) -> (fetched at, doc), least recently used first
+        self._cache: OrderedDict[tuple[str, str], tuple[float, dict[str, Any]]] = OrderedDict()
+        self._expires_at = 0.0
+        self._auth_lock = asyncio.Lock()
+
+    async def _token(self) -> None:
+        if self.authorize is None or time.time() < self._expires_at - 120:
+            return
+        async with self._auth_lock:
+            if time.time() < self._expires_at - 120:
+                return
+            self.api.access_token, self._expires_at = await asyncio.to_thread(self.authorize)
+
+    async def _api(self, call: Callable[[str | None], Awaitable[Any]], access_token: str | None) -> Any:
+        # call(token): None means the daemon's own token, refreshed here when near expiry.
+        if access_token is None:
+            await self._token()
+        self.stats["api_calls"] += 1
+        return await call(access_token)
+
+    async def get_doc(self, document_id: str, fresh: bool = False, access_token: str | None = None) -> dict[str, Any]:
+        key = (access_token or "", document_id)
+        hit = self._cache.get(key)
+        if hit and not fresh and time.monotonic() - hit[0] <= self.cache_ttl:
+            self.stats["cache_hits"] += 1
+            self._cache.move_to_end(key)
+            return hit[1]
+        doc = await self._api(lambda token: self.api.get_doc(document_id, access_token=token), access_token)
+        self._store(key, doc)
+        return doc
+
+    def _store(self, key: tuple[str, str], doc: dict[str, Any]) -> None:
+        # Expired snapshots are never served again; drop them, then the least recently used beyond the cap.
+        now = time.monotonic()
+        for stale in [k for k, (fetched, _) in self._cache.items() if now - fetched > self.cache_ttl]:
+            del self._cache[stale]
+        self._cache[key] = (now, doc)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_docs:
+            self._cache.popitem(last=False)
+
+    async def batch_update(
+        self,
+        document_id: str,
+        requests: list[dict[str, Any]],
+        required_revision_id: str | None = None,
+        access_token: str | None = None,
+    ) -> dict[str, Any]:
+        # Any write (or failed write) makes the cached snapshots stale, whoever fetched them.
+        for key in [key for key in self._cache if key[1] == document_id]:
+            del self._cache[key]
+        return await self._api(
+            lambda token: self.api.batch_update(
+                document_id, requests, required_revision_id=required_revision_id, access_token=token
+            ),
+            access_token,
+        )
+
+    async def export(
+        self,
+        file_id: str,
+        mime_type: str,
+        dest_path: str | None = None,
+        access_token: str | None = None,
+    ) -> dict[str, Any]:
+        data = await self._api(lambda token: self.api.export(file_id, mime_type, access_token=token), access_token)
+        if not dest_path:
+            return {"size": len(data), "data": base64.b64encode(data).decode("ascii")}
+        tmp_path = f"{dest_path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, dest_path)
+        return {"size": len(data), "path": dest_path}
+
+    async def apply_replacements(
+        self,
+        document_id: str,
+        replacements: dict[str, Any],
+        match_case: bool = False,
+        required_revision_id: str | None = None,
+        access_token: str | None = None,
+    ) -> dict[str, Any]:
+        requests = gdocs_cli.replace_all_requests(replacements, match_case=match_case)
+        if not requests:
+            raise RpcError(ERR_PARAMS, "No replacements to apply.")
+        return await self.batch_update(document_id, requests, required_revision_id, access_token)
+
+    async def ping(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 3),
+            "cached_docs": len(self._cache),
+            **self.stats,
+            "endpoints": gdocs_metrics.snapshot(),
+        }
+
+    async def shutdown(self) -> dict[str, Any]:
+        self.stop.set()
+        return {"stopping": True}
+
+    METHODS = ("get_doc", "batch_update", "export", "apply_replacements", "ping", "shutdown")
+
+    async def dispatch(self, message: dict[str, Any]) -> Any:
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method not in self.METHODS:
+            raise RpcError(ERR_METHOD, f"Unknown method: {method!r}")
+        if not isinstance(params, dict):
+            raise RpcError(ERR_PARAMS, "params must be an object")
+        self.stats["calls"] += 1
+        try:
+            return await getattr(self, method)(**params)
+        except TypeError as exc:
+            raise RpcError(ERR_PARAMS, str(exc)) from None
+        except HTTPError as exc:
+            raise RpcError(ERR_HTTP, str(exc.msg), {"status": exc.code, "url": exc.url}) from None
+        except URLError as exc:
+            raise RpcError(ERR_NETWORK, f"Network error: {exc.reason}") from None
+        except SystemExit as exc:
+            # Token refresh and similar gdocs_cli helpers report errors via SystemExit.
+            raise RpcError(ERR_INTERNAL, str(exc.code)) from None
+
+    async def handle(self, line: bytes) -> dict[str, Any]:
+        msg_id = None
+        try:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise RpcError(ERR_PARSE, f"Parse error: {exc}") from None
+            if not isinstance(message, dict):
+                raise RpcError(ERR_INVALID, "Request must be an object")
+            msg_id = message.get("id")
+            result = await self.dispatch(message)
+            return {"jsonrpc": "2.0", "id": msg_id, "result": result}
+        except RpcError as exc:
+            error: dict[str, Any] = {"code": exc.code, "message": exc.message}
+            if exc.data is not None:
+                error["data"] = exc.data
+            return {"jsonrpc": "2.0", "id": msg_id, "error": error}
+        except Exception as exc:  # noqa: BLE001
+            return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": ERR_INTERNAL, "message": repr(exc)}}
+
+
+async def run_server(
+    service: GdocsService,
+    socket_path: str,
+    *,
+    ready: threading.Event | None = None,
+) -> None:
+    async def on_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                response = await service.handle(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Create the socket owner-only; a chmod afterwards would leave a window where others could connect.
+    umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(on_client, path=socket_path, limit=MAX_MESSAGE_BYTES)
+    finally:
+        os.umask(umask)
+    if ready is not None:
+        ready.set()
+    try:
+        await service.stop.wait()
+    finally:
+        server.close()
+        await server.wait_closed()
+        close = getattr(service.api, "close", None)
+        if close is not None:
+            await close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def serve(
+    *,
+    socket_path: str,
+    client_path: str,
+    token_path: str,
+    cache_ttl: float = DEFAULT_CACHE_TTL,
+    concurrency: int = 8,
+) -> int:
+    from gdocs_aio import AsyncGoogleClient
+
+    if ping(socket_path) is not None:
+        raise SystemExit(f"gdocs daemon already running on {socket_path}")
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket of a crashed daemon
+    # The daemon itself must talk to the API, never to itself.
+    os.environ["GDOCS_DAEMON"] = "0"
+
+    client = gdocs_cli.load_oauth_client(client_path)
+
+    def authorize() -> tuple[str, float]:
+        token = gdocs_cli.ensure_access_token(client=client, token_path=token_path, min_ttl_seconds=300)
+        return token, float(gdocs_cli.read_json(token_path).get("expires_at") or 0)
+
+    access_token, _ = authorize()
+
+    async def main() -> None:
+        api = AsyncGoogleClient(access_token, concurrency=concurrency)
+        service = GdocsService(api, authorize=authorize, cache_ttl=cache_ttl)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, service.stop.set)
+        gdocs_cli.eprint(f"gdocs daemon listening on {socket_path} (pid {os.getpid()})")
+        await run_server(service, socket_path)
+
+    asyncio.run(main())
+    gdocs_cli.eprint("gdocs daemon stopped")
+    return 0
+
+
+# --- client side ---
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+class DaemonClient:
+    def __init__(self, socket_path: str, *, timeout: float = 300.0):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def close(self) -> None:
+        try:
+            self.file.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+    def call(self, method: str, **params: Any) -> Any:
+        with gdocs_trace.span(f"daemon {method}", cat="rpc"):
+            return self._call(method, params)
+
+    def _call(self, method: str, params: dict[str, Any]) -> Any:
+        msg = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        payload = json.dumps(msg, ensure_ascii=False).encode("utf-8") + b"\n"
+        started = time.perf_counter()
+        # Recorded like the API call it stands for; status 0 = no answer. Not when the daemon is
+        # unavailable: the caller then falls back to a direct request, which records itself.
+        status, received, recorded = 0, 0, True
+        try:
+            try:
+                self.file.write(payload)
+                self.file.flush()
+            except OSError as exc:
+                recorded = False
+                raise DaemonUnavailable(str(exc)) from None
+            try:
+                line = self.file.readline()
+            except OSError as exc:
+                line = b""
+                lost = str(exc)
+            else:
+                lost = "connection closed"
+            if not line:
+                # The request was sent; a write may or may not have happened.
+                if method in ("get_doc", "export", "ping"):
+                    recorded = False
+                    raise DaemonUnavailable(lost)
+                raise SystemExit(f"gdocs daemon connection lost during {method}: {lost}")
+            received = len(line)
+            resp = json.loads(line)
+            error = resp.get("error")
+            if not error:
+                status = 200
+                result = resp.get("result")
+                if method == "export" and isinstance(result, dict):
+                    # An export the daemon wrote to disk never crosses the socket; count the file.
+                    received = int(result.get("size") or 0)
+                return result
+            data = error.get("data") or {}
+            if error.get("code") == ERR_HTTP:
+                status = int(data.get("status") or 500)
+                raise HTTPError(data.get("url") or method, status, error.get("message") or "", None, None)
+            if error.get("code") == ERR_NETWORK:
+                raise SystemExit(f"{error.get('message')} (via gdocs daemon)")
+            raise SystemExit(f"gdocs daemon {method} failed: {error.get('message')}")
+        finally:
+            kind = RPC_ENDPOINTS.get(method)
+            if kind is not None and recorded:
+                gdocs_metrics.record(
+                    kind,
+                    seconds=time.perf_counter() - started,
+                    status=status,
+                    bytes_sent=len(payload),
+                    bytes_received=received,
+                )
+
+    def try_call(self, method: str, **params: Any) -> Any:
+        # None = daemon went away before handling the call; the caller falls back to a direct request.
+        try:
+            return self.call(method, **params)
+        except DaemonUnavailable:
+            _forget(self)
+            return None
+
+
+_local = threading.local()
+
+
+def _forget(client: DaemonClient) -> None:
+    if getattr(_local, "client", None) is client:
+        _local.client = None
+    client.close()
+
+
+def connect(socket_path: str | None = None) -> DaemonClient | None:
+    # One connection per thread (the protocol is request/response per connection).
+    path = socket_path or gdocs_cli.daemon_socket_path()
+    client = getattr(_local, "client", None)
+    if client is not None and client.socket_path == path:
+        return client
+    try:
+        client = DaemonClient(path)
+    except OSError:
+        return None
+    _local.client = client
+    return client
+
+
+def ping(socket_path: str | None = None) -> dict[str, Any] | None:
+    path = socket_path or gdocs_cli.daemon_socket_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        client = DaemonClient(path, timeout=5.0)
+    except OSError:
+        return None
+    try:
+        return client.call("ping")
+    except (DaemonUnavailable, SystemExit):
+        return None
+    finally:
+        client.close()
+
+
+def stop(socket_path: str | None = None) -> bool:
+    path = socket_path or gdocs_cli.daemon_socket_path()
+    try:
+        client = DaemonClient(path, timeout=5.0)
+    except OSError:
+        return False
+    try:
+        client.call("shutdown")
+        return True
+    finally:
+        client.close()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+API call accounting for gdocs_cli and the scripts built on it.
+
+Every request of gdocs_cli's HTTP layer (and of gdocs_aio / the daemon client)
+is recorded per endpoint kind: docs.get, docs.batchUpdate, drive.files.get,
+drive.export, drive.upload, oauth.token, ... with calls, errors, bytes sent and
+received and a latency histogram. The `--stats`, `--stats-json` and
+`--stats-prom` options print or write the totals at the end of a run; the
+Prometheus textfile is meant for node_exporter's textfile collector.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Any
+
+# Upper bounds (seconds) of the latency histogram buckets; a last +Inf bucket catches the rest.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_stats: dict[str, dict[str, Any]] = {}
+
+
+def endpoint_kind(method: str, url: str) -> str:
+    parsed = urllib.parse.urlsplit(url)
+    path = parsed.path
+    if path.endswith("/token"):
+        return "oauth.token"
+    if parsed.netloc == "docs.googleapis.com":
+        if path.endswith(":batchUpdate"):
+            return "docs.batchUpdate"
+        if path.rstrip("/").endswith("/documents"):
+            return "docs.create"
+        return "docs.get"
+    if path.startswith("/upload/drive/"):
+        return "drive.upload"
+    if path.startswith("/batch/drive/"):
+        return "drive.batch"
+    if path.startswith("/drive/"):
+        if path.endswith("/export"):
+            return "drive.export"
+        if path.endswith("/copy"):
+            return "drive.copy"
+        if path.rstrip("/").endswith("/files"):
+            return "drive.files.create" if method == "POST" else "drive.files.list"
+        if method == "GET":
+            return "drive.download" if "alt=media" in parsed.query else "drive.files.get"
+        return f"drive.files.{method.lower()}"
+    return f"{method} {parsed.netloc}"
+
+
+def record(kind: str, *, seconds: float, status: int = 0, bytes_sent: int = 0, bytes_received: int = 0) -> None:
+    # status 0 = no HTTP response (network error).
+    with _lock:
+        entry = _stats.get(kind)
+        if entry is None:
+            entry = _stats[kind] = {
+                "calls": 0,
+                "errors": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "seconds": 0.0,
+                "max_seconds": 0.0,
+                "statuses": {},
+                "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        entry["calls"] += 1
+        if not 200 <= status < 400:
+            entry["errors"] += 1
+        entry["bytes_sent"] += bytes_sent
+        entry["bytes_received"] += bytes_received
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        key = str(status)
+        entry["statuses"][key] = entry["statuses"].get(key, 0) + 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(LATENCY_BUCKETS)
+        entry["buckets"][i] += 1
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    with _lock:
+        return json.loads(json.dumps(_stats))
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def format_summary(stats: dict[str, dict[str, Any]] | None = None) -> str:
+    stats = snapshot() if stats is None else stats
+    if not stats:
+        return "API calls: none"
+    lines = [f"{'endpoint':<20} {'calls':>6} {'errors':>6} {'sent':>10} {'received':>10} {'avg ms':>8} {'max ms':>8}"]
+    for kind, entry in sorted(stats.items()):
+        avg = entry["seconds"] / entry["calls"] * 1000
+        lines.append(
+            f"{kind:<20} {entry['calls']:>6} {entry['errors']:>6} {entry['bytes_sent']:>10} "
+            f"{entry['bytes_received']:>10} {avg:>8.1f} {entry['max_seconds'] * 1000:>8.1f}"
+        )
+    total = sum(entry["calls"] for entry in stats.values())
+    lines.append(f"API calls: {total}")
+    return "\n".join(lines)
+
+
+def _prom_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(stats: dict[str, dict[str, Any]] | None = None, *, script: str = "gdocs_cli") -> str:
+    stats = snapshot() if stats is None else stats
+    out: list[str] = []
+    counters = (
+        ("gdocs_api_requests_total", "calls", "API requests by endpoint kind."),
+        ("gdocs_api_errors_total", "errors", "API requests without a 2xx/3xx response."),
+        ("gdocs_api_sent_bytes_total", "bytes_sent", "Request body bytes sent."),
+        ("gdocs_api_received_bytes_total", "bytes_received", "Response body bytes received."),
+    )
+    for name, field, help_text in counters:
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} counter")
+        for kind, entry in sorted(stats.items()):
+            out.append(f'{name}{{script="{_prom_label(script)}",endpoint="{_prom_label(kind)}"}} {entry[field]}')
+    name = "gdocs_api_request_duration_seconds"
+    out.append(f"# HELP {name} API request latency by endpoint kind.")
+    out.append(f"# TYPE {name} histogram")
+    for kind, entry in sorted(stats.items()):
+        labels = f'script="{_prom_label(script)}",endpoint="{_prom_label(kind)}"'
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), entry["buckets"]):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f"{name}_sum{{{labels}}} {entry['seconds']:.6f}")
+        out.append(f"{name}_count{{{labels}}} {entry['calls']}")
+    out.append("# HELP gdocs_api_last_run_timestamp_seconds When these totals were written.")
+    out.append("# TYPE gdocs_api_last_run_timestamp_seconds gauge")
+    out.append(f'gdocs_api_last_run_timestamp_seconds{{script="{_prom_label(script)}"}} {time.time():.3f}')
+    return "\n".join(out) + "\n"
+
+
+def _write_atomic(path: str, text: str) -> None:
+    # The textfile collector must never see a half-written file.
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("API call accounting")
+    group.add_argument("--stats", action="store_true", help="Print per-endpoint API call stats to stderr at exit")
+    group.add_argument("--stats-json", metavar="PATH", help="Write per-endpoint API call stats as JSON")
+    group.add_argument("--stats-prom", metavar="PATH", help="Write API call stats as a Prometheus textfile (*.prom)")
+
+
+def report(args: argparse.Namespace, *, script: str) -> None:
+    # End-of-run output for the options added by add_arguments().
+    stats = snapshot()
+    if getattr(args, "stats", False):
+        print(format_summary(stats), file=sys.stderr)
+    if getattr(args, "stats_json", None):
+        _write_atomic(args.stats_json, json.dumps({"script": script, "buckets": LATENCY_BUCKETS, "endpoints": stats}, indent=2) + "\n")
+    if getattr(args, "stats_prom", None):
+        _write_atomic(args.stats_prom, format_prometheus(stats, script=script))
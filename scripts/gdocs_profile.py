@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Built-in profiling for cv_structured_apply_refactored.py, apply_cv_styles_themed.py
+and gdocs_cli.py.
+
+`--profile PATH` runs the command under cProfile and writes the top N functions
+(by cumulative and by own time) to PATH, plus the raw stats to PATH.pstats for
+snakeviz / pstats. `--profile-mem PATH` runs it under tracemalloc and takes a
+snapshot when each phase span (see gdocs_trace) opens and closes; PATH gets
+the top N allocation sites per phase and at exit. cProfile only sees the thread
+that started it.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+from typing import Any, Iterator
+
+import gdocs_trace
+
+DEFAULT_TOP = 25
+# Spans of these categories are round trips, not phases: no memory snapshots for them.
+_NON_PHASE_CATS = ("http", "rpc")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", metavar="PATH", help="Run under cProfile; write the top functions report to PATH")
+    group.add_argument(
+        "--profile-mem",
+        metavar="PATH",
+        help="Run under tracemalloc; write top allocation sites per phase to PATH",
+    )
+    group.add_argument(
+        "--profile-top",
+        type=int,
+        metavar="N",
+        default=DEFAULT_TOP,
+        help=f"Entries per profiling report section (default: {DEFAULT_TOP})",
+    )
+
+
+def _write(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"Profile written: {path}", file=sys.stderr)
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+def _snapshot() -> Any:
+    import tracemalloc
+
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+
+
+@contextlib.contextmanager
+def _paused(cpu_profiler: Any) -> Iterator[None]:
+    # Snapshots are slow; keep them out of a concurrent CPU profile.
+    if cpu_profiler is not None:
+        cpu_profiler.disable()
+    try:
+        yield
+    finally:
+        if cpu_profiler is not None:
+            cpu_profiler.enable()
+
+
+class _MemoryPhases:
+    # gdocs_trace listener: snapshot on phase entry, diff against it on exit (per thread, nesting-aware).
+    def __init__(self, top: int, cpu_profiler: Any = None):
+        self.top = top
+        self.cpu_profiler = cpu_profiler
+        self.sections: list[str] = []
+        self._local = threading.local()
+
+    def __call__(self, name: str, cat: str, entering: bool) -> None:
+        if cat in _NON_PHASE_CATS:
+            return
+        with _paused(self.cpu_profiler):
+            self._phase(name, entering)
+
+    def _phase(self, name: str, entering: bool) -> None:
+        import tracemalloc
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if entering:
+            stack.append(_snapshot())
+            return
+        before = stack.pop()
+        diff = _snapshot().compare_to(before, "lineno")
+        current, peak = tracemalloc.get_traced_memory()
+        grown = sum(stat.size_diff for stat in diff)
+        lines = [f"{'  ' * len(stack)}== {name}: {grown / 1024:+,.1f} KiB (traced {_kib(current)}, peak {_kib(peak)})"]
+        for stat in sorted(diff, key=lambda s: abs(s.size_diff), reverse=True)[: self.top]:
+            if not stat.size_diff:
+                break
+            frame = stat.traceback[0]
+            lines.append(f"   {stat.size_diff / 1024:+10,.1f} KiB {stat.count_diff:+7} blocks  {frame.filename}:{frame.lineno}")
+        self.sections.append("\n".join(lines))
+
+
+@contextlib.contextmanager
+def _cpu(path: str, *, title: str, top: int) -> Iterator[Any]:
+    import cProfile
+    import pstats
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{path}.pstats")
+        out = io.StringIO()
+        out.write(f"cProfile report: {title}\n")
+        out.write(f"Raw stats: {path}.pstats\n\n")
+        stats = pstats.Stats(profiler, stream=out).strip_dirs()
+        for key in ("cumulative", "tottime"):
+            out.write(f"=== top {top} by {key} ===\n")
+            stats.sort_stats(key).print_stats(top)
+        _write(path, out.getvalue())
+
+
+@contextlib.contextmanager
+def _memory(path: str, *, title: str, top: int) -> Iterator[_MemoryPhases]:
+    import tracemalloc
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    phases = _MemoryPhases(top)
+    tracemalloc.start()
+    gdocs_trace.add_listener(phases)
+    try:
+        yield phases
+    finally:
+        gdocs_trace.remove_listener(phases)
+        current, peak = tracemalloc.get_traced_memory()
+        at_exit = _snapshot().statistics("lineno")
+        tracemalloc.stop()
+        lines = [f"tracemalloc report: {title}", f"Traced at exit: {_kib(current)}, peak: {_kib(peak)}", ""]
+        lines.append("Per phase (allocations still alive when the phase ended, vs. when it started):")
+        lines.extend(phases.sections or ["  (no phase spans were entered)"])
+        lines.append("")
+        lines.append(f"=== top {top} allocation sites at exit ===")
+        for stat in at_exit[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"   {stat.size / 1024:10,.1f} KiB {stat.count:7} blocks  {frame.filename}:{frame.lineno}")
+        _write(path, "\n".join(lines) + "\n")
+
+
+@contextlib.contextmanager
+def from_args(args: argparse.Namespace, *, title: str) -> Iterator[None]:
+    # Wraps a command with the profilers selected by the options of add_arguments().
+    # Everything the profilers import and set up happens before cProfile is enabled (and
+    # cProfile is stopped before the final memory snapshot), so neither shows up in the other.
+    top = getattr(args, "profile_top", DEFAULT_TOP)
+    if getattr(args, "profile", None):
+        import cProfile  # noqa: F401
+        import pstats  # noqa: F401
+    if getattr(args, "profile_mem", None):
+        import tracemalloc  # noqa: F401
+    with contextlib.ExitStack() as stack:
+        phases = None
+        if getattr(args, "profile_mem", None):
+            phases = stack.enter_context(_memory(args.profile_mem, title=title, top=top))
+        if getattr(args, "profile", None):
+            cpu_profiler = stack.enter_context(_cpu(args.profile, title=title, top=top))
+            if phases is not None:
+                phases.cpu_profiler = cpu_profiler
+        yield
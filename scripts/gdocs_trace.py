@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing spans, written out as Chrome trace events.
+
+`span()` is a no-op until `enable()` is called (the `--trace out.json` option
+of gdocs_cli.py and cv_structured_apply_refactored.py). Each span becomes a
+complete ("X") event on its thread; gdocs_cli's HTTP layer adds one "http"
+span per API round trip, so local CPU work and API waits show up side by side.
+Open the file in chrome://tracing or https://ui.perfetto.dev.
+
+Listeners (gdocs_profile's per-phase memory snapshots) are called when a span
+opens and closes, whether or not events are being recorded.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# listener(name, cat, entering)
+Listener = Callable[[str, str, bool], None]
+
+_events: list[dict[str, Any]] | None = None
+_listeners: list[Listener] = []
+_threads: dict[int, str] = {}
+_origin_ns = 0
+
+
+def enable() -> None:
+    # Starts a fresh recording.
+    global _events, _origin_ns
+    _events = []
+    _threads.clear()
+    _origin_ns = time.perf_counter_ns()
+
+
+def enabled() -> bool:
+    return _events is not None
+
+
+def add_listener(listener: Listener) -> None:
+    _listeners.append(listener)
+
+
+def remove_listener(listener: Listener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+@contextmanager
+def span(name: str, cat: str = "cv", **args: Any) -> Iterator[dict[str, Any]]:
+    # Yields the span's args, so the body can attach results (sizes, counts, status) before it closes.
+    events = _events
+    listeners = list(_listeners)
+    if events is None and not listeners:
+        yield args
+        return
+    for listener in listeners:
+        listener(name, cat, True)
+    thread = threading.current_thread()
+    _threads.setdefault(thread.ident or 0, thread.name)
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    except BaseException as exc:
+        args["error"] = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        end = time.perf_counter_ns()
+        for listener in reversed(listeners):
+            listener(name, cat, False)
+        if events is not None:
+            event: dict[str, Any] = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - _origin_ns) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": thread.ident or 0,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+
+def write(path: str, *, process_name: str | None = None) -> int:
+    # Returns the number of spans written.
+    events = list(_events or [])
+    pid = os.getpid()
+    meta: list[dict[str, Any]] = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in _threads.items()
+    ]
+    if process_name:
+        meta.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": process_name}})
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+        f.write("\n")
+    os.replace(tmp, path)
+    return len(events)
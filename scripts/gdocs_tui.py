@@ -31,8 +31,8 @@ class App:
         self.last_error = ""
 
         self.meta_cache: dict[str, dict[str, Any]] = {}
-        self.view_cache: dict[tuple[str, str], str] = {}
-        self.view_cache_struct: dict[str, dict[str, Any]] = {}
+        # One decoded DOCX per document; every view format is rendered from it without re-downloading.
+        self.docx_cache: dict[str, tuple[str, gdocs_cli.DocxDocument]] = {}
 
         self.mode = "list"  # list | view | help
         self.view_format = "para"  # plain | md | para
@@ -103,6 +103,23 @@ class App:
         self.meta_cache[file_id] = meta
         return meta
 
+    def prefetch_meta(self) -> None:
+        missing = [it.document_id for it in self.items if it.document_id not in self.meta_cache]
+        if not missing:
+            return
+        token = self.access_token()
+        if token is None:
+            return
+        try:
+            metas = gdocs_cli.drive_batch_get_metadata(file_ids=missing, access_token=token)
+        except BaseException as exc:  # noqa: BLE001 - show as status
+            self.set_error(f"Drive metadata error: {exc}")
+            return
+        for file_id, meta in metas.items():
+            # Errors are left uncached so get_meta() retries and reports them per document.
+            if "error" not in meta:
+                self.meta_cache[file_id] = meta
+
     def is_editable(self, item: DocItem) -> bool:
         meta = self.get_meta(item.document_id)
         if not meta:
@@ -199,57 +216,27 @@ class App:
             self.set_error("Auth required.")
             return
 
-        if self.view_format == "para":
-            try:
-                doc = self.get_struct(item, token)
+        try:
+            name, docx = self.get_docx(item, token)
+            if self.view_format == "para":
                 width = max(20, self.stdscr.getmaxyx()[1] - 2)
+                doc = docx.to_struct(file_id=item.document_id, title=name)
                 self.view_lines = self.struct_to_para_lines(doc, width=width)
-                self.set_status("")
-            except BaseException as exc:  # noqa: BLE001
-                self.set_error(f"View error: {exc}")
-                self.view_lines = []
-            return
-
-        key = (item.document_id, self.view_format)
-        if key in self.view_cache:
-            text = self.view_cache[key]
-        else:
-            try:
-                _, text = gdocs_cli.drive_get_text_smart(
-                    file_id=item.document_id,
-                    access_token=token,
-                    output_format=self.view_format,
-                )
-            except BaseException as exc:  # noqa: BLE001
-                self.set_error(f"View error: {exc}")
-                text = ""
-            self.view_cache[key] = text
-        self.view_lines = text.splitlines()
-        self.set_status("")
-
-    def get_struct(self, item: DocItem, token: str) -> dict[str, Any]:
-        if item.document_id in self.view_cache_struct:
-            return self.view_cache_struct[item.document_id]
-
-        resolved_id, meta = gdocs_cli.drive_resolve_target(file_id=item.document_id, access_token=token)
-        mime = meta.get("mimeType") or ""
-        name = meta.get("name") or item.name
-
-        if mime == "application/vnd.google-apps.document":
-            docx = gdocs_cli.drive_export_bytes(
-                file_id=resolved_id,
-                access_token=token,
-                mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-            doc = gdocs_cli.docx_to_struct(docx, file_id=item.document_id, title=name)
-        elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            raw = gdocs_cli.drive_download_bytes(file_id=resolved_id, access_token=token)
-            doc = gdocs_cli.docx_to_struct(raw, file_id=item.document_id, title=name)
-        else:
-            raise RuntimeError(f"Unsupported mimeType for paragraph view: {mime}")
+            elif self.view_format == "md":
+                self.view_lines = docx.markdown.splitlines()
+            else:
+                self.view_lines = docx.text.splitlines()
+            self.set_status("")
+        except BaseException as exc:  # noqa: BLE001
+            self.set_error(f"View error: {exc}")
+            self.view_lines = []
 
-        self.view_cache_struct[item.document_id] = doc
-        return doc
+    def get_docx(self, item: DocItem, token: str) -> tuple[str, gdocs_cli.DocxDocument]:
+        hit = self.docx_cache.get(item.document_id)
+        if hit is None:
+            hit = gdocs_cli.drive_get_docx_document(file_id=item.document_id, access_token=token)
+            self.docx_cache[item.document_id] = hit
+        return hit
 
     def struct_to_para_lines(self, doc: dict[str, Any], *, width: int) -> list[str]:
         def runs_text(runs: list[dict[str, Any]]) -> str:
@@ -407,9 +394,7 @@ class App:
             return
 
         # Invalidate cached views for this doc
-        for fmt in ("plain", "md"):
-            self.view_cache.pop((self.active.document_id, fmt), None)
-        self.view_cache_struct.pop(self.active.document_id, None)
+        self.docx_cache.pop(self.active.document_id, None)
         self.open_view(self.active)
         self.set_status("OK: replaced.")
 
@@ -596,6 +581,8 @@ class App:
             self.items = []
             self.set_status(f"Failed to read links file: {exc}")
         self.render()
+        self.prefetch_meta()
+        self.render()
 
         while True:
             try:
@@ -632,6 +619,7 @@ class App:
 
             if ch in ("r", "R", ord("r"), ord("R")):
                 self.load_items()
+                self.prefetch_meta()
                 self.set_status("Reloaded links.")
                 self.render()
                 continue
@@ -654,7 +642,7 @@ class App:
                 self.set_status("Auth finished.")
                 # Invalidate caches to ensure new permissions apply
                 self.meta_cache.clear()
-                self.view_cache.clear()
+                self.docx_cache.clear()
                 if self.mode == "view" and self.active:
                     self.open_view(self.active)
                 self.render()
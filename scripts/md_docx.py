@@ -0,0 +1,770 @@
+#!/usr/bin/env python3
+"""
+Stdlib-only Markdown -> DOCX renderer for the subset used by `gdocs_cli.py import-md`.
+
+Supports ATX headings, paragraphs (with hard line breaks), bold/italic/strike/
+underline/code spans, links, nested bullet/ordered lists, pipe tables, fenced
+divs (`::: {custom-style="Name"}`), block quotes and horizontal rules.
+
+Like pandoc's `--reference-doc`, a reference DOCX supplies styles.xml, the theme,
+the font table and page setup; styles the reference lacks are filled in from
+built-in defaults that use pandoc's style ids (BodyText, Compact, Heading1, ...).
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+
+
+# Bump when the generated DOCX changes for the same input (used by render caches).
+RENDERER_VERSION = "1"
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+NS = {"w": W_NS, "r": R_NS}
+
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+_PREFIXES = {"w": W_NS, "r": R_NS}
+_prefix_lock = threading.Lock()
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+def _tostring(el: ET.Element, prefixes: dict[str, str] | None = None) -> bytes:
+    # Serializes with w:/r: (and the reference's) prefixes. ElementTree only takes prefixes from
+    # its process-wide map, so they are registered for this call and the map is restored after.
+    namespace_map = ET._namespace_map  # type: ignore[attr-defined]
+    with _prefix_lock:
+        saved = dict(namespace_map)
+        try:
+            for prefix, uri in {**(prefixes or {}), **_PREFIXES}.items():
+                ET.register_namespace(prefix, uri)
+            return ET.tostring(el, encoding="utf-8", xml_declaration=True)
+        finally:
+            namespace_map.clear()
+            namespace_map.update(saved)
+
+
+def _sub(parent: ET.Element, tag: str, **attrs: str) -> ET.Element:
+    el = ET.SubElement(parent, _w(tag))
+    for k, v in attrs.items():
+        el.set(_w(k), v)
+    return el
+
+
+# === BUILT-IN STYLES ===
+
+_BUILTIN_STYLES_XML = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W_NS}">
+  <w:docDefaults>
+    <w:rPrDefault><w:rPr>
+      <w:rFonts w:ascii="Arial" w:hAnsi="Arial" w:eastAsia="Arial" w:cs="Arial"/>
+      <w:sz w:val="22"/><w:szCs w:val="22"/><w:lang w:val="en-US"/>
+    </w:rPr></w:rPrDefault>
+    <w:pPrDefault><w:pPr><w:spacing w:after="120" w:line="264" w:lineRule="auto"/></w:pPr></w:pPrDefault>
+  </w:docDefaults>
+  <w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>
+  <w:style w:type="paragraph" w:styleId="BodyText">
+    <w:name w:val="Body Text"/><w:basedOn w:val="Normal"/><w:qFormat/>
+    <w:pPr><w:spacing w:before="120" w:after="120"/></w:pPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Compact">
+    <w:name w:val="Compact"/><w:basedOn w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:spacing w:before="36" w:after="36"/></w:pPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="BlockText">
+    <w:name w:val="Block Text"/><w:basedOn w:val="BodyText"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:ind w:left="480" w:right="480"/></w:pPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Title">
+    <w:name w:val="Title"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="480" w:after="240"/><w:jc w:val="center"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="52"/><w:szCs w:val="52"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading1">
+    <w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="400" w:after="120"/><w:outlineLvl w:val="0"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="40"/><w:szCs w:val="40"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading2">
+    <w:name w:val="heading 2"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="360" w:after="120"/><w:outlineLvl w:val="1"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="32"/><w:szCs w:val="32"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading3">
+    <w:name w:val="heading 3"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="320" w:after="80"/><w:outlineLvl w:val="2"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="28"/><w:szCs w:val="28"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading4">
+    <w:name w:val="heading 4"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="280" w:after="80"/><w:outlineLvl w:val="3"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="24"/><w:szCs w:val="24"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading5">
+    <w:name w:val="heading 5"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="240" w:after="80"/><w:outlineLvl w:val="4"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="22"/><w:szCs w:val="22"/></w:rPr>
+  </w:style>
+  <w:style w:type="paragraph" w:styleId="Heading6">
+    <w:name w:val="heading 6"/><w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:qFormat/>
+    <w:pPr><w:keepNext/><w:spacing w:before="240" w:after="80"/><w:outlineLvl w:val="5"/></w:pPr>
+    <w:rPr><w:b/><w:i/><w:sz w:val="22"/><w:szCs w:val="22"/></w:rPr>
+  </w:style>
+  <w:style w:type="character" w:styleId="Hyperlink">
+    <w:name w:val="Hyperlink"/><w:rPr><w:color w:val="1155CC"/><w:u w:val="single"/></w:rPr>
+  </w:style>
+  <w:style w:type="character" w:styleId="VerbatimChar">
+    <w:name w:val="Verbatim Char"/><w:rPr><w:rFonts w:ascii="Courier New" w:hAnsi="Courier New"/><w:sz w:val="20"/></w:rPr>
+  </w:style>
+  <w:style w:type="table" w:default="1" w:styleId="Table">
+    <w:name w:val="Table"/>
+    <w:tblPr>
+      <w:tblBorders>
+        <w:top w:val="single" w:sz="4" w:space="0" w:color="D0D4D9"/>
+        <w:left w:val="single" w:sz="4" w:space="0" w:color="D0D4D9"/>
+        <w:bottom w:val="single" w:sz="4" w:space="0" w:color="D0D4D9"/>
+        <w:right w:val="single" w:sz="4" w:space="0" w:color="D0D4D9"/>
+        <w:insideH w:val="single" w:sz="4" w:space="0" w:color="D0D4D9"/>
+        <w:insideV w:val="single" w:sz="4" w:space="0" w:color="D0D4D9"/>
+      </w:tblBorders>
+      <w:tblCellMar><w:left w:w="108" w:type="dxa"/><w:right w:w="108" w:type="dxa"/></w:tblCellMar>
+    </w:tblPr>
+  </w:style>
+</w:styles>
+"""
+
+# Letter, 1" margins (pandoc's default reference).
+_DEFAULT_SECT_PR = f"""<w:sectPr xmlns:w="{W_NS}">
+  <w:pgSz w:w="12240" w:h="15840"/>
+  <w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>
+</w:sectPr>"""
+
+
+class _Styles:
+    # styles.xml from the reference (or built-ins) plus on-demand fill-in of missing styles.
+
+    def __init__(self, styles_xml: bytes | None):
+        self._builtin = ET.fromstring(_BUILTIN_STYLES_XML.encode("utf-8"))
+        self._source = styles_xml
+        self._changed = False
+        self.prefixes: dict[str, str] = {}
+        if styles_xml:
+            # Keep the reference's prefixes (w14, mc, ...) so re-serialized XML stays readable by Word.
+            for prefix, uri in re.findall(rb'xmlns:(\w+)="([^"]+)"', styles_xml):
+                self.prefixes[prefix.decode()] = uri.decode()
+            self.root = ET.fromstring(styles_xml)
+        else:
+            self.root = ET.fromstring(_BUILTIN_STYLES_XML.encode("utf-8"))
+        self.ids = {s.get(_w("styleId")) for s in self.root.findall("w:style", NS)}
+
+    def use(self, style_id: str) -> str:
+        if style_id in self.ids:
+            return style_id
+        for style in self._builtin.findall("w:style", NS):
+            if style.get(_w("styleId")) == style_id:
+                self.root.append(style)
+                self._changed = True
+                self.ids.add(style_id)
+                return style_id
+        # Custom paragraph style (fenced div custom-style): inherit body text formatting.
+        style = _sub(self.root, "style", type="paragraph", styleId=style_id, customStyle="1")
+        _sub(style, "name", val=style_id)
+        _sub(style, "basedOn", val=self.use("BodyText"))
+        _sub(style, "qFormat")
+        self.ids.add(style_id)
+        self._changed = True
+        return style_id
+
+    def paragraph_style(self, style_id: str, fallback: str) -> str:
+        # Prefer a style the reference defines; otherwise the built-in fallback.
+        if style_id in self.ids:
+            return style_id
+        return self.use(fallback)
+
+    def to_xml(self) -> bytes:
+        if self._source and not self._changed:
+            return self._source
+        # ElementTree only declares namespaces it emits; mc:Ignorable may name prefixes that are gone.
+        self.root.attrib.pop(f"{{{MC_NS}}}Ignorable", None)
+        return _tostring(self.root, self.prefixes)
+
+
+# === INLINE PARSING ===
+
+@dataclass(frozen=True)
+class Run:
+    text: str
+    bold: bool = False
+    italic: bool = False
+    strike: bool = False
+    underline: bool = False
+    code: bool = False
+    link: str | None = None
+
+
+_ESCAPABLE = set("\\`*_{}[]()#+-.!|~<>:")
+
+
+def parse_inline(text: str, *, base: Run | None = None) -> list[Run]:
+    base = base or Run("")
+    runs: list[Run] = []
+    buf: list[str] = []
+
+    def flush() -> None:
+        if buf:
+            runs.append(Run("".join(buf), base.bold, base.italic, base.strike, base.underline, base.code, base.link))
+            buf.clear()
+
+    def styled(**changes: object) -> Run:
+        fields = {
+            "text": "",
+            "bold": base.bold,
+            "italic": base.italic,
+            "strike": base.strike,
+            "underline": base.underline,
+            "code": base.code,
+            "link": base.link,
+        }
+        fields.update(changes)
+        return Run(**fields)  # type: ignore[arg-type]
+
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+
+        if ch == "\\" and i + 1 < n and text[i + 1] in _ESCAPABLE:
+            buf.append(text[i + 1])
+            i += 2
+            continue
+
+        if ch == "`":
+            end = text.find("`", i + 1)
+            if end != -1:
+                flush()
+                runs.append(Run(text[i + 1 : end], base.bold, base.italic, base.strike, base.underline, True, base.link))
+                i = end + 1
+                continue
+
+        if ch == "[" and base.link is None:
+            close = _find_closing_bracket(text, i)
+            if close != -1 and text.startswith("(", close + 1):
+                end = text.find(")", close + 2)
+                if end != -1:
+                    url = text[close + 2 : end].strip().split(" ", 1)[0].strip("<>")
+                    flush()
+                    runs.extend(parse_inline(text[i + 1 : close], base=styled(link=url)))
+                    i = end + 1
+                    continue
+
+        if text.startswith("<u>", i):
+            end = text.find("</u>", i + 3)
+            if end != -1:
+                flush()
+                runs.extend(parse_inline(text[i + 3 : end], base=styled(underline=True)))
+                i = end + 4
+                continue
+
+        if text.startswith("~~", i):
+            end = text.find("~~", i + 2)
+            if end > i + 2:
+                flush()
+                runs.extend(parse_inline(text[i + 2 : end], base=styled(strike=True)))
+                i = end + 2
+                continue
+
+        if ch in "*_":
+            # Intraword underscores (snake_case) are literal, as in pandoc.
+            if ch == "_" and i > 0 and text[i - 1].isalnum():
+                buf.append(ch)
+                i += 1
+                continue
+            handled = False
+            for delim, changes in ((ch * 3, {"bold": True, "italic": True}), (ch * 2, {"bold": True}), (ch, {"italic": True})):
+                if not text.startswith(delim, i):
+                    continue
+                end = _find_closing_delim(text, i + len(delim), delim)
+                if end == -1:
+                    continue
+                flush()
+                runs.extend(parse_inline(text[i + len(delim) : end], base=styled(**changes)))
+                i = end + len(delim)
+                handled = True
+                break
+            if handled:
+                continue
+
+        buf.append(ch)
+        i += 1
+
+    flush()
+    return [r for r in runs if r.text]
+
+
+def _find_closing_bracket(text: str, start: int) -> int:
+    depth = 0
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
+def _find_closing_delim(text: str, start: int, delim: str) -> int:
+    # The closing delimiter must follow non-space content and not be part of a longer run.
+    i = start
+    if i >= len(text) or text[i].isspace():
+        return -1
+    while True:
+        j = text.find(delim, i)
+        if j == -1:
+            return -1
+        if text[j - 1] == "\\":
+            i = j + 1
+            continue
+        longer = text.startswith(delim[0], j + len(delim))
+        if j > start and not text[j - 1].isspace() and not longer:
+            return j
+        i = j + 1
+
+
+# === BLOCK PARSING ===
+
+# A closing run of # only counts after whitespace, so "## Skills: C#" keeps its "#".
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)(?:\s*(?<=\s)#+)?\s*$")
+_LIST_RE = re.compile(r"^(\s*)([-+*]|\d+[.)])\s+(.*)$")
+_HR_RE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_DIV_RE = re.compile(r"^\s*:{3,}\s*(.*?)\s*:*\s*$")
+_TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_ATTR_KV_RE = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+@dataclass
+class Block:
+    kind: str  # heading | para | list | table | hr | quote
+    text: str = ""
+    level: int = 0
+    style: str | None = None
+    # list: [(nesting, ordered, text)]
+    items: list[tuple[int, bool, str]] | None = None
+    # table
+    header: list[str] | None = None
+    aligns: list[str] | None = None
+    rows: list[list[str]] | None = None
+
+
+def _split_row(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    cells = re.split(r"(?<!\\)\|", line)
+    return [c.strip().replace("\\|", "|") for c in cells]
+
+
+def _join_paragraph(lines: list[str]) -> str:
+    out = ""
+    for idx, raw in enumerate(lines):
+        hard = raw.endswith("  ") or raw.rstrip().endswith("\\")
+        line = raw.strip()
+        if hard and line.endswith("\\"):
+            line = line[:-1]
+        out += line
+        if idx < len(lines) - 1:
+            out += "\n" if hard else " "
+    return out
+
+
+def _div_style(attrs: str) -> str | None:
+    kv = dict(_ATTR_KV_RE.findall(attrs))
+    name = kv.get("custom-style")
+    if not name:
+        return None
+    # Word derives style ids from names by dropping spaces.
+    return re.sub(r"\s+", "", name)
+
+
+def parse_blocks(markdown: str) -> list[Block]:
+    lines = markdown.splitlines()
+    blocks: list[Block] = []
+    div_styles: list[str | None] = []
+    i = 0
+
+    def current_div_style() -> str | None:
+        for style in reversed(div_styles):
+            if style:
+                return style
+        return None
+
+    def starts_block(line: str) -> bool:
+        return bool(
+            not line.strip()
+            or _HEADING_RE.match(line)
+            or _LIST_RE.match(line)
+            or _HR_RE.match(line)
+            or _DIV_RE.match(line)
+            or line.lstrip().startswith(">")
+        )
+
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        m = _DIV_RE.match(line)
+        if m:
+            attrs = m.group(1)
+            if attrs:
+                div_styles.append(_div_style(attrs))
+            elif div_styles:
+                div_styles.pop()
+            i += 1
+            continue
+
+        m = _HEADING_RE.match(line)
+        if m:
+            blocks.append(Block("heading", text=m.group(2), level=len(m.group(1))))
+            i += 1
+            continue
+
+        if _HR_RE.match(line):
+            blocks.append(Block("hr"))
+            i += 1
+            continue
+
+        if "|" in line and i + 1 < len(lines) and _TABLE_SEP_RE.match(lines[i + 1]) and "-" in lines[i + 1]:
+            header = _split_row(line)
+            aligns: list[str] = []
+            for spec in _split_row(lines[i + 1]):
+                left, right = spec.startswith(":"), spec.endswith(":")
+                aligns.append("center" if left and right else "right" if right else "left")
+            rows: list[list[str]] = []
+            i += 2
+            while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+                rows.append(_split_row(lines[i]))
+                i += 1
+            blocks.append(Block("table", header=header, aligns=aligns, rows=rows))
+            continue
+
+        if _LIST_RE.match(line):
+            items: list[tuple[int, bool, str]] = []
+            indents: list[int] = []
+            while i < len(lines):
+                cur = lines[i]
+                lm = _LIST_RE.match(cur)
+                if lm:
+                    indent = len(lm.group(1).expandtabs(4))
+                    while indents and indent < indents[-1]:
+                        indents.pop()
+                    if not indents or indent > indents[-1]:
+                        indents.append(indent)
+                    ordered = lm.group(2)[0].isdigit()
+                    items.append((len(indents) - 1, ordered, lm.group(3).strip()))
+                    i += 1
+                    continue
+                if not cur.strip():
+                    # Blank line: the list continues only if another item follows.
+                    j = i + 1
+                    while j < len(lines) and not lines[j].strip():
+                        j += 1
+                    if j < len(lines) and _LIST_RE.match(lines[j]):
+                        i = j
+                        continue
+                    break
+                if cur.startswith((" ", "\t")) and items:
+                    # Lazy continuation of the previous item.
+                    nesting, ordered, text = items[-1]
+                    items[-1] = (nesting, ordered, f"{text} {cur.strip()}")
+                    i += 1
+                    continue
+                break
+            blocks.append(Block("list", items=items))
+            continue
+
+        if line.lstrip().startswith(">"):
+            quote: list[str] = []
+            while i < len(lines) and lines[i].lstrip().startswith(">"):
+                quote.append(lines[i].lstrip()[1:].lstrip())
+                i += 1
+            blocks.append(Block("quote", text=_join_paragraph(quote)))
+            continue
+
+        para = [line]
+        i += 1
+        while i < len(lines) and not starts_block(lines[i]):
+            para.append(lines[i])
+            i += 1
+        blocks.append(Block("para", text=_join_paragraph(para), style=current_div_style()))
+
+    return blocks
+
+
+# === DOCX WRITING ===
+
+class _DocxWriter:
+    def __init__(self, styles: _Styles):
+        self.styles = styles
+        self.links: dict[str, str] = {}
+        # numId 1 = bullets; ordered lists get a fresh numId each so numbering restarts.
+        self.ordered_num_ids: list[int] = []
+        self.body = ET.Element(_w("body"))
+
+    def link_rel(self, url: str) -> str:
+        if url not in self.links:
+            self.links[url] = f"rIdLink{len(self.links) + 1}"
+        return self.links[url]
+
+    def add_runs(self, p: ET.Element, runs: list[Run], *, force_bold: bool = False) -> None:
+        for run in runs:
+            parent = p
+            if run.link:
+                parent = _sub(p, "hyperlink")
+                parent.set(f"{{{R_NS}}}id", self.link_rel(run.link))
+            pieces = run.text.split("\n")
+            for idx, piece in enumerate(pieces):
+                r = _sub(parent, "r")
+                rpr = ET.Element(_w("rPr"))
+                if run.link:
+                    _sub(rpr, "rStyle", val=self.styles.use("Hyperlink"))
+                elif run.code:
+                    _sub(rpr, "rStyle", val=self.styles.use("VerbatimChar"))
+                if run.bold or force_bold:
+                    _sub(rpr, "b")
+                if run.italic:
+                    _sub(rpr, "i")
+                if run.strike:
+                    _sub(rpr, "strike")
+                if run.underline:
+                    _sub(rpr, "u", val="single")
+                if len(rpr):
+                    r.append(rpr)
+                if idx > 0:
+                    _sub(r, "br")
+                if piece:
+                    t = _sub(r, "t")
+                    t.text = piece
+                    t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+
+    def paragraph(self, parent: ET.Element, style: str, runs: list[Run], *, num: tuple[int, int] | None = None) -> ET.Element:
+        p = _sub(parent, "p")
+        ppr = _sub(p, "pPr")
+        _sub(ppr, "pStyle", val=style)
+        if num is not None:
+            num_pr = _sub(ppr, "numPr")
+            _sub(num_pr, "ilvl", val=str(num[0]))
+            _sub(num_pr, "numId", val=str(num[1]))
+        self.add_runs(p, runs)
+        return p
+
+    def write(self, blocks: list[Block]) -> None:
+        first_para = True
+        for block in blocks:
+            if block.kind == "heading":
+                style = self.styles.use(f"Heading{block.level}")
+                self.paragraph(self.body, style, parse_inline(block.text))
+                first_para = True
+            elif block.kind == "para":
+                if block.style:
+                    style = self.styles.use(block.style)
+                else:
+                    style = self.styles.paragraph_style("FirstParagraph" if first_para else "BodyText", "BodyText")
+                self.paragraph(self.body, style, parse_inline(block.text))
+                first_para = False
+            elif block.kind == "quote":
+                self.paragraph(self.body, self.styles.use("BlockText"), parse_inline(block.text))
+            elif block.kind == "hr":
+                p = _sub(self.body, "p")
+                bdr = _sub(_sub(p, "pPr"), "pBdr")
+                _sub(bdr, "bottom", val="single", sz="6", space="1", color="auto")
+            elif block.kind == "list":
+                self.write_list(block.items or [])
+            elif block.kind == "table":
+                self.write_table(block)
+
+    def write_list(self, items: list[tuple[int, bool, str]]) -> None:
+        style = self.styles.use("Compact")
+        ordered_num: int | None = None
+        for nesting, ordered, text in items:
+            if ordered:
+                if ordered_num is None:
+                    ordered_num = 2 + len(self.ordered_num_ids)
+                    self.ordered_num_ids.append(ordered_num)
+                num_id = ordered_num
+            else:
+                num_id = 1
+            self.paragraph(self.body, style, parse_inline(text), num=(min(nesting, 8), num_id))
+
+    def write_table(self, block: Block) -> None:
+        header = block.header or []
+        rows = block.rows or []
+        ncols = max([len(header)] + [len(r) for r in rows])
+        aligns = (block.aligns or []) + ["left"] * ncols
+
+        tbl = _sub(self.body, "tbl")
+        tbl_pr = _sub(tbl, "tblPr")
+        _sub(tbl_pr, "tblStyle", val=self.styles.use("Table"))
+        _sub(tbl_pr, "tblW", w="5000", type="pct")
+        grid = _sub(tbl, "tblGrid")
+        for _ in range(ncols):
+            _sub(grid, "gridCol", w=str(9360 // max(1, ncols)))
+
+        cell_style = self.styles.use("Compact")
+        for row_idx, cells in enumerate([header] + rows):
+            tr = _sub(tbl, "tr")
+            if row_idx == 0:
+                _sub(_sub(tr, "trPr"), "tblHeader")
+            for col in range(ncols):
+                tc = _sub(tr, "tc")
+                _sub(_sub(tc, "tcPr"), "tcW", w="0", type="auto")
+                text = cells[col] if col < len(cells) else ""
+                p = self.paragraph(tc, cell_style, [])
+                ppr = p.find("w:pPr", NS)
+                if ppr is not None and aligns[col] != "left":
+                    _sub(ppr, "jc", val=aligns[col])
+                self.add_runs(p, parse_inline(text), force_bold=row_idx == 0)
+
+    def numbering_xml(self) -> bytes:
+        root = ET.Element(_w("numbering"))
+        bullets = ["•", "◦", "▪"]
+        for abstract_id, fmt in ((0, "bullet"), (1, "decimal")):
+            abstract = _sub(root, "abstractNum", abstractNumId=str(abstract_id))
+            _sub(abstract, "multiLevelType", val="hybridMultilevel")
+            for lvl in range(9):
+                el = _sub(abstract, "lvl", ilvl=str(lvl))
+                _sub(el, "start", val="1")
+                _sub(el, "numFmt", val=fmt)
+                _sub(el, "lvlText", val=bullets[lvl % 3] if fmt == "bullet" else f"%{lvl + 1}.")
+                _sub(el, "lvlJc", val="left")
+                ind = _sub(_sub(el, "pPr"), "ind")
+                ind.set(_w("left"), str(720 * (lvl + 1)))
+                ind.set(_w("hanging"), "360")
+        num = _sub(root, "num", numId="1")
+        _sub(num, "abstractNumId", val="0")
+        for num_id in self.ordered_num_ids:
+            num = _sub(root, "num", numId=str(num_id))
+            _sub(num, "abstractNumId", val="1")
+            override = _sub(num, "lvlOverride", ilvl="0")
+            _sub(override, "startOverride", val="1")
+        return _tostring(root)
+
+
+def _reference_parts(reference_docx: str | None) -> tuple[bytes | None, dict[str, bytes], ET.Element | None]:
+    # Returns (styles.xml, extra parts to copy verbatim, sectPr).
+    if not reference_docx:
+        return None, {}, None
+    with zipfile.ZipFile(reference_docx) as zf:
+        names = set(zf.namelist())
+        try:
+            styles = zf.read("word/styles.xml")
+        except KeyError:
+            raise SystemExit(f"Reference DOCX missing word/styles.xml: {reference_docx}") from None
+        extra = {name: zf.read(name) for name in ("word/theme/theme1.xml", "word/fontTable.xml") if name in names}
+        sect_pr = None
+        if "word/document.xml" in names:
+            body = ET.fromstring(zf.read("word/document.xml")).find("w:body", NS)
+            sect_pr = body.find("w:sectPr", NS) if body is not None else None
+            if sect_pr is not None:
+                # Headers/footers are not copied, so their references would dangle.
+                for ref in sect_pr.findall("w:headerReference", NS) + sect_pr.findall("w:footerReference", NS):
+                    sect_pr.remove(ref)
+    return styles, extra, sect_pr
+
+
+def render_markdown_docx(markdown: str, *, reference_docx: str | None = None) -> bytes:
+    styles_xml, extra_parts, sect_pr = _reference_parts(reference_docx)
+    writer = _DocxWriter(_Styles(styles_xml))
+    writer.write(parse_blocks(markdown))
+    writer.body.append(sect_pr if sect_pr is not None else ET.fromstring(_DEFAULT_SECT_PR))
+
+    document = ET.Element(_w("document"))
+    document.append(writer.body)
+
+    overrides = {
+        "/word/document.xml": "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+        "/word/styles.xml": "application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml",
+        "/word/numbering.xml": "application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml",
+    }
+    rels = [
+        ("rIdStyles", f"{REL_TYPE}/styles", "styles.xml", None),
+        ("rIdNumbering", f"{REL_TYPE}/numbering", "numbering.xml", None),
+    ]
+    if "word/theme/theme1.xml" in extra_parts:
+        overrides["/word/theme/theme1.xml"] = "application/vnd.openxmlformats-officedocument.theme+xml"
+        rels.append(("rIdTheme", f"{REL_TYPE}/theme", "theme/theme1.xml", None))
+    if "word/fontTable.xml" in extra_parts:
+        overrides["/word/fontTable.xml"] = "application/vnd.openxmlformats-officedocument.wordprocessingml.fontTable+xml"
+        rels.append(("rIdFontTable", f"{REL_TYPE}/fontTable", "fontTable.xml", None))
+    for url, rid in writer.links.items():
+        rels.append((rid, f"{REL_TYPE}/hyperlink", url, "External"))
+
+    content_types = ET.Element("Types", xmlns="http://schemas.openxmlformats.org/package/2006/content-types")
+    ET.SubElement(content_types, "Default", Extension="rels", ContentType="application/vnd.openxmlformats-package.relationships+xml")
+    ET.SubElement(content_types, "Default", Extension="xml", ContentType="application/xml")
+    for part, ctype in overrides.items():
+        ET.SubElement(content_types, "Override", PartName=part, ContentType=ctype)
+
+    package_rels = ET.Element("Relationships", xmlns=REL_NS)
+    ET.SubElement(package_rels, "Relationship", Id="rId1", Type=f"{REL_TYPE}/officeDocument", Target="word/document.xml")
+
+    doc_rels = ET.Element("Relationships", xmlns=REL_NS)
+    for rid, rtype, target, mode in rels:
+        rel = ET.SubElement(doc_rels, "Relationship", Id=rid, Type=rtype, Target=target)
+        if mode:
+            rel.set("TargetMode", mode)
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _tostring(content_types))
+        zf.writestr("_rels/.rels", _tostring(package_rels))
+        zf.writestr("word/document.xml", _tostring(document))
+        zf.writestr("word/_rels/document.xml.rels", _tostring(doc_rels))
+        zf.writestr("word/styles.xml", writer.styles.to_xml())
+        zf.writestr("word/numbering.xml", writer.numbering_xml())
+        for name, data in extra_parts.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Render Markdown to DOCX without pandoc.")
+    p.add_argument("md", help="Input Markdown file")
+    p.add_argument("--out", required=True, help="Output DOCX")
+    p.add_argument("--reference-docx", help="DOCX with styles (like pandoc --reference-doc)")
+    args = p.parse_args()
+
+    with open(args.md, "r", encoding="utf-8") as f:
+        markdown = f.read()
+    data = render_markdown_docx(markdown, reference_docx=args.reference_docx)
+    tmp = f"{args.out}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, args.out)
+    print(f"OK. Wrote DOCX to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Compile Markdown into Google Docs `documents:batchUpdate` requests.
+
+Uses the block/inline parser from md_docx, so `import-md --in-place` accepts the
+same Markdown subset as the DOCX renderer. All text goes in with a single
+insertText; paragraph styles, text styles/links and bullets are then applied by
+computed index ranges, so the document id and revision history stay intact.
+
+Docs has no API for horizontal rules or custom paragraph styles: `---` is dropped
+and fenced-div styles fall back to normal text. Pipe tables become one paragraph
+per row with tab-separated cells (header row bold).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from md_docx import Block, Run, parse_blocks, parse_inline
+
+
+LINK_COLOR = {"color": {"rgbColor": {"red": 0x11 / 255, "green": 0x55 / 255, "blue": 0xCC / 255}}}
+CODE_FONT = "Courier New"
+QUOTE_INDENT_PT = 36
+# Fields cleared on the inserted range first, so it does not inherit the style at the insertion point.
+RESET_TEXT_FIELDS = "bold,italic,underline,strikethrough,link,weightedFontFamily,foregroundColor"
+PARAGRAPH_FIELDS = "namedStyleType,indentStart,indentFirstLine"
+
+
+def utf16_len(text: str) -> int:
+    # Docs indices count UTF-16 code units (emoji and other astral chars take two).
+    return len(text.encode("utf-16-le")) // 2
+
+
+@dataclass
+class _Paragraph:
+    start: int
+    end: int
+    named_style: str
+    quote: bool = False
+    # (list group id, ordered) for list items
+    bullet: tuple[int, bool] | None = None
+
+
+class _Builder:
+    def __init__(self, start_index: int):
+        self.pos = start_index
+        self.parts: list[str] = []
+        self.paragraphs: list[_Paragraph] = []
+        self.spans: list[tuple[int, int, dict[str, Any]]] = []
+        self._groups = 0
+
+    def _emit(self, text: str) -> None:
+        self.parts.append(text)
+        self.pos += utf16_len(text)
+
+    def paragraph(
+        self,
+        runs: list[Run],
+        *,
+        named_style: str = "NORMAL_TEXT",
+        prefix: str = "",
+        bullet: tuple[int, bool] | None = None,
+        quote: bool = False,
+        force_bold: bool = False,
+    ) -> None:
+        start = self.pos
+        self._emit(prefix)
+        for run in runs:
+            span_start = self.pos
+            # "\n" inside a run is a hard break; Docs uses vertical tab for a line break within a paragraph.
+            self._emit(run.text.replace("\n", "\u000b"))
+            style = _text_style(run, force_bold=force_bold)
+            if style and self.pos > span_start:
+                self.spans.append((span_start, self.pos, style))
+        self._emit("\n")
+        self.paragraphs.append(_Paragraph(start, self.pos, named_style, quote, bullet))
+
+    def new_list_group(self) -> int:
+        self._groups += 1
+        return self._groups
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _text_style(run: Run, *, force_bold: bool = False) -> dict[str, Any]:
+    style: dict[str, Any] = {}
+    if run.bold or force_bold:
+        style["bold"] = True
+    if run.italic:
+        style["italic"] = True
+    if run.strike:
+        style["strikethrough"] = True
+    if run.underline or run.link:
+        style["underline"] = True
+    if run.link:
+        style["link"] = {"url": run.link}
+        style["foregroundColor"] = LINK_COLOR
+    if run.code:
+        style["weightedFontFamily"] = {"fontFamily": CODE_FONT}
+    return style
+
+
+def _build(blocks: list[Block], start_index: int) -> _Builder:
+    b = _Builder(start_index)
+    for block in blocks:
+        if block.kind == "heading":
+            b.paragraph(parse_inline(block.text), named_style=f"HEADING_{block.level}")
+        elif block.kind == "para":
+            b.paragraph(parse_inline(block.text))
+        elif block.kind == "quote":
+            b.paragraph(parse_inline(block.text), quote=True)
+        elif block.kind == "list":
+            group = None
+            group_ordered = None
+            for nesting, ordered, text in block.items or []:
+                # A top-level item of the other kind starts a new bullet group (preset is per group).
+                if group is None or (nesting == 0 and ordered != group_ordered):
+                    group = b.new_list_group()
+                    group_ordered = ordered
+                # Leading tabs set the nesting level; createParagraphBullets consumes them.
+                b.paragraph(parse_inline(text), prefix="\t" * nesting, bullet=(group, bool(group_ordered)))
+        elif block.kind == "table":
+            for row_idx, cells in enumerate([block.header or []] + (block.rows or [])):
+                runs: list[Run] = []
+                for col, cell in enumerate(cells):
+                    if col:
+                        runs.append(Run("\t"))
+                    runs.extend(parse_inline(cell))
+                b.paragraph(runs, force_bold=row_idx == 0)
+        # "hr" has no Docs equivalent.
+    return b
+
+
+def compile_blocks(blocks: list[Block], *, start_index: int = 1, trailing_newline: bool = True) -> list[dict[str, Any]]:
+    # trailing_newline=False when inserting at the very end of the body: the document's
+    # own final newline then terminates the last paragraph.
+    b = _build(blocks, start_index)
+    text = b.text
+    limit = b.pos
+    if not trailing_newline and text.endswith("\n"):
+        text = text[:-1]
+        # Ranges must stop short of the segment's final newline.
+        limit -= 1
+    if not text:
+        return []
+
+    def rng(start: int, end: int) -> dict[str, int]:
+        return {"startIndex": start, "endIndex": min(end, limit)}
+
+    full = rng(start_index, b.pos)
+    requests: list[dict[str, Any]] = [
+        {"insertText": {"location": {"index": start_index}, "text": text}},
+        {"deleteParagraphBullets": {"range": full}},
+        {"updateTextStyle": {"range": full, "textStyle": {}, "fields": RESET_TEXT_FIELDS}},
+    ]
+
+    # Consecutive paragraphs with the same style share one request.
+    run_start = start_index
+    prev: _Paragraph | None = None
+    for para in [*b.paragraphs, None]:
+        if prev is not None and (para is None or (para.named_style, para.quote) != (prev.named_style, prev.quote)):
+            style: dict[str, Any] = {"namedStyleType": prev.named_style}
+            if prev.quote:
+                style["indentStart"] = {"magnitude": QUOTE_INDENT_PT, "unit": "PT"}
+            if run_start < min(prev.end, limit):
+                requests.append(
+                    {
+                        "updateParagraphStyle": {
+                            "range": rng(run_start, prev.end),
+                            "paragraphStyle": style,
+                            "fields": PARAGRAPH_FIELDS,
+                        }
+                    }
+                )
+            run_start = prev.end
+        prev = para
+
+    for start, end, style in b.spans:
+        if start >= min(end, limit):
+            continue
+        requests.append(
+            {
+                "updateTextStyle": {
+                    "range": rng(start, end),
+                    "textStyle": style,
+                    "fields": ",".join(style),
+                }
+            }
+        )
+
+    # Bullets last and bottom-up: consuming the nesting tabs shifts every index after the group.
+    groups: dict[int, tuple[int, int, bool]] = {}
+    for para in b.paragraphs:
+        if para.bullet is None:
+            continue
+        group, ordered = para.bullet
+        first = groups.get(group)
+        groups[group] = (first[0] if first else para.start, para.end, ordered)
+    for start, end, ordered in sorted(groups.values(), reverse=True):
+        if start >= min(end, limit):
+            continue
+        requests.append(
+            {
+                "createParagraphBullets": {
+                    "range": rng(start, end),
+                    "bulletPreset": "NUMBERED_DECIMAL_ALPHA_ROMAN" if ordered else "BULLET_DISC_CIRCLE_SQUARE",
+                }
+            }
+        )
+    return requests
+
+
+def _plain(text: str) -> str:
+    return "".join(r.text for r in parse_inline(text)).strip()
+
+
+def select_section(blocks: list[Block], heading: str) -> list[Block]:
+    # Blocks under `heading` (up to the next heading of the same or higher level); all blocks if absent.
+    want = heading.strip().lower()
+    for idx, block in enumerate(blocks):
+        if block.kind == "heading" and _plain(block.text).lower() == want:
+            out = []
+            for nxt in blocks[idx + 1 :]:
+                if nxt.kind == "heading" and nxt.level <= block.level:
+                    break
+                out.append(nxt)
+            return out
+    return blocks
+
+
+def _paragraph_text(item: dict[str, Any]) -> str:
+    elements = (item.get("paragraph") or {}).get("elements") or []
+    return "".join((e.get("textRun") or {}).get("content") or "" for e in elements).strip()
+
+
+def _heading_level(item: dict[str, Any]) -> int:
+    style = ((item.get("paragraph") or {}).get("paragraphStyle") or {}).get("namedStyleType") or ""
+    if style.startswith("HEADING_"):
+        return int(style.rsplit("_", 1)[1])
+    if style == "TITLE":
+        return 1
+    return 0
+
+
+def find_section(content: list[dict[str, Any]], heading: str) -> tuple[int, int] | None:
+    # Range of the body under `heading` (excluding the heading paragraph itself).
+    want = heading.strip().lower()
+    start = None
+    level = 0
+    for item in content:
+        if "paragraph" not in item:
+            continue
+        h_level = _heading_level(item)
+        if start is None:
+            if h_level and _paragraph_text(item).lower() == want:
+                start = item.get("endIndex")
+                level = h_level
+            continue
+        if h_level and h_level <= level:
+            return start, item.get("startIndex")
+    if start is None:
+        return None
+    return start, content[-1].get("endIndex") or start
+
+
+def plan_markdown_update(doc_json: dict[str, Any], markdown: str, *, section: str | None = None) -> list[dict[str, Any]]:
+    content = (doc_json.get("body") or {}).get("content") or []
+    doc_end = (content[-1].get("endIndex") if content else None) or 2
+    blocks = parse_blocks(markdown)
+
+    if section:
+        found = find_section(content, section)
+        if found is None:
+            raise SystemExit(f"Section {section!r} not found in the document headings.")
+        start, end = found
+        blocks = select_section(blocks, section)
+    else:
+        start, end = 1, doc_end
+
+    # The body's final newline can never be deleted.
+    at_doc_end = end >= doc_end
+    if at_doc_end:
+        end = doc_end - 1
+
+    requests: list[dict[str, Any]] = []
+    if start >= doc_end:
+        # The section heading is the last paragraph: nothing to delete, and the new blocks go before
+        # the final newline, after a newline of their own that ends the heading paragraph.
+        compiled = compile_blocks(blocks, start_index=doc_end, trailing_newline=False)
+        if compiled:
+            requests.append({"insertText": {"location": {"index": doc_end - 1}, "text": "\n"}})
+        return requests + compiled
+    if end > start:
+        requests.append({"deleteContentRange": {"range": {"startIndex": start, "endIndex": end}}})
+    requests.extend(compile_blocks(blocks, start_index=start, trailing_newline=not at_doc_end))
+    return requests